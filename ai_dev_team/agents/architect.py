@@ -5,6 +5,8 @@ from .base import BaseAgent
 class ArchitectAgent(BaseAgent):
     """Software Architect that designs system architecture"""
 
+    consumes = ["requirements", "project_type", "tech_stack", "phases", "ProductManager", "context_summary"]
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="Software Architect",
@@ -5,6 +5,10 @@ from .base import BaseAgent
 class BackendEngineerAgent(BaseAgent):
     """Backend Engineer that builds APIs and server logic"""
 
+    consumes = [
+        "requirements", "tech_stack", "ProductManager", "Architect", "DatabaseEngineer", "files", "context_summary",
+    ]
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="Backend Engineer",
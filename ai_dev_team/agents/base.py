@@ -5,10 +5,26 @@ from typing import Dict, List, Optional
 import json
 import re
 
+from ..config import Config
+from ..utils.approval_queue import ApprovalRequest
+from .context_slices import slice_context
+from .prompt_format import get_serializer, saved_chars, terse_tool_result
+
 
 class BaseAgent:
     """Base class for all AI agents"""
 
+    # Context this agent reads (keys or derived slices, see context_slices.slice_context);
+    # None sends the whole context
+    consumes: Optional[List[str]] = None
+
+    # Whether results may be replayed from the agent result cache (agents that read the
+    # workspace outside their tool calls must opt out)
+    cacheable = True
+
+    # Prompt serializer for context ("json", "keypath", "pretty"); None uses Config.PROMPT_FORMAT
+    prompt_format: Optional[str] = None
+
     def __init__(self, name: str, role: str, groq_client, tools: Dict, human_loop):
         self.name = name
         self.role = role
@@ -16,6 +32,8 @@ class BaseAgent:
         self.tools = tools
         self.human_loop = human_loop
         self.conversation_history = []
+        self.tool_log: List[Dict] = []  # Tool calls run by the current task, for the result cache
+        self.saved_chars = 0  # Prompt chars the compact renderings save per request of the current task
         self.system_prompt = self._build_system_prompt()
 
     def _build_system_prompt(self) -> str:
@@ -64,7 +82,8 @@ Be fast and action-oriented. Don't overthink simple tasks."""
         if "file_ops" in self.tools:
             descriptions.append("""
 FILE OPERATIONS:
-- write_file(filepath, content): Write content to a file
+- write_file(filepath, content): Write content to a file (reports "unchanged" if identical)
+- write_files(files): Write many files at once, files = {"path": "content", ...}
 - read_file(filepath): Read file content
 - list_files(directory): List files in directory
 - create_directory(directory): Create a directory
@@ -74,18 +93,28 @@ FILE OPERATIONS:
         if "terminal" in self.tools:
             descriptions.append("""
 TERMINAL OPERATIONS:
-- run_command(command): Execute terminal command
+- run_command(command): Execute terminal command (long output is truncated to head/tail)
+  Commands share a persistent shell: cd, exports and activated virtualenvs carry over
+- reset_session(): Start a fresh shell session
+- run_commands(commands, fail_fast): Run independent commands (lint, format, type check, tests)
+  concurrently in one call, e.g. {"commands": ["pylint src", "black --check src", "pytest -q"]}
+- start_process(name, command, ready_port, ready_pattern): Start a dev server/watcher in the background
+  and wait until the port opens or the pattern appears in its output
+- poll_process(name): Status and new output of a background process (omit name to list all)
+- stop_process(name): Stop a background process
+- read_command_log(log_id, stream, start_line, num_lines): Page through a truncated command's full output
 - install_package(package, package_manager): Install package
-- run_tests(test_path, framework): Run tests
-- lint_code(filepath, language): Lint code
-- format_code(filepath, language): Format code
+- run_tests(test_path, framework): Run tests (pytest only re-runs tests affected by changes;
+  pass "incremental": false to run everything)
+- lint_code(filepath, language): Lint code; filepath may be a list to lint many files at once
+- format_code(filepath, language): Format code; filepath may be a list to format many files at once
 """)
 
         if "vision" in self.tools:
             descriptions.append("""
 VISION OPERATIONS:
 - analyze_image(image_path, question): Analyze image
-- extract_ui_components(image_path): Extract UI from design
+- extract_ui_components(image_path): Extract UI structure (JSON component tree) from a design
 """)
 
         return "\n".join(descriptions)
@@ -102,6 +131,8 @@ VISION OPERATIONS:
             Dict with results, artifacts, and status
         """
         self.conversation_history = []
+        self.tool_log = []
+        self.saved_chars = 0
 
         # Add context to initial message
         complexity = context.get("complexity", "medium") if context else "medium"
@@ -123,10 +154,12 @@ VISION OPERATIONS:
             initial_message += "\n\n⚡ QUICK TASK: This is a simple task. Create the file immediately and mark DONE. No analysis needed."
 
         if context:
-            # Add full context (excluding path info we already showed)
-            context_copy = {k: v for k, v in context.items() if k not in ["output_dir", "user_working_dir"]}
+            # Add the context this agent consumes (path info is already shown)
+            context_copy = slice_context(context, self.consumes)
             if context_copy:
-                initial_message += f"\n\nAdditional Context:\n{json.dumps(context_copy, indent=2)}"
+                rendered = get_serializer(self.prompt_format).dumps(context_copy)
+                self.saved_chars += saved_chars(get_serializer("pretty").dumps(context_copy), rendered)
+                initial_message += f"\n\nAdditional Context:\n{rendered}"
 
         self.conversation_history.append({"role": "user", "content": initial_message})
 
@@ -140,8 +173,12 @@ VISION OPERATIONS:
             max_iterations = 15  # Complex tasks may need more iterations
 
         artifacts = {}
+        self._artifacts = artifacts  # Queued writes record their outcome here once approved
 
         for iteration in range(max_iterations):
+            # Report queued approvals answered since the last step (approved ones run now)
+            self._report_approvals()
+
             # Get agent response
             response = self._get_response()
 
@@ -159,23 +196,32 @@ VISION OPERATIONS:
                 result = self._execute_tool_with_approval(tool_name, tool_args, reasoning)
 
                 # Track artifacts
-                if tool_name == "write_file" and "filepath" in tool_args:
-                    artifacts[tool_args["filepath"]] = "created"
+                self._track_artifacts(artifacts, tool_name, tool_args, result)
 
-                # Add result to conversation
+                # Add result to conversation (terse for the model; the rich result is in the tool log)
                 self.conversation_history.append(
-                    {"role": "user", "content": f"Tool result:\n{result}"}
+                    {"role": "user", "content": f"Tool result:\n{self._render_result(tool_name, result)}"}
                 )
 
             # Check if done AFTER tool execution
             if "DONE" in response:
                 summary = self._extract_summary(response)
-                return {
+                result = {
                     "status": "completed",
                     "summary": summary,
                     "artifacts": artifacts,
                     "iterations": iteration + 1,
                 }
+                queue = self.human_loop.queue
+                if queue is not None and queue.unfinished(self.name):
+                    # Not waited for here: the run settles them before the next phase
+                    result["pending_approvals"] = len(queue.unfinished(self.name))
+                return result
+
+            # Nothing left to do but wait for approvals: wait for one instead of prompting again
+            if not tool_call and self.human_loop.queue is not None and self.human_loop.queue.pending(self.name):
+                if self.human_loop.queue.wait(self.name, timeout=Config.APPROVAL_TIMEOUT, any_one=True):
+                    continue
 
             # If no tool call and no DONE, ask agent to clarify
             if not tool_call:
@@ -193,6 +239,64 @@ VISION OPERATIONS:
             "iterations": max_iterations,
         }
 
+    def _shell_session(self) -> Optional[str]:
+        """Name of this agent's persistent shell session, or None if sessions are disabled"""
+        if Config.SHELL_SESSION_SCOPE == "agent":
+            return self.name
+        if Config.SHELL_SESSION_SCOPE == "project":
+            return "project"
+        return None
+
+    def _track_artifacts(self, artifacts: Dict, tool_name: str, tool_args: Dict, result: str):
+        """Record the outcome of write tools"""
+        if tool_name == "write_file" and "filepath" in tool_args:
+            artifacts[tool_args["filepath"]] = self._write_status(result, tool_args["filepath"])
+        elif tool_name == "write_files" and isinstance(tool_args.get("files"), (dict, list)):
+            for filepath in self._batch_filepaths(tool_args["files"]):
+                artifacts[filepath] = self._write_status(result, filepath)
+
+    def _run_approved(self, tool_name: str, tool_args: Dict, artifacts: Dict) -> str:
+        """Run a queued tool call after its approval"""
+        result = self._execute_tool(tool_name, tool_args)
+        self.tool_log.append({"tool": tool_name, "args": tool_args, "result": result})
+        self._track_artifacts(artifacts, tool_name, tool_args, result)
+        return result
+
+    def _report_approvals(self):
+        """Run this agent's approved queued calls and tell the model how its requests were answered"""
+        queue = self.human_loop.queue
+        if queue is None:
+            return
+        for request in queue.run_resolved(self.name):
+            if request.status == "approved":
+                result = self._render_result(request.tool, request.result)
+                content = f"Approval #{request.id} granted. Tool result ({request.tool}):\n{result}"
+            else:
+                content = f"❌ Approval #{request.id} {request.status}: {request.tool} was not run"
+            self.conversation_history.append({"role": "user", "content": content})
+
+    def _render_result(self, tool_name: str, result: str) -> str:
+        """Tool result as the model sees it, counting what it saves over the rich text"""
+        terse = terse_tool_result(tool_name, result)
+        self.saved_chars += saved_chars(result, terse)
+        return terse
+
+    def _write_status(self, result: str, filepath: str) -> str:
+        """Map a write tool result to an artifact status"""
+        if result.startswith("⏳ Approval #"):
+            return "pending"
+        if f"File unchanged: {filepath} " in result:
+            return "unchanged"
+        if f"File written: {filepath} " in result:
+            return "created"
+        return "failed"
+
+    def _batch_filepaths(self, files) -> List[str]:
+        """Get file paths from write_files args"""
+        if isinstance(files, dict):
+            return list(files.keys())
+        return [f.get("filepath") for f in files if isinstance(f, dict) and f.get("filepath")]
+
     def _get_response(self) -> str:
         """Get response from Groq"""
         messages = [{"role": "system", "content": self.system_prompt}] + self.conversation_history
@@ -206,6 +310,8 @@ VISION OPERATIONS:
             max_tokens = 2048  # Full response for complex tasks
 
         result = self.groq_client.chat(messages, temperature=0.7, max_tokens=max_tokens)
+        # The whole history is re-sent with every request, so its savings count every time
+        self.groq_client.record_prompt_savings(self.saved_chars)
 
         return result["content"]
 
@@ -268,31 +374,47 @@ VISION OPERATIONS:
         """Execute tool with human approval if needed"""
         # Determine risk level
         risk_level = "low"
-        if tool_name in ["run_command", "delete_file"]:
+        if tool_name in ["run_command", "run_commands", "start_process", "delete_file"]:
             risk_level = "high"
-        elif tool_name in ["write_file", "create_directory"]:
+        elif tool_name in ["write_file", "write_files", "create_directory", "stop_process"]:
             risk_level = "medium"
 
-        # Request approval for risky actions
-        if risk_level in ["high", "medium"]:
-            approved = self.human_loop.request_approval(
-                action=f"{tool_name}({json.dumps(tool_args)})",
-                description=f"{self.name} wants to: {reasoning}",
-                context={"agent": self.name, "tool": tool_name},
-                risk_level=risk_level,
+        # The approval policy decides; only calls it leaves open reach a human
+        artifacts = getattr(self, "_artifacts", {})
+        approved = self.human_loop.authorize_tool(
+            agent=self.name,
+            tool=tool_name,
+            args=tool_args,
+            description=f"{self.name} wants to: {reasoning}",
+            risk_level=risk_level,
+            run=lambda: self._run_approved(tool_name, tool_args, artifacts),
+        )
+        if isinstance(approved, ApprovalRequest):
+            return (
+                f"⏳ Approval #{approved.id} requested for {tool_name}; it runs once a human approves "
+                "and its result will be reported to you. Do not repeat it. Meanwhile continue with "
+                "other work (read_file, list_files, other files), or respond DONE if nothing is left."
             )
-
-            if not approved:
-                return "❌ Action rejected by user"
+        if not approved:
+            return "❌ Action rejected by user or approval policy"
 
         # Execute tool
-        return self._execute_tool(tool_name, tool_args)
+        result = self._execute_tool(tool_name, tool_args)
+        self.tool_log.append({"tool": tool_name, "args": tool_args, "result": result})
+        return result
+
+    def cache_context(self, context: Dict) -> Dict:
+        """Context that determines this agent's result, hashed into its result cache key"""
+        # Complexity sets the iteration budget even when it is not in the prompt
+        return {**slice_context(context, self.consumes), "complexity": context.get("complexity")}
 
     def _execute_tool(self, tool_name: str, tool_args: Dict) -> str:
         """Execute a tool"""
         try:
             # File operations
-            if tool_name in ["write_file", "read_file", "list_files", "create_directory", "search_in_file"]:
+            if tool_name in [
+                "write_file", "write_files", "read_file", "list_files", "create_directory", "search_in_file"
+            ]:
                 tool_obj = self.tools.get("file_ops")
                 if not tool_obj:
                     return "❌ File operations not available"
@@ -304,11 +426,23 @@ VISION OPERATIONS:
                 return method(**tool_args)
 
             # Terminal operations
-            elif tool_name in ["run_command", "install_package", "run_tests", "lint_code", "format_code"]:
+            elif tool_name in [
+                "run_command", "run_commands", "read_command_log", "reset_session",
+                "start_process", "poll_process", "stop_process",
+                "install_package", "run_tests", "lint_code", "format_code"
+            ]:
                 tool_obj = self.tools.get("terminal")
                 if not tool_obj:
                     return "❌ Terminal operations not available"
 
+                if tool_name in ["run_command", "reset_session"]:
+                    session = self._shell_session()
+                    if not session:
+                        if tool_name == "reset_session":
+                            return "✅ Persistent shell sessions are disabled"
+                    else:
+                        tool_args = {**tool_args, "session": session}
+
                 method = getattr(tool_obj, tool_name, None)
                 if not method:
                     return f"❌ Unknown terminal operation: {tool_name}"
@@ -1,11 +1,43 @@
 """Code Reviewer Agent - Reviews code quality using reflection"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import re
+
 from .base import BaseAgent
+from ..config import Config
 from ..reflection import CodeAnalyzer
+from ..reflection.chunker import split_into_chunks
+from ..utils.disk_cache import JsonCache, cache_key
+
+# Lines of context shown around each finding
+REGION_CONTEXT = 3
+# Longest region shown for one finding (e.g. a very complex function)
+MAX_REGION_LINES = 60
+# Findings at these severities are listed but do not flag a file for LLM review
+LIST_ONLY_SEVERITIES = ["info"]
+
+# Bump when the chunk prompt changes so cached chunk reviews are redone
+CHUNK_REVIEW_VERSION = "1"
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+CHUNK_REVIEW_PROMPT = """You are a senior code reviewer looking at one chunk of a larger file.
+Report real problems only: bugs, security issues, error handling, performance, unclear code.
+Static analysis findings for the chunk are listed; confirm or dismiss them.
+
+Respond with ONLY a JSON array, [] if the chunk is fine:
+[{"line": <line number as shown>, "severity": "high|medium|low", "issue": "...", "fix": "..."}]"""
 
 
 class CodeReviewerAgent(BaseAgent):
     """Code Reviewer that analyzes code quality"""
 
+    consumes = ["requirements", "tech_stack", "files", "context_summary"]
+
+    # The pre-review analyzes the whole workspace directly, outside the tool calls
+    cacheable = False
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="Code Reviewer",
@@ -34,12 +66,16 @@ Review criteria:
 - Test coverage
 - Documentation
 
-Use list_files to find code files, then read_file to review them.
+A static pre-review has already analyzed every code file in the workspace.
+Your task contains its findings and the flagged code regions (with line
+numbers). Files not listed passed all checks - do not read them.
+Only use read_file when a flagged region is not enough to judge a finding,
+or for files marked for full review because static analysis failed on them.
 
-For each file, provide:
-- Overall assessment
-- Issues found
-- Suggestions for improvement
+For each flagged file, provide:
+- Whether each finding is a real problem
+- Issues the static checks missed in the shown regions
+- Concrete fixes
 
 Use write_file to create code-review.md with findings.
 
@@ -47,28 +83,327 @@ When done, respond:
 DONE
 SUMMARY: Reviewed X files, found Y issues"""
 
+    def execute(self, task: str, context: Optional[Dict] = None) -> Dict:
+        """
+        Review the workspace: static pre-review first, LLM only for flagged code
+
+        Args:
+            task: Task description
+            context: Additional context from other agents
+
+        Returns:
+            Agent result with 'pre_review' statistics
+        """
+        review = self.review_code()
+        chunk_reviews = self.review_large_files(review)
+        stats = {
+            "files_reviewed": review["files_reviewed"],
+            "files_flagged": len(review["flagged"]),
+            "analyzed": review["analyzed"],
+            "cached": review["cached"],
+            "large_files": len(chunk_reviews["files"]),
+            "chunks": chunk_reviews["chunks"],
+            "chunks_cached": chunk_reviews["cached"],
+        }
+        has_chunk_findings = any(chunk_reviews["files"].values())
+
+        if not review["flagged"] and not has_chunk_findings:
+            # Nothing for the model to look at: write the report directly
+            report = self._clean_report(review)
+            result = self._execute_tool_with_approval(
+                "write_file",
+                {"filepath": "code-review.md", "content": report},
+                "Writing code review report (static analysis found no problems)",
+            )
+            return {
+                "status": "completed",
+                "summary": f"Reviewed {review['files_reviewed']} files, found 0 issues",
+                "artifacts": {"code-review.md": self._write_status(result, "code-review.md")},
+                "iterations": 0,
+                "pre_review": stats,
+            }
+
+        result = super().execute(f"{task}\n\n{self.format_pre_review(review, chunk_reviews['files'])}", context)
+        result["pre_review"] = stats
+        return result
+
     def review_code(self, directory: str = ".") -> dict:
-        """Review all code in directory"""
-        # List files
-        file_list = self.tools["file_ops"].list_files(directory)
-
-        # Find code files
-        code_files = []
-        for line in file_list.split("\n"):
-            if any(ext in line for ext in [".py", ".js", ".ts", ".jsx", ".tsx"]):
-                # Extract filename
-                parts = line.split()
-                if len(parts) >= 2:
-                    code_files.append(parts[1])
-
-        # Analyze each file
-        results = []
-        for filepath in code_files:
-            if filepath.endswith(".py"):
-                analysis = self.analyzer.analyze_python(filepath)
-                results.append(analysis)
-            elif filepath.endswith((".js", ".jsx", ".ts", ".tsx")):
-                analysis = self.analyzer.analyze_javascript(filepath)
-                results.append(analysis)
-
-        return {"files_reviewed": len(results), "results": results}
+        """
+        Statically analyze all code under a directory (recursively)
+
+        Args:
+            directory: Directory relative to the workspace
+
+        Returns:
+            Dict with 'files_reviewed', 'results', 'flagged' (results of files
+            needing attention, each with 'regions', or 'full_review' if the
+            file could not be analyzed), 'analyzed' and 'cached'
+        """
+        base_dir = Path(self.tools["file_ops"].base_dir)
+        root = base_dir / directory
+        workspace = self.analyzer.analyze_workspace(str(root))
+
+        flagged = []
+        for analysis in workspace["results"]:
+            # Paths relative to the workspace, as the file tools expect
+            analysis["filepath"] = (root / analysis["filepath"]).relative_to(base_dir).as_posix()
+            if "error" in analysis:
+                # The static checks could not run, so nothing vouches for the file: review all of it
+                analysis["full_review"] = True
+                flagged.append(analysis)
+                continue
+            spans = self._flagged_spans(analysis)
+            if spans:
+                analysis["regions"] = self._read_regions(base_dir / analysis["filepath"], spans)
+                flagged.append(analysis)
+
+        return {
+            "files_reviewed": workspace["files"],
+            "results": workspace["results"],
+            "flagged": flagged,
+            "analyzed": workspace["analyzed"],
+            "cached": workspace["cached"],
+        }
+
+    def format_pre_review(self, review: Dict, chunk_reviews: Optional[Dict[str, List[Dict]]] = None) -> str:
+        """
+        Render pre-review findings for the model
+
+        Args:
+            review: Result of review_code
+            chunk_reviews: {filepath: merged chunk findings} from review_large_files;
+                these files are shown with their chunk findings instead of code regions
+
+        Returns:
+            Prompt text
+        """
+        chunk_reviews = chunk_reviews or {}
+        flagged = {a["filepath"] for a in review["flagged"]}
+        shown = [a for a in review["results"] if a["filepath"] in flagged or chunk_reviews.get(a["filepath"])]
+        clean = review["files_reviewed"] - len(shown)
+        lines = [
+            f"STATIC PRE-REVIEW: {review['files_reviewed']} code files analyzed, "
+            f"{len(shown)} flagged, {clean} passed all checks (not shown)."
+        ]
+
+        for analysis in shown:
+            filepath = analysis["filepath"]
+            lines.append(f"\n## {filepath} (score {analysis.get('overall_score', 0):.0f})")
+            for line, label, message in self._file_findings(analysis):
+                lines.append(f"- L{line} [{label}] {message}" if line else f"- [{label}] {message}")
+
+            if filepath in chunk_reviews:
+                lines.append("Chunk-by-chunk model review of this large file (code not shown):")
+                for finding in chunk_reviews[filepath]:
+                    fix = f" Fix: {finding['fix']}" if finding.get("fix") else ""
+                    lines.append(f"- L{finding['line']} [{finding['severity']}] {finding['issue']}{fix}")
+                continue
+
+            if analysis.get("full_review"):
+                lines.append("Static analysis failed for this file: read it with read_file and review all of it.")
+                continue
+
+            for start, region in analysis.get("regions", []):
+                lines.append(f"```\n{self._number_lines(region, start)}\n```")
+
+        return "\n".join(lines)
+
+    def review_large_files(self, review: Dict) -> Dict:
+        """
+        Map-reduce review of files longer than Config.REVIEW_LARGE_FILE_LINES
+
+        Map: each file is split into function/class chunks that are reviewed
+        by the model in parallel. Chunk results are cached by chunk content
+        (with line numbers stored relative to the chunk), so editing one
+        function only re-reviews that function. Reduce: chunk findings are
+        re-based to file line numbers, de-duplicated and ordered by severity.
+
+        Args:
+            review: Result of review_code
+
+        Returns:
+            Dict with 'files' ({filepath: findings}), 'chunks' and 'cached'
+        """
+        base_dir = Path(self.tools["file_ops"].base_dir)
+        cache = JsonCache(base_dir / Config.STATE_DIR_NAME / "cache" / "review_chunks.json")
+
+        jobs = []  # (filepath, chunk, static findings, cache key)
+        files: Dict[str, List[Dict]] = {}
+        chunk_results: Dict[str, List[Tuple[Dict, List[Dict]]]] = {}
+        for analysis in review["results"]:
+            try:
+                code = (base_dir / analysis["filepath"]).read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            if code.count("\n") + 1 <= Config.REVIEW_LARGE_FILE_LINES:
+                continue
+
+            filepath = analysis["filepath"]
+            files[filepath] = []
+            chunk_results[filepath] = []
+            findings = self._file_findings(analysis)
+            for chunk in split_into_chunks(code, filepath, Config.REVIEW_CHUNK_LINES):
+                static = [
+                    {"line": line - chunk["start"], "label": label, "message": message}
+                    for line, label, message in findings
+                    if line and chunk["start"] <= line <= chunk["end"]
+                ]
+                key = cache_key(CHUNK_REVIEW_VERSION, Config.GROQ_MODEL, chunk["text"], static)
+                cached = cache.get(key)
+                if cached is not None:
+                    chunk_results[filepath].append((chunk, cached))
+                else:
+                    jobs.append((filepath, chunk, static, key))
+
+        if jobs:
+            workers = max(1, min(Config.MAX_PARALLEL_REVIEWS, len(jobs)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                reviewed = list(pool.map(lambda job: self._review_chunk(*job[:3]), jobs))
+            for (filepath, chunk, _, key), (relative, ok) in zip(jobs, reviewed):
+                if ok:
+                    cache.set(key, relative)
+                chunk_results[filepath].append((chunk, relative))
+            cache.save()
+
+        for filepath, results in chunk_results.items():
+            files[filepath] = self._merge_chunk_findings(results)
+
+        return {"files": files, "chunks": sum(len(r) for r in chunk_results.values()), "cached": cache.hits}
+
+    def _review_chunk(self, filepath: str, chunk: Dict, static: List[Dict]) -> Tuple[List[Dict], bool]:
+        """Map step: review one chunk; returns (findings with chunk-relative lines, succeeded)"""
+        notes = "\n".join(
+            f"- L{chunk['start'] + s['line']} [{s['label']}] {s['message']}" for s in static
+        ) or "- none"
+        message = (
+            f"File: {filepath}\nChunk: {chunk['name']} (lines {chunk['start']}-{chunk['end']})\n"
+            f"Static analysis findings:\n{notes}\n\n```\n{self._number_lines(chunk['text'], chunk['start'])}\n```"
+        )
+        messages = [{"role": "system", "content": CHUNK_REVIEW_PROMPT}, {"role": "user", "content": message}]
+
+        try:
+            response = self.groq_client.chat(messages, temperature=0.2, max_tokens=1024)["content"]
+        except Exception as e:
+            return [{"line": 0, "severity": "low", "issue": f"Chunk review failed: {e}", "fix": ""}], False
+
+        match = re.search(r"\[.*\]", response, re.DOTALL)
+        try:
+            items = json.loads(match.group(0)) if match else []
+        except json.JSONDecodeError:
+            return [{"line": 0, "severity": "low", "issue": "Chunk review returned invalid JSON", "fix": ""}], False
+
+        findings = []
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict) or not item.get("issue"):
+                continue
+            try:
+                line = int(item.get("line") or chunk["start"])
+            except (TypeError, ValueError):
+                line = chunk["start"]
+            findings.append({
+                "line": min(max(line, chunk["start"]), chunk["end"]) - chunk["start"],
+                "severity": str(item.get("severity", "low")).lower(),
+                "issue": str(item["issue"]),
+                "fix": str(item.get("fix", "")),
+            })
+        return findings, True
+
+    @staticmethod
+    def _merge_chunk_findings(results: List[Tuple[Dict, List[Dict]]]) -> List[Dict]:
+        """Reduce step: file line numbers, no duplicates, most severe first"""
+        merged = {}
+        for chunk, findings in results:
+            for finding in findings:
+                line = chunk["start"] + finding["line"]
+                key = (line, finding["issue"].strip().lower())
+                merged.setdefault(key, {**finding, "line": line})
+        return sorted(merged.values(), key=lambda f: (SEVERITY_ORDER.get(f["severity"], 3), f["line"]))
+
+    def _file_findings(self, analysis: Dict) -> List[Tuple[Optional[int], str, str]]:
+        """All findings of one file as (line, label, message)"""
+        if "error" in analysis:
+            return [(None, "error", analysis["error"])]
+
+        items = []
+        for issue in analysis.get("syntax", {}).get("issues", []):
+            items.append((self._issue_line(issue), "syntax", issue))
+        for function in analysis.get("complexity", {}).get("functions", []):
+            if function["complexity"] > 15:
+                items.append(
+                    (function["line"], "complexity", f"Complexity {function['complexity']} in {function['name']}")
+                )
+        for section in ["security", "best_practices"]:
+            for finding in analysis.get(section, {}).get("findings", []):
+                items.append(
+                    (finding["line"], f"{finding['rule']} {finding['severity']}", finding["message"])
+                )
+        for issue in analysis.get("maintainability", {}).get("issues", []):
+            items.append((None, "maintainability", issue))
+        items.sort(key=lambda item: item[0] or 0)
+        return items
+
+    def _flagged_spans(self, analysis: Dict) -> List[Tuple[int, int]]:
+        """Line spans (1-based, inclusive) that need review; empty if the file is fine"""
+        spans = []
+        for issue in analysis.get("syntax", {}).get("issues", []):
+            line = self._issue_line(issue) or 1
+            spans.append((line - REGION_CONTEXT, line + REGION_CONTEXT))
+        for function in analysis.get("complexity", {}).get("functions", []):
+            if function["complexity"] > 15:
+                end = function.get("end_line") or function["line"]
+                spans.append((function["line"], min(end, function["line"] + MAX_REGION_LINES - 1)))
+        for section in ["security", "best_practices"]:
+            for finding in analysis.get(section, {}).get("findings", []):
+                if finding["severity"] not in LIST_ONLY_SEVERITIES:
+                    spans.append((finding["line"] - REGION_CONTEXT, finding["line"] + REGION_CONTEXT))
+        return self._merge_spans(spans)
+
+    @staticmethod
+    def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted((max(1, s), e) for s, e in spans):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _read_regions(path: Path, spans: List[Tuple[int, int]]) -> List[Tuple[int, str]]:
+        """Source text of each span as (first line number, text)"""
+        try:
+            lines = path.read_text(encoding="utf-8").split("\n")
+        except (OSError, UnicodeDecodeError):
+            return []
+        return [(start, "\n".join(lines[start - 1:end])) for start, end in spans if start <= len(lines)]
+
+    @staticmethod
+    def _number_lines(text: str, start: int) -> str:
+        return "\n".join(f"{start + i:4d} | {line}" for i, line in enumerate(text.split("\n")))
+
+    @staticmethod
+    def _issue_line(issue: str) -> Optional[int]:
+        match = re.search(r"\bline (\d+)", issue, re.I)
+        return int(match.group(1)) if match else None
+
+    def _clean_report(self, review: Dict) -> str:
+        """code-review.md for a workspace with no flagged files"""
+        lines = [
+            "# Code Review",
+            "",
+            f"Static analysis of {review['files_reviewed']} code files found no problems needing review.",
+            "",
+            "| File | Score |",
+            "| --- | --- |",
+        ]
+        for analysis in review["results"]:
+            lines.append(f"| {analysis['filepath']} | {analysis.get('overall_score', 0):.0f} |")
+
+        notes = [
+            f"- {analysis['filepath']}" + (f" L{line}" if line else "") + f": {message}"
+            for analysis in review["results"]
+            for line, _, message in self._file_findings(analysis)
+        ]
+        if notes:
+            lines.extend(["", "## Minor notes", ""] + notes)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,90 @@
+"""
+Per-agent context slices: an agent's prompt carries only the context it consumes
+"""
+from typing import Dict, List, Optional
+
+# Shown separately in every agent's PATH INFORMATION block
+PATH_KEYS = ["output_dir", "user_working_dir"]
+
+# Bookkeeping that no agent needs in its prompt
+INTERNAL_KEYS = ["summarized_at", "original_context_size"]
+
+
+def slice_context(context: Dict, consumes: Optional[List[str]]) -> Dict:
+    """
+    Select the context an agent consumes
+
+    Names are plain context keys ("requirements", "design_spec",
+    "context_summary", an agent key such as "Architect") or derived slices:
+
+    - tech_stack: the plan's tech stack
+    - phases: the plan's phases as name and agents only
+    - files: every file written so far (from agent artifacts and the summary)
+    - results: every previous agent's summary (their files are in "files")
+
+    Agent results are compacted to their summary and the files they wrote.
+
+    Args:
+        context: Accumulated run context
+        consumes: Names to select, or None for the whole context (compacted)
+
+    Returns:
+        The selected slice; empty values are left out
+    """
+    if consumes is None:
+        names = [k for k in context if k not in PATH_KEYS and k not in INTERNAL_KEYS]
+    else:
+        names = consumes
+
+    sliced = {}
+    for name in names:
+        value = _resolve(context, name)
+        if value not in (None, "", [], {}):
+            sliced[name] = value
+    return sliced
+
+
+def agent_results(context: Dict) -> Dict[str, Dict]:
+    """Results of the agents that already ran, by agent key"""
+    return {k: v for k, v in context.items() if _is_agent_result(v)}
+
+
+def compact_result(result: Dict, files: bool = True) -> Dict:
+    """An agent result reduced to what other agents use: summary and (optionally) files written"""
+    compact = {"summary": result.get("summary", "")}
+    if result.get("status") != "completed":
+        compact["status"] = result.get("status")
+    written = [path for path, status in (result.get("artifacts") or {}).items() if status != "failed"]
+    if files and written:
+        compact["files"] = written
+    return compact
+
+
+def _resolve(context: Dict, name: str):
+    if name == "tech_stack":
+        return (context.get("plan") or {}).get("tech_stack")
+    if name == "phases":
+        return [{"name": p.get("name"), "agents": p.get("agents")} for p in (context.get("plan") or {}).get("phases", [])]
+    if name == "files":
+        return _files(context)
+    if name == "results":
+        return {key: compact_result(result, files=False) for key, result in agent_results(context).items()}
+
+    value = context.get(name)
+    if _is_agent_result(value):
+        return compact_result(value)
+    return value
+
+
+def _files(context: Dict) -> List[str]:
+    files = []
+    summary = context.get("context_summary")
+    if isinstance(summary, dict):
+        files.extend(f for f in summary.get("files_created") or [] if isinstance(f, str))
+    for result in agent_results(context).values():
+        files.extend(path for path, status in (result.get("artifacts") or {}).items() if status != "failed")
+    return list(dict.fromkeys(files))  # Unique, in creation order
+
+
+def _is_agent_result(value) -> bool:
+    return isinstance(value, dict) and "status" in value and "summary" in value and "artifacts" in value
@@ -1,7 +1,31 @@
 """
 Context Summarizer Agent - Compresses context to prevent unbounded growth
 """
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+import json
+import re
+
+from ..config import Config
+from ..utils.disk_cache import cache_key
 from .base import BaseAgent
+from .context_slices import INTERNAL_KEYS, PATH_KEYS, agent_results, compact_result
+from .prompt_format import get_serializer
+
+# Context fields with no content worth summarizing (design_spec is carried next to the summary)
+METADATA_KEYS = PATH_KEYS + INTERNAL_KEYS + ["complexity", "project_type", "design_spec", "context_metadata"]
+
+# Repeated text or structures at least this long are kept once
+DEDUPE_MIN_CHARS = 80
+
+# Sections of a precompressed context that must keep their type (never replaced by a reference)
+STRUCTURAL_KEYS = ["requirements", "tech_stack", "phases", "previous_summary", "results"]
+
+# Summary fields that describe the whole project: set once, not overwritten by later results
+STABLE_FIELDS = ["project_summary", "requirements"]
+
+# Fingerprints of summarized results remembered in the summary's metadata
+MAX_FINGERPRINTS = 200
 
 
 class ContextSummarizerAgent(BaseAgent):
@@ -94,7 +118,16 @@ Be extremely concise but comprehensive. Every key fact must be preserved."""
 
     def summarize_context(self, context: dict) -> dict:
         """
-        Summarize accumulated context
+        Summarize accumulated context incrementally
+
+        Only agent results added since the last summary are summarized;
+        the result is merged into the existing summary field by field (see
+        merge_summaries), so earlier detail is never regenerated. The new
+        results are first compressed locally (see precompress_context) and
+        the LLM is only asked when that is still over
+        Config.CONTEXT_SUMMARY_BUDGET characters. Inputs larger than
+        Config.SUMMARIZER_WINDOW_CHARS are split into chunks summarized in
+        parallel and merged the same way.
 
         Args:
             context: Full context dict from all previous agents
@@ -102,52 +135,45 @@ Be extremely concise but comprehensive. Every key fact must be preserved."""
         Returns:
             Compressed context dict with summary
         """
-        import json
-
         # Calculate context size
         context_str = json.dumps(context, default=str)
         original_size = len(context_str)
 
-        # Build task description
-        task = f"""Summarize the following accumulated context from the AI Dev Team workflow.
-
-The context currently contains results from multiple agents and is approximately {original_size:,} characters.
-
-CRITICAL: Preserve ALL essential information while reducing size by 70-80%.
-
-Current Context to Summarize:
-{json.dumps(context, indent=2, default=str)}"""
-
-        # Execute summarization
-        result = self.execute(task, context={"complexity": "medium"})
-
-        # Extract JSON summary from result
-        import re
-        summary_json = None
-        for msg in reversed(self.conversation_history):
-            if msg["role"] == "assistant":
-                json_match = re.search(r"\{.*\}", msg["content"], re.DOTALL)
-                if json_match:
-                    try:
-                        summary_json = json.loads(json_match.group(0))
-                        break
-                    except json.JSONDecodeError:
-                        pass
-
-        # If parsing failed, create basic summary
-        if not summary_json:
-            summary_json = {
-                "project_summary": context.get("requirements", "Project")[:200],
-                "requirements": context.get("requirements", ""),
-                "tech_stack": context.get("plan", {}).get("tech_stack", {}),
-                "architecture": {},
-                "files_created": [],
-                "completed_work": [f"{k}: completed" for k in context.keys() if k.endswith("Engineer")],
-                "context_metadata": {
-                    "original_size_estimate": f"~{original_size:,} chars",
-                    "note": "Fallback summary used"
-                }
-            }
+        previous = context.get("context_summary") if isinstance(context.get("context_summary"), dict) else {}
+        previous_meta = previous.get("context_metadata") if isinstance(previous.get("context_metadata"), dict) else {}
+        summarized = list(previous_meta.get("summarized_results") or [])
+
+        # Results already merged into the summary (e.g. carried over by session context) are skipped
+        fresh, fingerprints = {}, []
+        agents = agent_results(context)
+        for key, value in context.items():
+            if key == "context_summary":
+                continue
+            if key in agents:
+                fingerprint = result_fingerprint(key, value)
+                if fingerprint in summarized:
+                    continue
+                fingerprints.append(fingerprint)
+            fresh[key] = value
+
+        compressed = precompress_context(fresh)
+        precompressed_size = len(json.dumps(compressed, default=str))
+
+        # Deterministic part: requirements, tech stack, files written and one line per agent
+        delta = local_summary(compressed)
+        method = "local"
+        chunks = 0
+        if precompressed_size > Config.CONTEXT_SUMMARY_BUDGET:
+            llm_delta, chunks = self._summarize_new_results(compressed)
+            if llm_delta:
+                method = "llm"
+                # The model's wording replaces the per-agent lines; no written file may be lost
+                delta = merge_summaries(
+                    {k: v for k, v in delta.items() if k not in ["completed_work", "files_created"]}, llm_delta
+                )
+                delta = merge_summaries(delta, {"files_created": local_summary(compressed)["files_created"]})
+
+        summary_json = merge_summaries(previous, delta)
 
         # Calculate compression
         summary_str = json.dumps(summary_json, default=str)
@@ -155,25 +181,100 @@ Current Context to Summarize:
         compression_ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
 
         # Add metadata
-        if "context_metadata" not in summary_json:
-            summary_json["context_metadata"] = {}
-
-        summary_json["context_metadata"].update({
+        summary_json["context_metadata"] = {
             "original_size": original_size,
+            "precompressed_size": precompressed_size,
             "compressed_size": compressed_size,
             "compression_ratio": f"{compression_ratio:.1f}%",
+            "method": method,
+            "chunks": chunks,
+            "agents_summarized": list(dict.fromkeys(
+                list(previous_meta.get("agents_summarized") or []) + list(compressed.get("results", {}))
+            )),
+            "summarized_results": (summarized + fingerprints)[-MAX_FINGERPRINTS:],
             "timestamp": str(__import__('datetime').datetime.now())
-        })
+        }
 
         return {
             "status": "summarized",
             "summary": summary_json,
+            "method": method,
+            "new_results": len(fingerprints),
+            "chunks": chunks,
             "original_size": original_size,
+            "precompressed_size": precompressed_size,
             "compressed_size": compressed_size,
             "compression_ratio": compression_ratio,
-            "agent_result": result
         }
 
+    def _summarize_new_results(self, compressed: Dict) -> Tuple[Dict, int]:
+        """
+        Map-reduce LLM summary of new results
+
+        Map: the results are packed into chunks of at most
+        Config.SUMMARIZER_WINDOW_CHARS, summarized in parallel. Reduce:
+        chunk summaries are merged field by field, in result order.
+
+        Returns:
+            (merged summary of the chunks that succeeded, number of chunk calls)
+        """
+        shared = {k: v for k, v in compressed.items() if k in ["requirements", "tech_stack", "phases"]}
+        units = [("results", {agent: result}) for agent, result in compressed.get("results", {}).items()]
+        units += [(key, value) for key, value in compressed.items() if key not in shared and key != "results"]
+        if not units:
+            return {}, 0
+
+        chunks = []
+        budget = max(1, Config.SUMMARIZER_WINDOW_CHARS - len(json.dumps(shared, default=str)))
+        for key, value in units:
+            size = len(json.dumps({key: value}, default=str))
+            if not chunks or chunks[-1][1] + size > budget:
+                chunks.append([{}, 0])
+            chunk = chunks[-1]
+            if key == "results":
+                chunk[0].setdefault("results", {}).update(value)
+            else:
+                chunk[0][key] = value
+            chunk[1] += size
+
+        workers = max(1, min(Config.MAX_PARALLEL_SUMMARIES, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(lambda chunk: self._summarize_chunk(shared, chunk[0]), chunks))
+
+        merged = {}
+        for summary in summaries:
+            if summary:
+                merged = merge_summaries(merged, summary)
+        return merged, len(chunks)
+
+    def _summarize_chunk(self, shared: Dict, chunk: Dict) -> Optional[Dict]:
+        """Map step: summarize one chunk of new results; None if the call or its JSON failed"""
+        serializer = get_serializer(self.prompt_format)
+        message = f"""Summarize ONLY the following new agent results from the AI Dev Team workflow.
+They will be merged into the existing project summary, so do not restate the requirements or tech stack.
+
+Project:
+{serializer.dumps(shared)}
+
+New Results:
+{serializer.dumps(chunk)}"""
+        messages = [{"role": "system", "content": self.system_prompt}, {"role": "user", "content": message}]
+
+        try:
+            response = self.groq_client.chat(messages, temperature=0.3, max_tokens=2048)["content"]
+        except Exception:
+            return None
+
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        try:
+            summary = json.loads(match.group(0)) if match else None
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(summary, dict):
+            return None
+        summary.pop("context_metadata", None)
+        return summary
+
     def should_summarize(self, context: dict, threshold_chars: int = 10000) -> bool:
         """
         Check if context should be summarized
@@ -188,3 +289,186 @@ Current Context to Summarize:
         import json
         context_str = json.dumps(context, default=str)
         return len(context_str) > threshold_chars
+
+
+def precompress_context(context: Dict) -> Dict:
+    """
+    Deterministic compression of a run context, before any LLM call
+
+    - Metadata is dropped: paths, complexity, timestamps, iteration counts,
+      the previous summary's context_metadata, and design_spec (carried
+      verbatim next to the summary anyway)
+    - The plan is reduced to its tech stack and phase names
+    - Agent results become their summary (truncated to
+      Config.SUMMARY_MAX_CHARS) and the list of files they wrote
+    - Repeated copies of the same text or structure (requirements, plans
+      carried over from a session or a previous summary) are kept once
+
+    Args:
+        context: Full run context
+
+    Returns:
+        Compressed context: requirements, tech_stack, phases,
+        previous_summary, results and any other keys
+    """
+    plan = context.get("plan") or {}
+    compressed = {
+        "requirements": context.get("requirements"),
+        "tech_stack": plan.get("tech_stack"),
+        "phases": [phase.get("name") for phase in plan.get("phases", [])],
+    }
+
+    previous = context.get("context_summary")
+    if isinstance(previous, dict):
+        previous = {k: v for k, v in previous.items() if k not in METADATA_KEYS}
+    compressed["previous_summary"] = previous
+
+    agents = agent_results(context)
+    results = {}
+    for key, value in context.items():
+        if key in compressed or key in ["plan", "context_summary"] or key in METADATA_KEYS:
+            continue
+        if key in agents:
+            result = compact_result(value)
+            result["summary"] = _truncate(result.get("summary") or "", Config.SUMMARY_MAX_CHARS)
+            results[key] = result
+        else:
+            compressed[key] = value
+    compressed["results"] = results
+
+    compressed = _dedupe(compressed, "", {})
+    return {k: v for k, v in compressed.items() if v not in (None, "", [], {})}
+
+
+def local_summary(compressed: Dict) -> Dict:
+    """
+    Summary in the summarizer's JSON format built from a precompressed context, without the LLM
+
+    This context's results become files_created and one completed_work
+    line per agent; they are merged into the previous summary, if any.
+
+    Args:
+        compressed: Output of precompress_context
+
+    Returns:
+        Summary dict
+    """
+    delta = {}
+    requirements = compressed.get("requirements")
+    if isinstance(requirements, str) and requirements:
+        delta["project_summary"] = requirements.strip().split("\n")[0][:200]
+        delta["requirements"] = requirements
+    if compressed.get("tech_stack"):
+        delta["tech_stack"] = compressed["tech_stack"]
+
+    files, completed = [], []
+    for agent, result in compressed.get("results", {}).items():
+        if not isinstance(result, dict):
+            continue
+        written = result.get("files")
+        if isinstance(written, list):
+            files.extend(path for path in written if isinstance(path, str))
+        status = f" ({result['status']})" if result.get("status") else ""
+        completed.append(f"{agent}{status}: {result.get('summary', '')}")
+    delta["files_created"] = list(dict.fromkeys(files))  # Agents may rewrite the same files
+    delta["completed_work"] = completed
+
+    for key, value in compressed.items():
+        if key not in ["requirements", "tech_stack", "phases", "previous_summary", "results"]:
+            delta[key] = value
+    return merge_summaries(compressed.get("previous_summary") or {}, delta)
+
+
+def merge_summaries(base: Dict, update: Dict) -> Dict:
+    """
+    Merge a summary of newer work into an existing summary, field by field
+
+    - Lists are unioned in order; files_created entries are matched by
+      path and an entry with a purpose replaces a bare path
+    - Nested dicts (tech_stack, architecture, dependencies) merge recursively
+    - Text fields: project_summary and requirements keep their first
+      value, others take the newer value
+    - context_metadata is left to the caller
+
+    Args:
+        base: Existing summary
+        update: Summary of the new results
+
+    Returns:
+        Merged summary (new dict)
+    """
+    merged = dict(base)
+    for key, value in update.items():
+        if key == "context_metadata" or value in (None, "", [], {}):
+            continue
+        current = merged.get(key)
+        if current in (None, "", [], {}):
+            merged[key] = value
+        elif isinstance(current, dict) and isinstance(value, dict):
+            merged[key] = merge_summaries(current, value)
+        elif isinstance(current, list) and isinstance(value, list):
+            merged[key] = _merge_lists(current, value)
+        elif isinstance(current, list):
+            merged[key] = _merge_lists(current, [value])
+        elif key not in STABLE_FIELDS:
+            merged[key] = value
+    return merged
+
+
+def result_fingerprint(agent: str, result: Dict) -> str:
+    """Short content fingerprint of an agent result, to recognize results already summarized"""
+    return cache_key(agent, compact_result(result))[:16]
+
+
+def _merge_lists(current: list, new: list) -> list:
+    merged = list(current)
+    index = {_list_key(item): i for i, item in enumerate(merged)}
+    for item in new:
+        key = _list_key(item)
+        if key not in index:
+            index[key] = len(merged)
+            merged.append(item)
+        elif isinstance(item, dict) and not isinstance(merged[index[key]], dict):
+            merged[index[key]] = item  # {"path", "purpose"} over a bare path
+    return merged
+
+
+def _list_key(item) -> str:
+    if isinstance(item, dict) and isinstance(item.get("path"), str):
+        return item["path"]
+    return item if isinstance(item, str) else json.dumps(item, sort_keys=True, default=str)
+
+
+def _dedupe(value, path: str, seen: Dict[str, str], replaceable: bool = True):
+    """
+    Replace repeats of long strings and structures with a reference to the first copy
+
+    The top-level sections keep their type (they are only looked into) and
+    agent results are left as they are, since local_summary reads their
+    summary and files list directly.
+    """
+    if isinstance(value, (str, dict, list)):
+        fingerprint = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+        if len(fingerprint) >= DEDUPE_MIN_CHARS:
+            if replaceable and fingerprint in seen:
+                return f"(same as {seen[fingerprint]})"
+            seen.setdefault(fingerprint, path or "context")
+    if isinstance(value, dict):
+        deduped = {}
+        for k, v in value.items():
+            child = f"{path}.{k}" if path else str(k)
+            if path == "results":
+                deduped[k] = v  # Agent results are kept whole: their summary and files become summary lines
+            else:
+                structural = not path and k in STRUCTURAL_KEYS
+                deduped[k] = _dedupe(v, child, seen, replaceable=not structural)
+        return deduped
+    if isinstance(value, list):
+        return [_dedupe(v, f"{path}[{i}]", seen) for i, v in enumerate(value)]
+    return value
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit].rstrip()} ... [{len(text) - limit:,} chars cut]"
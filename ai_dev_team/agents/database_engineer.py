@@ -5,6 +5,8 @@ from .base import BaseAgent
 class DatabaseEngineerAgent(BaseAgent):
     """Database Engineer that designs schemas"""
 
+    consumes = ["requirements", "tech_stack", "ProductManager", "Architect", "files", "context_summary"]
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="Database Engineer",
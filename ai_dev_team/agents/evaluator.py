@@ -5,6 +5,8 @@ from .base import BaseAgent
 class EvaluatorAgent(BaseAgent):
     """Evaluator that validates final outputs"""
 
+    consumes = ["requirements", "project_type", "tech_stack", "phases", "results", "files", "context_summary"]
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="Evaluator",
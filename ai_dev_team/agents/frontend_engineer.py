@@ -5,6 +5,11 @@ from .base import BaseAgent
 class FrontendEngineerAgent(BaseAgent):
     """Frontend Engineer that builds UIs"""
 
+    consumes = [
+        "requirements", "tech_stack", "design_spec", "ProductManager", "Architect", "BackendEngineer", "files",
+        "context_summary",
+    ]
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="Frontend Engineer",
@@ -37,6 +42,12 @@ Create proper directory structure:
 - src/services/
 - src/utils/
 
+If the context has a "design_spec", it is the component tree extracted from
+the design mockup (layout regions, components, visible text, style). Build
+the UI from it; there is no need to call extract_ui_components again. When
+several designs were given it is a list with one tree per screen, each
+named by its "image".
+
 Use write_file to create all necessary files.
 
 When done, respond:
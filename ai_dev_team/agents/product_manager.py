@@ -5,6 +5,8 @@ from .base import BaseAgent
 class ProductManagerAgent(BaseAgent):
     """Product Manager that refines requirements"""
 
+    consumes = ["requirements", "project_type", "tech_stack", "design_spec", "context_summary"]
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="Product Manager",
@@ -0,0 +1,189 @@
+"""
+Prompt serialization: compact renderings of context and tool results for the model
+
+Context dicts and tool results are rendered for the model separately from
+the console. Serializers turn nested dicts and lists into prompt text, and
+terse_tool_result strips the decoration (emoji, size and line counts)
+that tool results carry for humans. The rich text stays in the tool log,
+artifact tracking and approval prompts.
+"""
+from typing import Dict, List, Optional
+import json
+import re
+
+from ..config import Config
+
+# Rough characters per token of English text and code, for savings estimates
+CHARS_PER_TOKEN = 4
+
+
+class PromptSerializer:
+    """Renders structured data (context, plans) as prompt text"""
+
+    name = ""
+
+    def dumps(self, data) -> str:
+        raise NotImplementedError
+
+
+class PrettyJsonSerializer(PromptSerializer):
+    """Indented JSON (the previous prompt format)"""
+
+    name = "pretty"
+
+    def dumps(self, data) -> str:
+        return json.dumps(data, indent=2, default=str)
+
+
+class CompactJsonSerializer(PromptSerializer):
+    """JSON without indentation or padding; non-ASCII text is kept as is"""
+
+    name = "json"
+
+    def dumps(self, data) -> str:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class KeyPathSerializer(PromptSerializer):
+    """
+    One 'key.path: value' line per leaf, e.g.
+
+        tech_stack.frontend: React
+        phases[0].agents: Architect, BackendEngineer
+        Architect.summary: |
+          Designed the API
+          and the schema
+
+    Lists of scalars are joined with ', ' (JSON if an item holds a comma or
+    newline); multi-line strings are indented under their key.
+    """
+
+    name = "keypath"
+
+    def dumps(self, data) -> str:
+        lines: List[str] = []
+        self._flatten(data, "", lines)
+        return "\n".join(lines)
+
+    def _flatten(self, value, path: str, lines: List[str]):
+        if isinstance(value, dict):
+            if not value:
+                lines.append(f"{path}: {{}}")
+            for key, item in value.items():
+                self._flatten(item, f"{path}.{key}" if path else str(key), lines)
+        elif isinstance(value, (list, tuple)):
+            if all(_is_scalar(item) for item in value):
+                lines.append(f"{path}: {self._scalar_list(value)}")
+            else:
+                for i, item in enumerate(value):
+                    self._flatten(item, f"{path}[{i}]", lines)
+        elif isinstance(value, str) and "\n" in value:
+            lines.append(f"{path}: |")
+            lines.extend(f"  {line}" for line in value.splitlines())
+        else:
+            lines.append(f"{path}: {_scalar(value)}" if path else _scalar(value))
+
+    def _scalar_list(self, items) -> str:
+        if not items:
+            return "[]"
+        texts = [_scalar(item) for item in items]
+        if any("," in text or "\n" in text or not text for text in texts):
+            return json.dumps(list(items), ensure_ascii=False, default=str)
+        return ", ".join(texts)
+
+
+SERIALIZERS: Dict[str, PromptSerializer] = {
+    serializer.name: serializer
+    for serializer in [PrettyJsonSerializer(), CompactJsonSerializer(), KeyPathSerializer()]
+}
+
+
+def get_serializer(name: Optional[str] = None) -> PromptSerializer:
+    """
+    Look up a prompt serializer
+
+    Args:
+        name: "json", "keypath" or "pretty" (defaults to Config.PROMPT_FORMAT)
+
+    Returns:
+        PromptSerializer; unknown names fall back to compact JSON
+    """
+    return SERIALIZERS.get(name or Config.PROMPT_FORMAT, SERIALIZERS["json"])
+
+
+# Leading status emoji and the word the model sees instead; other decorative emoji are dropped
+STATUS_WORDS = {"✅": "ok:", "❌": "error:", "🚫": "error:", "⚠️": "warn:"}
+DECORATIVE = ["📄", "📂", "📁", "🔍", "📋", "📜", "⏳", "⏭️", "🛑", "⏱️", "🔄"]
+
+# Human-oriented details of write results
+WRITE_DETAILS = re.compile(r" \((?:\d+ chars, \d+ lines|identical content, write skipped)\)$")
+LISTING_SIZE = re.compile(r" \(\d+ bytes\)$")
+READ_HEADER = re.compile(r"📄 File: (.+) \(\d+ chars, \d+ lines\)\n\n", re.DOTALL)
+
+
+def terse_tool_result(tool_name: str, result: str) -> str:
+    """
+    Render a tool result for the model
+
+    Status emoji become words (ok/error/warn), decorative emoji, sizes and
+    line counts are dropped and blank-line runs collapse. File content
+    returned by read_file is passed through unchanged.
+
+    Args:
+        tool_name: Tool that produced the result
+        result: The tool's (console) result text
+
+    Returns:
+        Compact result text
+    """
+    if not isinstance(result, str):
+        return str(result)
+
+    if tool_name == "read_file":
+        match = READ_HEADER.match(result)
+        if match:
+            return f"{match.group(1)}:\n{result[match.end():]}"
+        return _terse_line(result)
+
+    lines = []
+    for i, line in enumerate(result.split("\n")):
+        # Tool-written lines start with an emoji; other lines (command output, matches) are kept
+        if i == 0 or _starts_with_emoji(line.lstrip()):
+            indent = line[:len(line) - len(line.lstrip())]
+            line = indent + _terse_line(line.lstrip())
+            if tool_name == "list_files":
+                line = LISTING_SIZE.sub("", line)
+            elif tool_name in ["write_file", "write_files"]:
+                line = WRITE_DETAILS.sub("", line)
+        if line.strip() or (lines and lines[-1].strip()):
+            lines.append(line)
+    return "\n".join(lines).strip("\n")
+
+
+def saved_chars(rich: str, terse: str) -> int:
+    """Characters a compact rendering saves over the rich one"""
+    return max(0, len(rich) - len(terse))
+
+
+def _terse_line(line: str) -> str:
+    for emoji, word in STATUS_WORDS.items():
+        if line.startswith(emoji):
+            return f"{word} {line[len(emoji):].lstrip()}"
+    for emoji in DECORATIVE:
+        if line.startswith(emoji):
+            return line[len(emoji):].lstrip()
+    return line
+
+
+def _starts_with_emoji(line: str) -> bool:
+    return any(line.startswith(emoji) for emoji in list(STATUS_WORDS) + DECORATIVE)
+
+
+def _is_scalar(value) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _scalar(value) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
@@ -5,6 +5,8 @@ from .base import BaseAgent
 class QAEngineerAgent(BaseAgent):
     """QA Engineer that tests functionality"""
 
+    consumes = ["requirements", "tech_stack", "Architect", "BackendEngineer", "files", "context_summary"]
+
     def __init__(self, groq_client, tools, human_loop):
         super().__init__(
             name="QA Engineer",
@@ -7,13 +7,19 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 from rich.markdown import Markdown
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import json
+import time
 
 from .config import Config
 from .groq_client import GroqClient
 from .tools import FileOperations, TerminalOperations, VisionOperations
-from .utils import HumanLoop
+from .utils import ApprovalPolicy, ApprovalQueue, HumanLoop
+from .utils.approval_queue import send_command
+from .utils.agent_cache import AgentResultCache
+from .utils.checkpoint import RunCheckpoint, list_runs, prune_runs
 from .agents import (
     OrchestratorAgent,
     ProductManagerAgent,
@@ -55,7 +61,14 @@ def _save_clipboard_image() -> str:
 class AIDevTeam:
     """Main orchestrator for the AI development team"""
 
-    def __init__(self, output_dir: Path, auto_approve: bool = False, verbose: bool = False):
+    def __init__(
+        self,
+        output_dir: Path,
+        auto_approve: bool = False,
+        verbose: bool = False,
+        policy_path: str = None,
+        approval_queue: bool = None,
+    ):
         self.output_dir = output_dir.resolve()  # Get absolute path
         self.verbose = verbose
         self.session_context = {}  # Persistent context across commands
@@ -64,13 +77,37 @@ class AIDevTeam:
         console.print("[bold blue]🚀 Initializing AI Dev Team...[/bold blue]")
         console.print(f"[dim]Output directory: {self.output_dir}[/dim]\n")
 
-        self.groq_client = GroqClient()
-        self.human_loop = HumanLoop(auto_approve=auto_approve)
+        self.groq_client = GroqClient(cache_dir=self.output_dir / Config.STATE_DIR_NAME / "cache")
+        # Queued approvals are answered from another terminal while agents keep working
+        self.approval_queue = None
+        use_queue = approval_queue if approval_queue is not None else Config.APPROVAL_MODE == "queue"
+        if use_queue:
+            self.approval_queue = ApprovalQueue(self.output_dir / Config.STATE_DIR_NAME)
+            self.approval_queue.start()
+            console.print(
+                f"[dim]Approvals are queued; answer them with: "
+                f"ai-dev-team-approve --output {self.output_dir} approve <id>|all[/dim]"
+            )
+
+        self.human_loop = HumanLoop(
+            auto_approve=auto_approve,
+            policy=self._load_policy(policy_path),
+            log_path=self.output_dir / Config.STATE_DIR_NAME / "approvals.jsonl",
+            queue=self.approval_queue,
+        )
 
         # Initialize tools
         self.file_ops = FileOperations(output_dir)
         self.terminal = TerminalOperations(str(output_dir))
-        self.vision = VisionOperations(self.groq_client)
+        self.vision = VisionOperations(self.groq_client, cache_dir=self.output_dir / Config.STATE_DIR_NAME / "cache")
+
+        # Replays unchanged agent invocations (result and written files)
+        self.agent_cache = None
+        if Config.ENABLE_AGENT_CACHE:
+            self.agent_cache = AgentResultCache(
+                self.output_dir / Config.STATE_DIR_NAME / "cache", self.file_ops, self.human_loop
+            )
+        self.cache_report: List[Tuple[str, str]] = []  # (agent, hit/miss/uncacheable) per invocation
 
         self.tools = {
             "file_ops": self.file_ops,
@@ -94,66 +131,76 @@ class AIDevTeam:
 
         console.print("[green]✓ AI Dev Team initialized[/green]\n")
 
-    def execute_project(self, requirements: str, image_path: str = None, use_session_context: bool = False):
-        """Execute a full project based on requirements"""
+    def _load_policy(self, policy_path: str = None) -> ApprovalPolicy:
+        """Load the approval policy: --policy, APPROVAL_POLICY, or <output>/.aidev/policy.yaml"""
+        path = policy_path or Config.APPROVAL_POLICY
+        if not path:
+            default_path = self.output_dir / Config.STATE_DIR_NAME / "policy.yaml"
+            if not default_path.exists():
+                return ApprovalPolicy()
+            path = default_path
+
+        policy = ApprovalPolicy.from_file(Path(path))
+        console.print(f"[dim]Approval policy: {path} ({len(policy.rules)} rules, default: {policy.default})[/dim]")
+        return policy
+
+    def execute_project(
+        self,
+        requirements: str,
+        image_paths: List[str] = None,
+        use_session_context: bool = False,
+        resume: Optional[str] = None,
+    ):
+        """Execute a full project based on requirements, or resume a checkpointed run"""
         import os
 
-        # Show requirements with context
-        console.print(Panel(requirements, title="📋 Project Requirements", border_style="blue"))
-        console.print(f"[dim]Working directory: {os.getcwd()}[/dim]")
-        console.print(f"[dim]Output will be in: {self.output_dir}[/dim]")
-
-        # Analyze image if provided
-        if image_path:
-            console.print(f"\n[blue]🖼️  Analyzing design image: {image_path}[/blue]")
-            image_analysis = self.vision.analyze_image(image_path)
-            console.print(Panel(image_analysis, title="Image Analysis", border_style="cyan"))
-            requirements += f"\n\nDesign Reference:\n{image_analysis}"
-
-        # Phase 1: Orchestration
-        console.print("\n[bold yellow]🎯 Phase 1: Planning[/bold yellow]")
-        with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
-            task = progress.add_task("Orchestrator analyzing requirements...", total=None)
-            orchestrator = self.agents["Orchestrator"]
-            plan_result = orchestrator.analyze_requirements(requirements)
-            progress.update(task, completed=True)
-
-        if plan_result["status"] == "success":
-            plan = plan_result["plan"]
+        usage_start = self.groq_client.get_stats()
+        self.cache_report = []
+
+        if resume:
+            checkpoint = RunCheckpoint.load(self.output_dir, resume)
+            state = checkpoint.state
+            requirements, plan, design_spec = state["requirements"], state["plan"], state["design_spec"]
+            context = state["context"]
+            agents_executed = state["agents_executed"]
+            self.groq_client.add_usage(state["usage"])  # Spend before the interruption counts too
+
+            console.print(Panel(requirements, title=f"📋 Resuming run {checkpoint.run_id}", border_style="blue"))
+            console.print(f"[dim]{len(state['completed'])} agent(s) already completed; continuing after them[/dim]")
+            changed = checkpoint.changed_files()
+            if changed:
+                console.print(f"[yellow]⚠️  {len(changed)} workspace file(s) changed since the checkpoint: "
+                              f"{', '.join(changed[:10])}[/yellow]")
         else:
-            plan = plan_result["plan"]  # Use fallback
-
-        # Display plan
-        self._display_plan(plan)
-
-        # Request approval for plan
-        approved = self.human_loop.request_approval(
-            action="Execute Project Plan",
-            description=f"Project: {plan.get('project_type', 'unknown')}\n"
-            f"Phases: {len(plan.get('phases', []))}\n"
-            f"Tech Stack: {json.dumps(plan.get('tech_stack', {}), indent=2)}",
-            risk_level="low",
-        )
-
-        if not approved:
-            console.print("[red]❌ Project execution cancelled by user[/red]")
-            return
-
-        # Execute phases - merge with session context if enabled
-        import os
-        context = {
-            "requirements": requirements,
-            "plan": plan,
-            "output_dir": str(self.output_dir),
-            "user_working_dir": os.getcwd(),
-            "complexity": plan.get("complexity", "simple"),
-            "project_type": plan.get("project_type", "unknown")
-        }
-
-        if use_session_context:
-            context.update(self.session_context)
-
-        agents_executed = 0  # Track for summarization
+            planned = self._plan_project(requirements, image_paths)
+            if planned is None:
+                return
+            requirements, plan, design_spec = planned
+
+            # Execute phases - merge with session context if enabled
+            context = {
+                "requirements": requirements,
+                "plan": plan,
+                "output_dir": str(self.output_dir),
+                "user_working_dir": os.getcwd(),
+                "complexity": plan.get("complexity", "simple"),
+                "project_type": plan.get("project_type", "unknown")
+            }
+            if design_spec:
+                context["design_spec"] = design_spec  # Only agents consuming it see it
+
+            if use_session_context:
+                context.update(self.session_context)
+
+            agents_executed = 0  # Track for summarization
+
+            checkpoint = None
+            if Config.ENABLE_CHECKPOINTS:
+                prune_runs(self.output_dir, keep=Config.MAX_SAVED_RUNS)
+                checkpoint = RunCheckpoint(self.output_dir)
+                checkpoint.record_plan(requirements, plan, design_spec, context, self._run_usage(usage_start))
+                console.print(f"[dim]Run ID: {checkpoint.run_id} (continue an interrupted run with "
+                              f"--resume {checkpoint.run_id})[/dim]")
 
         for i, phase in enumerate(plan.get("phases", []), 1):
             console.print(f"\n[bold yellow]📦 Phase {i}: {phase['name']}[/bold yellow]")
@@ -166,6 +213,11 @@ class AIDevTeam:
                     console.print(f"[red]⚠️  Unknown agent: {agent_name}[/red]")
                     continue
 
+                if checkpoint and checkpoint.is_done(i, agent_name):
+                    console.print(f"[dim]✓ {agent_name}: completed before the interruption[/dim]")
+                    phase_results[agent_name] = checkpoint.state["results"][f"{i}:{agent_name}"]
+                    continue
+
                 agent = self.agents[agent_name]
 
                 console.print(f"\n[cyan]👤 {agent_name} working...[/cyan]")
@@ -177,14 +229,17 @@ class AIDevTeam:
 
                     # Execute agent task
                     task_desc = f"{phase['description']}"
-                    result = agent.execute(task_desc, context)
+                    result, cache_status = self._execute_agent(agent, task_desc, context)
+                    if cache_status != "off":
+                        self.cache_report.append((agent_name, cache_status))
 
                     progress.update(task, completed=True)
 
                 # Display result
                 status_color = "green" if result["status"] == "completed" else "yellow"
+                cached = " [dim](cached)[/dim]" if cache_status == "hit" else ""
                 console.print(
-                    f"[{status_color}]✓ {agent_name}: {result.get('summary', 'Done')}[/{status_color}]"
+                    f"[{status_color}]✓ {agent_name}: {result.get('summary', 'Done')}[/{status_color}]{cached}"
                 )
 
                 if self.verbose:
@@ -205,6 +260,16 @@ class AIDevTeam:
                         context = self._summarize_context(context)
                         agents_executed = 0  # Reset counter after summarization
 
+                if checkpoint:
+                    checkpoint.record_agent(i, agent_name, result, context, agents_executed, self._run_usage(usage_start))
+
+            # Later phases build on this phase's files: settle its queued approvals first
+            if self._settle_approvals() and checkpoint:
+                checkpoint.save(context, self._run_usage(usage_start))
+
+        if checkpoint:
+            checkpoint.finish(context, self._run_usage(usage_start))
+
         # Update session context if enabled
         if use_session_context:
             self.session_context.update(context)
@@ -215,6 +280,135 @@ class AIDevTeam:
         self._display_summary()
         self._list_created_files()
 
+    def _plan_project(self, requirements: str, image_paths: List[str] = None) -> Optional[Tuple[str, Dict, object]]:
+        """
+        Plan a project: analyze design images alongside the orchestrator, then ask for plan approval
+
+        Returns:
+            (requirements with design references, plan, design_spec), or None if the plan was rejected
+        """
+        import os
+
+        if isinstance(image_paths, str):
+            image_paths = [image_paths]
+        image_paths = list(image_paths or [])
+
+        # Show requirements with context
+        console.print(Panel(requirements, title="📋 Project Requirements", border_style="blue"))
+        console.print(f"[dim]Working directory: {os.getcwd()}[/dim]")
+        console.print(f"[dim]Output will be in: {self.output_dir}[/dim]")
+
+        # Phase 1: Orchestration
+        # Design images are analyzed in the background while the orchestrator plans;
+        # one structured vision call per image serves the whole run
+        console.print("\n[bold yellow]🎯 Phase 1: Planning[/bold yellow]")
+        with ThreadPoolExecutor(max_workers=max(1, min(len(image_paths), Config.MAX_PARALLEL_VISION))) as pool:
+            image_futures = [(path, pool.submit(self.vision.extract_ui_structure, path)) for path in image_paths]
+            if image_paths:
+                console.print(f"[blue]🖼️  Analyzing {len(image_paths)} design image(s) in the background[/blue]")
+
+            with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
+                task = progress.add_task("Orchestrator analyzing requirements...", total=None)
+                orchestrator = self.agents["Orchestrator"]
+                plan_result = orchestrator.analyze_requirements(requirements)
+                progress.update(task, completed=True)
+
+            design_specs = []
+            for path, future in image_futures:
+                structure = future.result()
+                if "error" in structure:
+                    console.print(f"[red]{structure['error']}[/red]")
+                    continue
+                design_outline = self.vision.format_ui_structure(structure)
+                console.print(Panel(design_outline, title=f"Image Analysis: {path}", border_style="cyan"))
+                requirements += f"\n\nDesign Reference ({Path(path).name}):\n{design_outline}"
+                design_specs.append({"image": Path(path).name, **structure})
+
+        # A single design keeps its plain component tree; several become a list
+        design_spec = None
+        if len(design_specs) == 1:
+            design_spec = design_specs[0]
+        elif design_specs:
+            design_spec = design_specs
+
+        if plan_result["status"] == "success":
+            plan = plan_result["plan"]
+        else:
+            plan = plan_result["plan"]  # Use fallback
+
+        # Display plan
+        self._display_plan(plan)
+
+        # Request approval for plan
+        approved = self.human_loop.request_approval(
+            action="Execute Project Plan",
+            description=f"Project: {plan.get('project_type', 'unknown')}\n"
+            f"Phases: {len(plan.get('phases', []))}\n"
+            f"Tech Stack: {json.dumps(plan.get('tech_stack', {}), indent=2)}",
+            risk_level="low",
+        )
+
+        if not approved:
+            console.print("[red]❌ Project execution cancelled by user[/red]")
+            return None
+
+        return requirements, plan, design_spec
+
+    def close(self):
+        """Release run resources (persistent shell sessions, approval queue)"""
+        if self.approval_queue is not None:
+            self.approval_queue.close()
+        self.terminal.close()
+
+    def _execute_agent(self, agent, task: str, context: Dict) -> Tuple[Dict, str]:
+        """
+        Run an agent, or replay its cached result when its inputs are unchanged
+
+        Returns:
+            (result, cache status: "hit", "miss", "uncacheable" or "off")
+        """
+        if self.agent_cache is None or not agent.cacheable:
+            return agent.execute(task, context), "off" if self.agent_cache is None else "uncacheable"
+
+        key = self.agent_cache.key(agent, task, context)
+        cached = self.agent_cache.lookup(key, agent.name)
+        if cached is not None:
+            return cached, "hit"
+
+        result = agent.execute(task, context)
+        stored = self.agent_cache.store(key, agent.tool_log, result)
+        return result, "miss" if stored else "uncacheable"
+
+    def _settle_approvals(self) -> int:
+        """Wait for queued approvals, then run the approved actions; returns how many ran"""
+        queue = self.approval_queue
+        if queue is None:
+            return 0
+        pending = queue.pending()
+        if pending:
+            console.print(
+                f"\n[yellow]⏳ Waiting for {len(pending)} pending approval(s) "
+                f"(ai-dev-team-approve --output {self.output_dir} list)...[/yellow]"
+            )
+            if not queue.wait(timeout=Config.APPROVAL_TIMEOUT):
+                console.print(f"[yellow]Approvals not answered within {Config.APPROVAL_TIMEOUT}s were rejected[/yellow]")
+                queue.expire_pending()
+        finished = queue.run_resolved()
+        ran = sum(1 for r in finished if r.status == "approved")
+        if finished:
+            console.print(f"[dim]Ran {ran} approved action(s), skipped {len(finished) - ran}[/dim]")
+        return ran
+
+    def _run_usage(self, usage_start: Dict) -> Dict:
+        """Token usage and cost of the current run (client totals minus those at its start)"""
+        stats = self.groq_client.get_stats()
+        return {
+            "total_input_tokens": stats["total_input_tokens"] - usage_start["total_input_tokens"],
+            "total_output_tokens": stats["total_output_tokens"] - usage_start["total_output_tokens"],
+            "total_cost": stats["total_cost"] - usage_start["total_cost"],
+            "prompt_chars_saved": stats["prompt_chars_saved"] - usage_start["prompt_chars_saved"],
+        }
+
     def _display_plan(self, plan: dict):
         """Display execution plan in a nice format"""
         console.print("\n[bold]📋 Execution Plan:[/bold]")
@@ -275,7 +469,7 @@ class AIDevTeam:
 
     def _summarize_context(self, context: dict) -> dict:
         """
-        Summarize context using ContextSummarizerAgent
+        Summarize context using ContextSummarizerAgent (only results added since the last summary)
 
         Args:
             context: Full context to summarize
@@ -294,8 +488,14 @@ class AIDevTeam:
         summary_result = summarizer.summarize_context(context)
 
         # Display results
+        if summary_result["method"] == "local":
+            console.print(f"[dim]Merged {summary_result['new_results']} new result(s) locally (no LLM call needed)[/dim]")
+        else:
+            console.print(f"[dim]Summarized {summary_result['new_results']} new result(s) "
+                          f"in {summary_result['chunks']} model call(s)[/dim]")
         if self.verbose or original_size > 50000:
             console.print(f"[dim]Original context: {original_size:,} characters[/dim]")
+            console.print(f"[dim]Precompressed: {summary_result['precompressed_size']:,} characters[/dim]")
             console.print(f"[dim]Compressed to: {summary_result['compressed_size']:,} characters[/dim]")
             console.print(f"[green]✓ Compression ratio: {summary_result['compression_ratio']:.1f}%[/green]")
 
@@ -307,6 +507,7 @@ class AIDevTeam:
             "complexity": context.get("complexity"),
             "project_type": context.get("project_type"),
             "plan": context.get("plan"),
+            "design_spec": context.get("design_spec"),
             # Add the summary
             "context_summary": summary_result["summary"],
             "summarized_at": str(__import__('datetime').datetime.now()),
@@ -330,6 +531,13 @@ class AIDevTeam:
         cost_table.add_row("Input Tokens", f"{stats['total_input_tokens']:,}")
         cost_table.add_row("Output Tokens", f"{stats['total_output_tokens']:,}")
         cost_table.add_row("Total Tokens", f"{stats['total_tokens']:,}")
+        if stats["prompt_tokens_saved"]:
+            # Compact context and tool results vs. pretty JSON and decorated results
+            share = stats["prompt_tokens_saved"] / (stats["total_input_tokens"] + stats["prompt_tokens_saved"])
+            cost_table.add_row(
+                "Prompt Tokens Saved (est.)",
+                f"{stats['prompt_tokens_saved']:,} ({share:.0%}, format: {Config.PROMPT_FORMAT})",
+            )
 
         console.print(cost_table)
 
@@ -343,9 +551,25 @@ class AIDevTeam:
         approval_table.add_row("Approved", str(approval_stats["approved"]))
         approval_table.add_row("Rejected", str(approval_stats["rejected"]))
         approval_table.add_row("Auto-Approved", str(approval_stats["auto"]))
+        approval_table.add_row("Decided by Policy", str(approval_stats["policy"]))
+        approval_table.add_row("Asked a Human", str(approval_stats["human"]))
+        if approval_stats["expired"]:
+            approval_table.add_row("Expired", str(approval_stats["expired"]))
 
         console.print(approval_table)
 
+        # Agent result cache
+        if self.cache_report:
+            console.print("\n[bold]🗃️  Agent Cache:[/bold]")
+            cache_table = Table()
+            cache_table.add_column("Agent", style="cyan")
+            cache_table.add_column("Result", style="green")
+            for agent_name, status in self.cache_report:
+                cache_table.add_row(agent_name, status)
+            hits = sum(1 for _, status in self.cache_report if status == "hit")
+            cache_table.add_row("[bold]Hits[/bold]", f"{hits}/{len(self.cache_report)}")
+            console.print(cache_table)
+
         # Output location
         console.print(f"\n[bold green]📁 Output directory: {self.output_dir}[/bold green]")
 
@@ -355,7 +579,8 @@ class AIDevTeam:
 
         try:
             files = list(self.output_dir.rglob("*"))
-            files = [f for f in files if f.is_file()]
+            state_dir = self.output_dir / Config.STATE_DIR_NAME
+            files = [f for f in files if f.is_file() and state_dir not in f.parents]
 
             if not files:
                 console.print("[yellow]No files found in output directory[/yellow]")
@@ -379,16 +604,42 @@ class AIDevTeam:
             console.print(f"[red]Error listing files: {e}[/red]")
 
 
+def _display_runs(output_dir: Path):
+    """Show the saved runs of an output directory"""
+    runs = list_runs(output_dir.resolve())
+    if not runs:
+        console.print("[yellow]No saved runs[/yellow]")
+        return
+
+    table = Table(title="💾 Saved Runs")
+    table.add_column("Run ID", style="cyan")
+    table.add_column("Status", style="green")
+    table.add_column("Agents Done", style="yellow")
+    table.add_column("Phases")
+    table.add_column("Updated", style="dim")
+    for run in runs:
+        updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["updated"]))
+        table.add_row(run["run_id"], run["status"], str(run["completed"]), str(run["phases"]), updated)
+    console.print(table)
+
+
 @click.command()
 @click.argument("requirements", required=False)
 @click.option("-i", "--interactive", is_flag=True, help="Interactive mode")
-@click.option("--image", type=click.Path(exists=True), help="Include an image for analysis")
+@click.option("--image", "images", multiple=True, type=click.Path(exists=True), help="Include an image for analysis (repeatable)")
 @click.option("--clipboard-image", is_flag=True, help="Use image from clipboard")
 @click.option("--auto-approve", is_flag=True, help="Skip approval prompts")
+@click.option("--policy", type=click.Path(exists=True), help="Approval policy file (YAML allow/deny/ask rules)")
+@click.option("--approval-queue", is_flag=True, default=None, help="Queue approvals for another terminal instead of prompting")
+@click.option("--resume", "resume", metavar="RUN_ID", help="Resume an interrupted run ('latest' for the most recent)")
+@click.option("--list-runs", "show_runs", is_flag=True, help="List saved runs of the output directory")
 @click.option("--max-iterations", type=int, default=50, help="Max iterations per agent")
 @click.option("--output", type=click.Path(), default="workspace", help="Output directory")
 @click.option("-v", "--verbose", is_flag=True, help="Verbose output")
-def main(requirements, interactive, image, clipboard_image, auto_approve, max_iterations, output, verbose):
+def main(
+    requirements, interactive, images, clipboard_image, auto_approve, policy, approval_queue, resume, show_runs,
+    max_iterations, output, verbose
+):
     """
     AI Dev Team - Your own AI software development team
 
@@ -396,7 +647,9 @@ def main(requirements, interactive, image, clipboard_image, auto_approve, max_it
         aidev "Build a todo app with React and Flask" --output . --auto-approve
         aidev --interactive
         aidev "Recreate this design" --image mockup.png --output ./src
+        aidev "Build these screens" --image home.png --image settings.png
         aidev "Fix this UI" --clipboard-image
+        aidev --resume latest --output ./src
 
     Interactive Mode Commands:
         - Type your requirements naturally
@@ -406,22 +659,31 @@ def main(requirements, interactive, image, clipboard_image, auto_approve, max_it
         - 'reset' - Clear session context
         - 'quit' - Exit interactive mode
     """
+    team = None
     try:
         # Set config
         Config.MAX_ITERATIONS = max_iterations
         Config.VERBOSE = verbose
         Config.AUTO_APPROVE = auto_approve
 
+        if show_runs:
+            _display_runs(Path(output))
+            return
+
         # Handle clipboard image
+        images = list(images)
         if clipboard_image:
             image = _save_clipboard_image()
             if not image:
                 console.print("[red]No image found in clipboard[/red]")
                 return
+            images.append(image)
 
         # Initialize team
         output_path = Path(output)
-        team = AIDevTeam(output_path, auto_approve=auto_approve, verbose=verbose)
+        team = AIDevTeam(
+            output_path, auto_approve=auto_approve, verbose=verbose, policy_path=policy, approval_queue=approval_queue
+        )
 
         if interactive:
             console.print("[bold blue]🔄 Interactive Mode (with context persistence)[/bold blue]")
@@ -454,22 +716,26 @@ def main(requirements, interactive, image, clipboard_image, auto_approve, max_it
                     if img_path:
                         console.print(f"[green]✓ Image saved from clipboard: {img_path}[/green]")
                         req = click.prompt("Enter requirements for this image")
-                        team.execute_project(req, img_path, use_session_context=True)
+                        team.execute_project(req, [img_path], use_session_context=True)
                     else:
                         console.print("[red]No image found in clipboard[/red]")
                     continue
 
-                img_path = None
+                img_paths = []
                 if click.confirm("Include an image?", default=False):
-                    img_path = click.prompt("Image path")
+                    entered = click.prompt("Image path(s), comma separated")
+                    img_paths = [p.strip() for p in entered.split(",") if p.strip()]
 
                 # Execute with session context enabled
-                team.execute_project(req, img_path, use_session_context=True)
+                team.execute_project(req, img_paths, use_session_context=True)
 
                 console.print("\n[dim]Context preserved for next command...[/dim]")
 
+        elif resume:
+            team.execute_project(requirements, images, resume=resume)
+
         elif requirements:
-            team.execute_project(requirements, image)
+            team.execute_project(requirements, images)
 
         else:
             console.print("[red]❌ Please provide requirements or use --interactive mode[/red]")
@@ -484,6 +750,26 @@ def main(requirements, interactive, image, clipboard_image, auto_approve, max_it
         if verbose:
             import traceback
             console.print(traceback.format_exc())
+    finally:
+        if team:
+            team.close()
+
+
+@click.command()
+@click.argument("command", nargs=-1)
+@click.option("--output", type=click.Path(), default="workspace", help="Output directory of the running session")
+def approve_main(command, output):
+    """
+    Answer the approvals of a running AI Dev Team session
+
+    Examples:
+        ai-dev-team-approve list
+        ai-dev-team-approve approve 3 4
+        ai-dev-team-approve approve all write_file
+        ai-dev-team-approve reject all
+    """
+    state_dir = Path(output).resolve() / Config.STATE_DIR_NAME
+    console.print(send_command(state_dir, " ".join(command) or "list"))
 
 
 if __name__ == "__main__":
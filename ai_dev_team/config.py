@@ -27,11 +27,23 @@ class Config:
     # Human-in-the-Loop
     AUTO_APPROVE = os.getenv("AUTO_APPROVE", "false").lower() == "true"
     APPROVAL_TIMEOUT = int(os.getenv("APPROVAL_TIMEOUT", "300"))
+    # YAML allow/deny/ask rules for tool calls; defaults to <output>/.aidev/policy.yaml if present
+    APPROVAL_POLICY = os.getenv("APPROVAL_POLICY", "")
+    # prompt: ask in this terminal; queue: queue requests for ai-dev-team-approve while agents keep working
+    APPROVAL_MODE = os.getenv("APPROVAL_MODE", "prompt").lower()
 
     # Context Management
     ENABLE_CONTEXT_SUMMARIZATION = os.getenv("ENABLE_CONTEXT_SUMMARIZATION", "true").lower() == "true"
     CONTEXT_SUMMARIZATION_THRESHOLD = int(os.getenv("CONTEXT_SUMMARIZATION_THRESHOLD", "10000"))  # chars
     SUMMARIZE_AFTER_N_AGENTS = int(os.getenv("SUMMARIZE_AFTER_N_AGENTS", "3"))  # summarize after every N agents
+    # Context is compressed locally first; the LLM summarizes only if that is still over budget
+    CONTEXT_SUMMARY_BUDGET = int(os.getenv("CONTEXT_SUMMARY_BUDGET", "6000"))  # chars
+    SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "800"))  # per agent summary
+    # New results larger than this are summarized in parallel chunks (map-reduce)
+    SUMMARIZER_WINDOW_CHARS = int(os.getenv("SUMMARIZER_WINDOW_CHARS", "24000"))
+    MAX_PARALLEL_SUMMARIES = int(os.getenv("MAX_PARALLEL_SUMMARIES", "4"))
+    # How context is serialized into prompts: json (compact), keypath (key.path: value lines) or pretty
+    PROMPT_FORMAT = os.getenv("PROMPT_FORMAT", "json").lower()
 
     # Model pricing (USD per 1M tokens)
     GROQ_PRICING = {
@@ -41,9 +53,43 @@ class Config:
         "mixtral-8x7b-32768": {"input": 0.24, "output": 0.24},
     }
 
+    # Command Output Capture
+    COMMAND_OUTPUT_HEAD_BYTES = int(os.getenv("COMMAND_OUTPUT_HEAD_BYTES", "4000"))
+    COMMAND_OUTPUT_TAIL_BYTES = int(os.getenv("COMMAND_OUTPUT_TAIL_BYTES", "4000"))
+    COMMAND_LOG_MAX_BYTES = int(os.getenv("COMMAND_LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # per stream
+    MAX_COMMAND_LOGS = int(os.getenv("MAX_COMMAND_LOGS", "200"))  # Logs of older commands are deleted
+    MAX_PARALLEL_COMMANDS = int(os.getenv("MAX_PARALLEL_COMMANDS", "4"))  # run_commands concurrency
+
+    # Persistent shell sessions: "agent" (one per agent), "project" (shared) or "none"
+    SHELL_SESSION_SCOPE = os.getenv("SHELL_SESSION_SCOPE", "agent").lower()
+
+    # Keep a forking pytest server with project modules pre-imported (POSIX only, opt-in)
+    PYTEST_SERVER = os.getenv("PYTEST_SERVER", "false").lower() == "true"
+
+    # Code review: files longer than this are split into function/class chunks reviewed in parallel
+    REVIEW_LARGE_FILE_LINES = int(os.getenv("REVIEW_LARGE_FILE_LINES", "400"))
+    REVIEW_CHUNK_LINES = int(os.getenv("REVIEW_CHUNK_LINES", "200"))
+    MAX_PARALLEL_REVIEWS = int(os.getenv("MAX_PARALLEL_REVIEWS", "4"))
+
+    # Vision: images are downscaled to the model's effective resolution and re-encoded before upload
+    VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "1120"))  # px, longest side
+    VISION_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "jpeg").lower()  # jpeg or webp
+    VISION_IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", "85"))
+    MAX_PARALLEL_VISION = int(os.getenv("MAX_PARALLEL_VISION", "4"))  # Design images analyzed at once
+
     # Working directory
     WORK_DIR = Path.cwd() / "workspace"
 
+    # Run state (logs, caches) kept inside the output directory
+    STATE_DIR_NAME = ".aidev"
+
+    # Run checkpoints in <output>/.aidev/runs/<run-id>, saved after every agent (for --resume)
+    ENABLE_CHECKPOINTS = os.getenv("ENABLE_CHECKPOINTS", "true").lower() == "true"
+    MAX_SAVED_RUNS = int(os.getenv("MAX_SAVED_RUNS", "20"))  # Older completed runs are deleted
+
+    # Agent result cache: replay an agent whose task, context, prompt, model and files read are unchanged
+    ENABLE_AGENT_CACHE = os.getenv("ENABLE_AGENT_CACHE", "true").lower() == "true"
+
     @classmethod
     def validate(cls):
         """Validate configuration"""
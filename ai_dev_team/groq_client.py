@@ -2,20 +2,30 @@
 Groq API client for fast, low-cost LLM inference
 """
 from groq import Groq
+from pathlib import Path
 from typing import List, Dict, Optional
 from .config import Config
-import base64
+from .utils.image_prep import ImagePreprocessor
+from .agents.prompt_format import CHARS_PER_TOKEN
+import threading
 
 
 class GroqClient:
     """Groq API client wrapper with cost tracking and vision support"""
 
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            cache_dir: Where encoded image payloads are cached (memory only if None)
+        """
         Config.validate()
         self.client = Groq(api_key=Config.GROQ_API_KEY)
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_cost = 0.0
+        self.prompt_chars_saved = 0  # By compact prompt rendering (see agents.prompt_format)
+        self._stats_lock = threading.Lock()  # Agents may call chat from several threads
+        self.images = ImagePreprocessor(cache_dir)
 
     def chat(
         self,
@@ -63,9 +73,10 @@ class GroqClient:
             cost = Config.estimate_cost(usage["input_tokens"], usage["output_tokens"], model)
 
             # Update totals
-            self.total_input_tokens += usage["input_tokens"]
-            self.total_output_tokens += usage["output_tokens"]
-            self.total_cost += cost
+            with self._stats_lock:
+                self.total_input_tokens += usage["input_tokens"]
+                self.total_output_tokens += usage["output_tokens"]
+                self.total_cost += cost
 
             return {"content": content, "usage": usage, "cost": cost}
 
@@ -91,24 +102,12 @@ class GroqClient:
             max_tokens: Maximum tokens
 
         Returns:
-            Dict with 'content', 'usage', and 'cost'
+            Dict with 'content', 'usage', 'cost' and 'image' (source and encoded size)
         """
         model = model or Config.GROQ_VISION_MODEL
 
-        # Read and encode image
-        with open(image_path, "rb") as img_file:
-            image_data = base64.b64encode(img_file.read()).decode("utf-8")
-
-        # Determine image type
-        ext = image_path.lower().split(".")[-1]
-        mime_types = {
-            "jpg": "image/jpeg",
-            "jpeg": "image/jpeg",
-            "png": "image/png",
-            "gif": "image/gif",
-            "webp": "image/webp",
-        }
-        mime_type = mime_types.get(ext, "image/jpeg")
+        # Downscaled, metadata-free payload, cached by image content
+        image = self.images.prepare(image_path)
 
         messages = [
             {
@@ -117,13 +116,20 @@ class GroqClient:
                     {"type": "text", "text": text},
                     {
                         "type": "image_url",
-                        "image_url": {"url": f"data:{mime_type};base64,{image_data}"},
+                        "image_url": {"url": image.data_url},
                     },
                 ],
             }
         ]
 
-        return self.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        result = self.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        result["image"] = image.info
+        return result
+
+    def record_prompt_savings(self, chars: int):
+        """Count prompt characters a request saved through compact rendering"""
+        with self._stats_lock:
+            self.prompt_chars_saved += chars
 
     def get_stats(self) -> Dict:
         """Get usage statistics"""
@@ -132,10 +138,21 @@ class GroqClient:
             "total_output_tokens": self.total_output_tokens,
             "total_tokens": self.total_input_tokens + self.total_output_tokens,
             "total_cost": self.total_cost,
+            "prompt_chars_saved": self.prompt_chars_saved,
+            "prompt_tokens_saved": self.prompt_chars_saved // CHARS_PER_TOKEN,  # Estimate
         }
 
+    def add_usage(self, usage: Dict):
+        """Add usage recorded elsewhere (e.g. before a resumed run was interrupted)"""
+        with self._stats_lock:
+            self.total_input_tokens += usage.get("total_input_tokens", 0)
+            self.total_output_tokens += usage.get("total_output_tokens", 0)
+            self.total_cost += usage.get("total_cost", 0.0)
+            self.prompt_chars_saved += usage.get("prompt_chars_saved", 0)
+
     def reset_stats(self):
         """Reset usage statistics"""
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_cost = 0.0
+        self.prompt_chars_saved = 0
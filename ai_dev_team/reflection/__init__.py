@@ -1,5 +1,7 @@
 """Code quality reflection system"""
 
 from .analyzer import CodeAnalyzer
+from .js_analyzer import JSAnalyzer
+from .rules import Finding, Rule, RuleEngine
 
-__all__ = ["CodeAnalyzer"]
+__all__ = ["CodeAnalyzer", "JSAnalyzer", "Finding", "Rule", "RuleEngine"]
@@ -2,11 +2,63 @@
 Code quality analysis and reflection
 """
 import ast
-import re
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List
-from radon.complexity import cc_visit
-from radon.metrics import mi_visit
+from typing import Dict, List, Optional
+import radon
+from radon.metrics import h_visit_ast, mi_compute
+from radon.raw import analyze
+from radon.visitors import ComplexityVisitor
+
+from ..config import Config
+from ..tools.atomic_io import content_hash
+from ..tools.pytest_runner import SKIP_DIRS
+from ..utils.disk_cache import JsonCache, cache_key
+from .js_analyzer import JSAnalyzer
+from .rules import Finding, RuleEngine
+
+# Bump whenever a check changes so cached workspace results are recomputed
+ANALYZER_VERSION = "5"
+
+ANALYZED_EXTENSIONS = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "javascript",
+    ".tsx": "javascript",
+}
+
+# Below this many files a process pool costs more than it saves
+MIN_FILES_FOR_POOL = 8
+
+
+class ParsedSource:
+    """Source code parsed once and shared by every check"""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.lines = code.split("\n")
+        self.syntax_error: Optional[SyntaxError] = None
+        try:
+            self.tree = ast.parse(code)
+        except SyntaxError as e:
+            self.tree = None
+            self.syntax_error = e
+
+
+def _analyze_source(job) -> Dict:
+    """Process pool worker: analyze one (filepath, language, code) job"""
+    filepath, language, code = job
+    analyzer = CodeAnalyzer()
+    if language == "python":
+        results = analyzer.analyze_python_source(code)
+    else:
+        results = analyzer.analyze_javascript_source(code, filepath)
+    return {"filepath": filepath, **results}
 
 
 class CodeAnalyzer:
@@ -14,46 +66,30 @@ class CodeAnalyzer:
 
     def __init__(self):
         self.results = {}
+        self.rule_engine = RuleEngine()
+        self.js_analyzer = JSAnalyzer()
 
     def analyze_python(self, filepath: str) -> Dict:
         """
         Analyze Python code quality
 
+        The source is parsed once; complexity, maintainability, best-practice
+        and security checks all work off the same AST. Per-check timings (ms)
+        are returned under "timings".
+
         Args:
             filepath: Path to Python file
 
         Returns:
             Analysis results
         """
+        timings: Dict[str, float] = {}
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                code = f.read()
-
-            results = {
-                "filepath": filepath,
-                "language": "python",
-                "syntax": self._check_syntax(code),
-                "complexity": self._check_complexity(code),
-                "maintainability": self._check_maintainability(code),
-                "best_practices": self._check_best_practices(code),
-                "security": self._check_security(code),
-            }
+            with self._timed(timings, "read"):
+                with open(filepath, "r", encoding="utf-8") as f:
+                    code = f.read()
 
-            # Calculate overall score
-            scores = []
-            if results["syntax"]["passed"]:
-                scores.append(100)
-            if results["complexity"]["average_complexity"] < 10:
-                scores.append(80)
-            elif results["complexity"]["average_complexity"] < 15:
-                scores.append(60)
-            else:
-                scores.append(40)
-
-            results["overall_score"] = sum(scores) / len(scores) if scores else 0
-            results["passed"] = results["overall_score"] >= 60
-
-            return results
+            return {"filepath": filepath, **self.analyze_python_source(code, timings)}
 
         except Exception as e:
             return {
@@ -63,25 +99,102 @@ class CodeAnalyzer:
                 "overall_score": 0,
             }
 
-    def _check_syntax(self, code: str) -> Dict:
-        """Check Python syntax"""
+    def analyze_python_source(self, code: str, timings: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Analyze Python source code (see analyze_python)
+
+        Args:
+            code: Python source
+            timings: Optional dict to record per-check timings into
+
+        Returns:
+            Analysis results without 'filepath'
+        """
+        timings = timings if timings is not None else {}
+        total_start = time.perf_counter()
+
+        with self._timed(timings, "parse"):
+            parsed = ParsedSource(code)
+
+        with self._timed(timings, "syntax"):
+            syntax = self._check_syntax(parsed)
+
+        with self._timed(timings, "complexity"):
+            complexity, total_complexity = self._check_complexity(parsed)
+
+        with self._timed(timings, "maintainability"):
+            maintainability = self._check_maintainability(parsed, total_complexity)
+
+        with self._timed(timings, "rules"):
+            findings = self.rule_engine.run(parsed.tree, parsed.lines)
+
+        best_practices = self._check_best_practices(findings)
+        security = self._check_security(findings)
+
+        results = {
+            "language": "python",
+            "syntax": syntax,
+            "complexity": complexity,
+            "maintainability": maintainability,
+            "best_practices": best_practices,
+            "security": security,
+        }
+
+        self._score(results)
+
+        timings["total"] = round((time.perf_counter() - total_start) * 1000 + timings.get("read", 0), 3)
+        results["timings"] = dict(timings)
+        return results
+
+    @staticmethod
+    def _score(results: Dict):
+        """Set 'overall_score' and 'passed' from the syntax and complexity sections"""
+        scores = []
+        if results["syntax"]["passed"]:
+            scores.append(100)
+        if results["complexity"]["average_complexity"] < 10:
+            scores.append(80)
+        elif results["complexity"]["average_complexity"] < 15:
+            scores.append(60)
+        else:
+            scores.append(40)
+
+        results["overall_score"] = sum(scores) / len(scores) if scores else 0
+        results["passed"] = results["overall_score"] >= 60
+
+    @staticmethod
+    @contextmanager
+    def _timed(timings: Dict[str, float], name: str):
+        """Record how long a block took, in milliseconds"""
+        start = time.perf_counter()
         try:
-            ast.parse(code)
+            yield
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    def _check_syntax(self, parsed: ParsedSource) -> Dict:
+        """Check Python syntax"""
+        if parsed.syntax_error is None:
             return {"passed": True, "issues": []}
-        except SyntaxError as e:
-            return {
-                "passed": False,
-                "issues": [f"Syntax error at line {e.lineno}: {e.msg}"],
-            }
+        e = parsed.syntax_error
+        return {
+            "passed": False,
+            "issues": [f"Syntax error at line {e.lineno}: {e.msg}"],
+        }
+
+    def _check_complexity(self, parsed: ParsedSource):
+        """Check code complexity; also returns the module's total complexity for MI"""
+        empty = {"average_complexity": 0, "max_complexity": 0, "issues": []}
+        if parsed.tree is None:
+            return empty, 0
 
-    def _check_complexity(self, code: str) -> Dict:
-        """Check code complexity"""
         try:
-            complexity = cc_visit(code)
+            visitor = ComplexityVisitor.from_ast(parsed.tree)
+            complexity = visitor.blocks
             complexities = [block.complexity for block in complexity]
 
             if not complexities:
-                return {"average_complexity": 0, "max_complexity": 0, "issues": []}
+                return empty, visitor.total_complexity
 
             avg = sum(complexities) / len(complexities)
             max_c = max(complexities)
@@ -90,35 +203,50 @@ class CodeAnalyzer:
             for block in complexity:
                 if block.complexity > 15:
                     issues.append(
-                        f"High complexity ({block.complexity}) in {block.name}"
+                        f"Line {block.lineno}: High complexity ({block.complexity}) in {block.fullname}"
                     )
 
+            functions = [
+                {
+                    "name": block.fullname,
+                    "line": block.lineno,
+                    "end_line": block.endline,
+                    "complexity": block.complexity,
+                }
+                for block in complexity
+            ]
+
             return {
                 "average_complexity": round(avg, 2),
                 "max_complexity": max_c,
                 "issues": issues,
-            }
+                "functions": functions,
+            }, visitor.total_complexity
 
         except Exception:
-            return {"average_complexity": 0, "max_complexity": 0, "issues": []}
+            return empty, 0
 
-    def _check_maintainability(self, code: str) -> Dict:
+    def _check_maintainability(self, parsed: ParsedSource, total_complexity: int) -> Dict:
         """Check maintainability index"""
-        try:
-            mi = mi_visit(code, multi=True)
+        if parsed.tree is None:
+            return {"maintainability_index": 0, "rank": "C", "issues": []}
 
-            if not mi:
-                return {"maintainability_index": 0, "rank": "C", "issues": []}
+        try:
+            # Same inputs as radon's mi_visit(code, multi=True), without re-parsing
+            raw = analyze(parsed.code)
+            comment_lines = raw.comments + raw.multi
+            comments = comment_lines / float(raw.sloc) * 100 if raw.sloc != 0 else 0
+            volume = h_visit_ast(parsed.tree).total.volume
+            mi = mi_compute(volume, total_complexity, raw.lloc, comments)
 
-            avg_mi = sum(mi) / len(mi)
-            rank = "A" if avg_mi > 20 else "B" if avg_mi > 10 else "C"
+            rank = "A" if mi > 20 else "B" if mi > 10 else "C"
 
             issues = []
-            if avg_mi < 10:
+            if mi < 10:
                 issues.append("Low maintainability - consider refactoring")
 
             return {
-                "maintainability_index": round(avg_mi, 2),
+                "maintainability_index": round(mi, 2),
                 "rank": rank,
                 "issues": issues,
             }
@@ -126,93 +254,180 @@ class CodeAnalyzer:
         except Exception:
             return {"maintainability_index": 0, "rank": "C", "issues": []}
 
-    def _check_best_practices(self, code: str) -> Dict:
+    def _check_best_practices(self, findings: List[Finding]) -> Dict:
         """Check Python best practices"""
-        issues = []
-
-        # Check for docstrings
-        if '"""' not in code and "'''" not in code:
-            issues.append("Missing docstrings")
-
-        # Check line length
-        long_lines = [
-            i + 1 for i, line in enumerate(code.split("\n")) if len(line) > 100
-        ]
-        if long_lines:
-            issues.append(f"Lines too long (>100 chars): {len(long_lines)} lines")
-
-        # Check naming conventions
-        if re.search(r"def [A-Z]", code):
-            issues.append("Function names should be lowercase with underscores")
+        return self._section(findings, "best_practices")
 
-        if re.search(r"class [a-z]", code):
-            issues.append("Class names should use CapWords convention")
-
-        # Check for print statements (should use logging)
-        print_count = code.count("print(")
-        if print_count > 3:
-            issues.append(
-                f"Excessive print statements ({print_count}) - consider using logging"
-            )
-
-        return {"issues": issues, "passed": len(issues) == 0}
-
-    def _check_security(self, code: str) -> Dict:
+    def _check_security(self, findings: List[Finding]) -> Dict:
         """Check for common security issues"""
-        issues = []
-
-        # Check for eval/exec
-        if "eval(" in code or "exec(" in code:
-            issues.append("Dangerous: eval/exec usage detected")
+        return self._section(findings, "security")
+
+    @staticmethod
+    def _section(findings: List[Finding], category: str) -> Dict:
+        """Result section for one rule category"""
+        found = [f for f in findings if f.category == category]
+        return {
+            "issues": [str(f) for f in found],
+            "findings": [f.to_dict() for f in found],
+            "passed": len(found) == 0,
+        }
 
-        # Check for shell=True
-        if 'shell=True' in code:
-            issues.append("Security risk: subprocess with shell=True")
-
-        # Check for SQL injection risks
-        if re.search(r'f".*SELECT.*FROM', code) or re.search(r"f'.*SELECT.*FROM", code):
-            issues.append("Potential SQL injection risk - use parameterized queries")
+    def analyze_javascript(self, filepath: str) -> Dict:
+        """
+        Analyze JavaScript/TypeScript/JSX code quality
 
-        # Check for hardcoded secrets
-        if re.search(r'password\s*=\s*["\']', code, re.I):
-            issues.append("Possible hardcoded password detected")
+        Args:
+            filepath: Path to a .js/.jsx/.ts/.tsx file
 
-        if re.search(r'api[_-]?key\s*=\s*["\']', code, re.I):
-            issues.append("Possible hardcoded API key detected")
+        Returns:
+            Analysis results in the same shape as analyze_python
+        """
+        timings: Dict[str, float] = {}
+        try:
+            with self._timed(timings, "read"):
+                with open(filepath, "r", encoding="utf-8") as f:
+                    code = f.read()
 
-        return {"issues": issues, "passed": len(issues) == 0}
+            return {"filepath": filepath, **self.analyze_javascript_source(code, filepath, timings)}
 
-    def analyze_javascript(self, filepath: str) -> Dict:
-        """Analyze JavaScript code - basic analysis"""
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                code = f.read()
+        except Exception as e:
+            return {"filepath": filepath, "error": str(e), "passed": False, "overall_score": 0}
 
-            issues = []
+    def analyze_javascript_source(
+        self, code: str, filename: str = "", timings: Optional[Dict[str, float]] = None
+    ) -> Dict:
+        """
+        Analyze JS/TS source code (see analyze_javascript)
 
-            # Basic checks
-            if code.count("var ") > code.count("let ") + code.count("const "):
-                issues.append("Prefer let/const over var")
+        Args:
+            code: Source code
+            filename: Used to tell TypeScript and JSX apart (.ts files never contain JSX)
+            timings: Optional dict to record timings into
 
-            if "eval(" in code:
-                issues.append("Dangerous: eval usage detected")
+        Returns:
+            Analysis results without 'filepath'
+        """
+        timings = timings if timings is not None else {}
+        total_start = time.perf_counter()
+        suffix = Path(filename).suffix.lower()
+
+        with self._timed(timings, "lex_and_scan"):
+            scan = self.js_analyzer.analyze(code, jsx=suffix != ".ts")
+
+        functions = scan["functions"]
+        complexities = [f["complexity"] for f in functions]
+        complexity = {
+            "average_complexity": round(sum(complexities) / len(complexities), 2) if complexities else 0,
+            "max_complexity": max(complexities) if complexities else 0,
+            "issues": [
+                f"Line {f['line']}: High complexity ({f['complexity']}) in {f['name']}"
+                for f in functions
+                if f["complexity"] > 15
+            ],
+            "functions": functions,
+        }
+
+        findings = scan["findings"]
+        results = {
+            "language": "typescript" if suffix in [".ts", ".tsx"] else "javascript",
+            "syntax": {"passed": not scan["errors"], "issues": scan["errors"]},
+            "complexity": complexity,
+            "best_practices": self._section(findings, "best_practices"),
+            "security": self._section(findings, "security"),
+            "issues": [str(f) for f in findings],
+        }
+        self._score(results)
+
+        timings["total"] = round((time.perf_counter() - total_start) * 1000 + timings.get("read", 0), 3)
+        results["timings"] = dict(timings)
+        return results
+
+    def analyze_workspace(
+        self,
+        root: str = ".",
+        cache_path: Optional[Path] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict:
+        """
+        Analyze every Python/JS/TS file under a directory
 
-            if code.count("console.log") > 5:
-                issues.append("Excessive console.log statements")
+        Files are fanned out over a process pool (the checks are CPU-bound).
+        Results are cached on disk by file content, suffix and analyzer
+        version, so only new or changed files are analyzed again.
 
-            passed = len(issues) == 0
-            score = 80 if passed else 60
+        Args:
+            root: Directory to analyze
+            cache_path: Cache file (default: <root>/.aidev/cache/analysis.json)
+            max_workers: Worker processes (default: CPU count)
 
-            return {
-                "filepath": filepath,
-                "language": "javascript",
-                "issues": issues,
-                "passed": passed,
-                "overall_score": score,
-            }
+        Returns:
+            Dict with 'results' (one per file, filepath relative to root),
+            'files', 'analyzed', 'cached' and 'duration'
+        """
+        start = time.perf_counter()
+        root_path = Path(root)
+        cache = JsonCache(cache_path or root_path / Config.STATE_DIR_NAME / "cache" / "analysis.json")
+        version = f"{ANALYZER_VERSION}:{radon.__version__}"
+
+        results: Dict[str, Dict] = {}
+        jobs = []
+        keys = {}
+        for path in self._iter_code_files(root_path):
+            rel = path.relative_to(root_path).as_posix()
+            try:
+                data = path.read_bytes()
+                code = data.decode("utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                results[rel] = {"filepath": rel, "error": str(e), "passed": False, "overall_score": 0}
+                continue
+
+            # The analysis depends on the language and the exact suffix (.ts/.tsx/.jsx), not only the content
+            suffix = path.suffix.lower()
+            key = cache_key(version, ANALYZED_EXTENSIONS[suffix], suffix, content_hash(data))
+            hit = cache.get(key)
+            if hit is not None:
+                results[rel] = {"filepath": rel, **hit}
+            else:
+                keys[rel] = key
+                jobs.append((rel, ANALYZED_EXTENSIONS[suffix], code))
+
+        for analysis in self._run_jobs(jobs, max_workers):
+            rel = analysis.pop("filepath")
+            cache.set(keys[rel], analysis)
+            results[rel] = {"filepath": rel, **analysis}
+        cache.save()
+
+        return {
+            "root": str(root_path),
+            "results": [results[rel] for rel in sorted(results)],
+            "files": len(results),
+            "analyzed": len(jobs),
+            "cached": cache.hits,
+            "duration": round(time.perf_counter() - start, 3),
+        }
+
+    @staticmethod
+    def _iter_code_files(root: Path):
+        """Yield analyzable files, skipping hidden dirs, virtualenvs and build output"""
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+            for filename in sorted(filenames):
+                if Path(filename).suffix.lower() in ANALYZED_EXTENSIONS:
+                    yield Path(dirpath) / filename
+
+    @staticmethod
+    def _run_jobs(jobs: List, max_workers: Optional[int]) -> List[Dict]:
+        """Analyze jobs in a process pool, or inline when there are only a few"""
+        workers = max_workers or os.cpu_count() or 1
+        if len(jobs) < MIN_FILES_FOR_POOL or workers < 2:
+            return [_analyze_source(job) for job in jobs]
 
-        except Exception as e:
-            return {"filepath": filepath, "error": str(e), "passed": False}
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                return list(pool.map(_analyze_source, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # No multiprocessing support here (e.g. restricted sandbox)
+            return [_analyze_source(job) for job in jobs]
 
     def format_results(self, results: Dict) -> str:
         """Format analysis results for display"""
@@ -279,6 +494,12 @@ class CodeAnalyzer:
                 for issue in sec.get("issues", []):
                     output.append(f"  - {issue}")
 
+        # Timing breakdown
+        if "timings" in results:
+            timings = results["timings"]
+            parts = [f"{name} {ms:.1f}ms" for name, ms in timings.items() if name != "total"]
+            output.append(f"\n⏱️ Analysis time: {timings.get('total', 0):.1f}ms ({', '.join(parts)})")
+
         # Generic issues (for non-Python)
         if "issues" in results and not "syntax" in results:
             output.append("\n⚠️ Issues Found:")
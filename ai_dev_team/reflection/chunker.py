@@ -0,0 +1,92 @@
+"""
+Split source files into function/class-sized chunks for map-reduce review
+"""
+import ast
+from typing import Dict, List, Optional, Tuple
+
+from .js_analyzer import JSAnalyzer
+
+
+def split_into_chunks(code: str, filename: str, max_lines: int = 200) -> List[Dict]:
+    """
+    Split a source file on definition boundaries
+
+    Python files are split on top-level functions and classes (classes
+    longer than max_lines are split further into their methods); JS/TS
+    files on top-level functions found by the JS lexer. Code between
+    definitions (imports, constants, class headers) forms its own chunks.
+    Any chunk still longer than max_lines is cut into max_lines slices.
+
+    Args:
+        code: Source code
+        filename: File name, used to pick the language
+        max_lines: Target maximum chunk size in lines
+
+    Returns:
+        Chunks as dicts with 'name', 'start', 'end' (1-based, inclusive)
+        and 'text', covering every non-blank line exactly once
+    """
+    lines = code.split("\n")
+    if filename.endswith(".py"):
+        spans = _python_spans(code, max_lines)
+    else:
+        spans = _js_spans(code, filename)
+
+    chunks = []
+    position = 1
+    for start, end, name in spans + [(len(lines) + 1, len(lines), None)]:
+        if start > position:
+            chunks.extend(_slices(lines, position, start - 1, "module code", max_lines))
+        if name is not None:
+            chunks.extend(_slices(lines, start, end, name, max_lines))
+        position = max(position, end + 1)
+
+    return [c for c in chunks if c["text"].strip()]
+
+
+def _slices(lines: List[str], start: int, end: int, name: str, max_lines: int) -> List[Dict]:
+    chunks = []
+    total = end - start + 1
+    for offset in range(0, total, max_lines):
+        first = start + offset
+        last = min(end, first + max_lines - 1)
+        part = name if total <= max_lines else f"{name} (part {offset // max_lines + 1})"
+        chunks.append({"name": part, "start": first, "end": last, "text": "\n".join(lines[first - 1:last])})
+    return chunks
+
+
+def _python_spans(code: str, max_lines: int) -> List[Tuple[int, int, str]]:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    return _definition_spans(tree.body, max_lines, prefix="")
+
+
+def _definition_spans(body: List[ast.stmt], max_lines: int, prefix: str) -> List[Tuple[int, int, str]]:
+    spans = []
+    for node in body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        name = prefix + node.name
+        if isinstance(node, ast.ClassDef) and node.end_lineno - start + 1 > max_lines:
+            spans.extend(_definition_spans(node.body, max_lines, prefix=f"{name}."))
+        else:
+            spans.append((start, node.end_lineno, name))
+    return spans
+
+
+def _js_spans(code: str, filename: str) -> List[Tuple[int, int, str]]:
+    functions = JSAnalyzer().analyze(code, jsx=not filename.endswith(".ts"))["functions"]
+    spans = []
+    last_end: Optional[int] = None
+    for function in functions:  # Ordered by start line
+        end = function["end_line"]
+        if end is None:
+            continue
+        if last_end is not None and function["line"] <= last_end:
+            continue  # Nested in the previous top-level function
+        spans.append((function["line"], end, function["name"]))
+        last_end = end
+    return spans
@@ -0,0 +1,399 @@
+"""
+Lexer-based analysis for JavaScript, TypeScript and JSX
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .rules import Rule, add_suppression, build_findings
+
+TOKEN = re.compile(
+    r"""
+    (?P<ws>[ \t\r\f\v\ufeff\u00a0]+)
+    |(?P<nl>\n)
+    |(?P<lc>//[^\n]*)
+    |(?P<bc>/\*.*?(?:\*/|\Z))
+    |(?P<name>\#?[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*)
+    |(?P<num>\.?\d[\w.]*)
+    |(?P<str>'(?:[^'\\\n]|\\.)*'?|"(?:[^"\\\n]|\\.)*"?)
+    |(?P<tpl>`)
+    |(?P<punct>>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|\?\?=|&&=|\|\|=|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.
+        |\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|\*\*|<<|>>|[{}()\[\];,<>+\-*/%&|^!~?:=.@])
+    """,
+    re.X | re.S,
+)
+REGEX_LITERAL = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+TEMPLATE_TEXT = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*", re.S)
+JSX_TEXT = re.compile(r"[^<{]+")
+JSX_NAME = re.compile(r"[\w$.:-]+")
+
+# Keywords after which `/` starts a regex and `<` starts JSX
+EXPRESSION_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await", "extends",
+}
+CONTROL_KEYWORDS = {"if", "for", "while", "switch", "catch", "with", "return", "typeof", "await", "new"}
+DECISION_KEYWORDS = {"if", "for", "while", "case", "catch"}
+DECISION_OPERATORS = {"&&", "||", "??", "?"}
+# Tokens that may sit between a function's `)` and its body (return type annotations)
+SIGNATURE_TOKENS = {":", "<", ">", "|", "&", "[", "]", ".", "?", "=>"}
+
+JS_RULES = [
+    Rule("JS101", "eval", "security", "high", None),
+    Rule("JS102", "raw-html", "security", "medium", None),
+    Rule("JS103", "document-write", "security", "medium", None),
+    Rule("JS104", "string-timer", "security", "medium", None),
+    Rule("JS201", "var", "best_practices", "low", None, threshold=0,
+         summary="Prefer let/const over var ({count} var declarations)"),
+    Rule("JS202", "console-log", "best_practices", "info", None, threshold=5,
+         summary="Excessive console.log statements ({count})"),
+    Rule("JS203", "loose-equality", "best_practices", "low", None),
+    Rule("JS204", "debugger", "best_practices", "medium", None),
+]
+
+
+class JSLexer:
+    """
+    Single-pass tokenizer for JS/TS/JSX
+
+    Produces (kind, value, line) tuples with kinds name, num, str,
+    template, regex, punct, jsx (an element) and jsxattr. Comments are
+    collected separately. Template literal expressions and JSX expression
+    containers are lexed as code, so their tokens appear in the stream;
+    JSX text and template text never do.
+    """
+
+    def __init__(self, code: str, jsx: bool = True):
+        self.code = code
+        self.jsx = jsx
+        self.i = 0
+        self.line = 1
+        self.tokens: List[Tuple[str, str, int]] = []
+        self.comments: List[Tuple[int, str]] = []
+        self.errors: List[str] = []
+        self._prev: Optional[Tuple[str, str, int]] = None
+
+    def tokenize(self) -> List[Tuple[str, str, int]]:
+        self._lex_code(until_brace=False)
+        return self.tokens
+
+    def _emit(self, kind: str, value: str, line: int):
+        token = (kind, value, line)
+        self.tokens.append(token)
+        self._prev = token
+
+    def _expects_expression(self) -> bool:
+        prev = self._prev
+        if prev is None:
+            return True
+        kind, value, _ = prev
+        if kind == "punct":
+            return value not in [")", "]", "}"]
+        return kind == "name" and value in EXPRESSION_KEYWORDS
+
+    def _lex_code(self, until_brace: bool):
+        """Lex code; with until_brace, stop after the `}` closing an enclosing `${` or `{`"""
+        code, n = self.code, len(self.code)
+        depth = 0
+        while self.i < n:
+            match = TOKEN.match(code, self.i)
+            if match is None:
+                self.i += 1  # Stray character such as a backslash
+                continue
+            kind = match.lastgroup
+            value = match.group()
+            start_line = self.line
+
+            if kind == "ws":
+                self.i = match.end()
+            elif kind == "nl":
+                self.line += 1
+                self.i = match.end()
+            elif kind in ["lc", "bc"]:
+                self.comments.append((start_line, value))
+                if kind == "bc":
+                    if not value.endswith("*/") or len(value) < 4:
+                        self.errors.append(f"Unterminated comment at line {start_line}")
+                    self.line += value.count("\n")
+                self.i = match.end()
+            elif kind == "tpl":
+                self.i = match.end()
+                self._template(start_line)
+            elif kind == "str":
+                if len(value) < 2 or value[-1] != value[0]:
+                    self.errors.append(f"Unterminated string at line {start_line}")
+                self.line += value.count("\n")
+                self.i = match.end()
+                self._emit("str", value, start_line)
+            elif kind == "punct":
+                if value in ["/", "/="] and self._expects_expression():
+                    regex = REGEX_LITERAL.match(code, self.i)
+                    if regex:
+                        self.i = regex.end()
+                        self._emit("regex", regex.group(), start_line)
+                        continue
+                if value == "<" and self.jsx and self._expects_expression():
+                    following = code[self.i + 1:self.i + 2]
+                    if following == ">" or following.isalpha():
+                        token = ("jsx", "", start_line)
+                        self._emit(*token)
+                        self._jsx_element()
+                        self._prev = token
+                        continue
+                self.i = match.end()
+                if value == "{":
+                    depth += 1
+                elif value == "}":
+                    if until_brace and depth == 0:
+                        return
+                    depth -= 1
+                self._emit("punct", value, start_line)
+            else:
+                self.i = match.end()
+                self._emit(kind, value, start_line)
+
+        if until_brace:
+            self.errors.append("Unexpected end of file inside an expression")
+
+    def _template(self, start_line: int):
+        """Lex a template literal after its opening backtick"""
+        code, n = self.code, len(self.code)
+        self._emit("template", "`", start_line)
+        while self.i < n:
+            text = TEMPLATE_TEXT.match(code, self.i).group()
+            self.line += text.count("\n")
+            self.i += len(text)
+            if self.i >= n:
+                break
+            if code[self.i] == "`":
+                self.i += 1
+                self._prev = ("template", "`", start_line)
+                return
+            if not code.startswith("${", self.i):
+                break  # Trailing backslash at end of file
+            self.i += 2
+            self._lex_code(until_brace=True)
+        self.errors.append(f"Unterminated template literal at line {start_line}")
+
+    def _jsx_element(self):
+        """Lex a JSX element starting at its `<`, skipping text and lexing {expressions}"""
+        code, n = self.code, len(self.code)
+        self.i += 1
+        name = JSX_NAME.match(code, self.i)
+        if name:
+            self.i = name.end()
+
+        # Attributes
+        while self.i < n:
+            c = code[self.i]
+            if c == "\n":
+                self.line += 1
+                self.i += 1
+            elif c.isspace() or c == "=":
+                self.i += 1
+            elif code.startswith("/>", self.i):
+                self.i += 2
+                return
+            elif c == ">":
+                self.i += 1
+                break
+            elif c == "{":
+                self.i += 1
+                self._lex_code(until_brace=True)
+            elif c in "\"'":
+                end = code.find(c, self.i + 1)
+                end = n - 1 if end == -1 else end
+                self.line += code.count("\n", self.i, end)
+                self.i = end + 1
+            else:
+                attr = JSX_NAME.match(code, self.i)
+                if attr:
+                    self._emit("jsxattr", attr.group(), self.line)
+                    self.i = attr.end()
+                else:
+                    self.i += 1
+
+        # Children
+        while self.i < n:
+            c = code[self.i]
+            if c == "<":
+                if code.startswith("</", self.i):
+                    end = code.find(">", self.i)
+                    end = n - 1 if end == -1 else end
+                    self.line += code.count("\n", self.i, end)
+                    self.i = end + 1
+                    return
+                self._jsx_element()
+            elif c == "{":
+                self.i += 1
+                self._lex_code(until_brace=True)
+            else:
+                text = JSX_TEXT.match(code, self.i).group()
+                self.line += text.count("\n")
+                self.i += len(text)
+
+
+class JSAnalyzer:
+    """
+    Analyzes JS/TS/JSX source from one token stream
+
+    Reports per-function cyclomatic complexity (1 + if/for/while/case/
+    catch/&&/||/??/ternary) and rule findings with line numbers. Findings
+    are suppressed by `// aidev: ignore` or `// aidev: ignore[JS101]` on
+    their line.
+    """
+
+    def analyze(self, code: str, jsx: bool = True) -> Dict:
+        """
+        Analyze source code
+
+        Args:
+            code: JS/TS source
+            jsx: Whether `<Tag>` in expression position is JSX (off for .ts files)
+
+        Returns:
+            Dict with 'syntax', 'complexity', 'findings' and 'functions'
+        """
+        lexer = JSLexer(code, jsx=jsx)
+        tokens = lexer.tokenize()
+
+        matches: Dict[str, List[Tuple[int, str]]] = {}
+        functions = self._scan(tokens, matches)
+
+        suppressed: Dict[int, Optional[set]] = {}
+        for line, comment in lexer.comments:
+            add_suppression(suppressed, line, comment)
+
+        return {
+            "errors": lexer.errors,
+            "functions": functions,
+            "findings": build_findings(JS_RULES, matches, suppressed),
+            "tokens": len(tokens),
+        }
+
+    def _scan(self, tokens: List[Tuple[str, str, int]], matches: Dict) -> List[Dict]:
+        """Walk the tokens once, tracking function bodies and rule matches"""
+
+        def match(rule_id: str, line: int, message: str = ""):
+            matches.setdefault(rule_id, []).append((line, message))
+
+        functions = []
+        # [name, line, brace depth of the body, complexity]; the first entry is module level
+        stack: List[list] = [["<module>", 1, 0, 1]]
+        depth = 0
+        paren_starts: List[int] = []
+        paren_match: Dict[int, int] = {}
+        pending: Optional[Tuple[str, int]] = None  # Function signature waiting for its body
+
+        for index, (kind, value, line) in enumerate(tokens):
+            prev = tokens[index - 1] if index > 0 else ("", "", 0)
+            prev2 = tokens[index - 2] if index > 1 else ("", "", 0)
+
+            if kind == "name":
+                if prev[1] == "." or prev[1] == "?.":
+                    if value == "log" and prev2[1] == "console":
+                        match("JS202", line)
+                    continue
+                if value in DECISION_KEYWORDS:
+                    stack[-1][3] += 1
+                elif value == "var":
+                    match("JS201", line)
+                elif value == "debugger":
+                    match("JS204", line, "Remove debugger statement")
+                if pending and value in ["if", "for", "while", "switch", "return"]:
+                    pending = None
+                continue
+
+            if kind == "jsxattr":
+                if value == "dangerouslySetInnerHTML":
+                    match("JS102", line, "XSS risk: dangerouslySetInnerHTML with unsanitized content")
+                continue
+
+            if kind != "punct":
+                if kind in ["str", "num", "regex", "template", "jsx"]:
+                    pending = None
+                continue
+
+            if value in DECISION_OPERATORS:
+                stack[-1][3] += 1
+
+            if value == "(":
+                paren_starts.append(index)
+                self._check_call(tokens, index, prev, prev2, line, match)
+            elif value == ")":
+                if paren_starts:
+                    start = paren_starts.pop()
+                    paren_match[index] = start
+                    pending = self._signature_name(tokens, start)
+            elif value == "=>":
+                pending = (self._arrow_name(tokens, index, paren_match), line)
+            elif value == "{":
+                depth += 1
+                if pending is not None:
+                    stack.append([pending[0], pending[1], depth, 1])
+                pending = None
+            elif value == "}":
+                if len(stack) > 1 and stack[-1][2] == depth:
+                    name, start_line, _, complexity = stack.pop()
+                    functions.append(
+                        {"name": name, "line": start_line, "end_line": line, "complexity": complexity}
+                    )
+                depth -= 1
+            elif value in ["==", "!="]:
+                following = tokens[index + 1][1] if index + 1 < len(tokens) else ""
+                if following not in ["null", "undefined"]:
+                    match("JS203", line, f"Use {value}= instead of {value} (loose equality)")
+            elif value in ["=", "+="] and prev[1] in ["innerHTML", "outerHTML"] and prev2[1] == ".":
+                match("JS102", line, f"XSS risk: assigning to {prev[1]} - use textContent or sanitize")
+
+            if pending is not None and value not in SIGNATURE_TOKENS and value not in ["(", ")", "{"]:
+                pending = None
+
+        # Functions left open by unbalanced braces still get reported
+        while len(stack) > 1:
+            name, start_line, _, complexity = stack.pop()
+            functions.append({"name": name, "line": start_line, "end_line": None, "complexity": complexity})
+
+        functions.sort(key=lambda f: f["line"])
+        return functions
+
+    @staticmethod
+    def _check_call(tokens, index, prev, prev2, line, match):
+        """Rules that look at a call: the token before `(` is the callee"""
+        callee = prev[1]
+        if prev[0] != "name":
+            return
+        if callee == "eval" and prev2[1] != ".":
+            match("JS101", line, "Dangerous: eval usage detected")
+        elif callee == "Function" and prev2[1] == "new":
+            match("JS101", line, "Dangerous: new Function() evaluates code like eval")
+        elif callee in ["write", "writeln"] and prev2[1] == "." and index > 2 and tokens[index - 3][1] == "document":
+            match("JS103", line, "Avoid document.write - it can inject unescaped HTML")
+        elif callee in ["setTimeout", "setInterval"] and prev2[1] != ".":
+            following = tokens[index + 1] if index + 1 < len(tokens) else ("", "", 0)
+            if following[0] == "str":
+                match("JS104", line, f"String passed to {callee} is evaluated like eval - pass a function")
+
+    @staticmethod
+    def _signature_name(tokens, start: int) -> Optional[Tuple[str, int]]:
+        """If the parentheses starting at `start` are a function's parameters, return (name, line)"""
+        if start == 0:
+            return None
+        kind, value, line = tokens[start - 1]
+        if kind != "name" or value in CONTROL_KEYWORDS:
+            return None
+        if value == "function":
+            return ("<anonymous>", line)
+        if start > 1 and tokens[start - 2][1] in [".", "?."]:
+            return None  # obj.method(...) is a call
+        return (value, line)
+
+    @staticmethod
+    def _arrow_name(tokens, index: int, paren_match: Dict[int, int]) -> str:
+        """Name of the variable or property an arrow function is assigned to"""
+        start = paren_match.get(index - 1, index - 1)
+        before = start - 1
+        if before >= 0 and tokens[before][1] == "async":
+            before -= 1
+        if before >= 1 and tokens[before][1] in ["=", ":"] and tokens[before - 1][0] == "name":
+            return tokens[before - 1][1]
+        return "<arrow>"
@@ -0,0 +1,324 @@
+"""
+AST rule engine for Python security and best-practice checks
+"""
+import ast
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+SEVERITIES = ["info", "low", "medium", "high"]
+
+SQL_QUERY = re.compile(r"\b(SELECT\b.*\bFROM|INSERT\s+INTO|UPDATE\b.*\bSET|DELETE\s+FROM)\b", re.I | re.S)
+PASSWORD_NAME = re.compile(r"passw(or)?d|secret", re.I)
+API_KEY_NAME = re.compile(r"api[_-]?key|access[_-]?token", re.I)
+SUPPRESSION = re.compile(r"(?:#|//|/\*)\s*aidev:\s*ignore(?:\[([\w\s,-]+)\])?", re.I)
+MAX_LINE_LENGTH = 100
+
+
+class Finding:
+    """One rule violation"""
+
+    def __init__(self, rule_id: str, category: str, severity: str, line: int, message: str):
+        self.rule_id = rule_id
+        self.category = category
+        self.severity = severity
+        self.line = line
+        self.message = message
+
+    def to_dict(self) -> Dict:
+        return {
+            "rule": self.rule_id,
+            "category": self.category,
+            "severity": self.severity,
+            "line": self.line,
+            "message": self.message,
+        }
+
+    def __str__(self) -> str:
+        return f"Line {self.line}: {self.message} [{self.rule_id}]"
+
+
+class Rule:
+    """
+    A single check
+
+    AST rules receive each node of one of node_types and return a message
+    (or None). Line rules (lines=True) receive each source line instead.
+    Rules with a threshold report one summary finding, formatted with
+    {count}, when they match more than threshold times.
+    """
+
+    def __init__(
+        self,
+        rule_id: str,
+        name: str,
+        category: str,
+        severity: str,
+        check: Callable,
+        node_types: Tuple = (),
+        lines: bool = False,
+        threshold: Optional[int] = None,
+        summary: str = "",
+    ):
+        self.rule_id = rule_id
+        self.name = name
+        self.category = category
+        self.severity = severity
+        self.check = check
+        self.node_types = node_types
+        self.lines = lines
+        self.threshold = threshold
+        self.summary = summary
+
+
+RULES: List[Rule] = []
+
+
+def rule(rule_id: str, name: str, category: str, severity: str, node_types: Tuple = (), **options):
+    """Decorator registering a check function as a Rule in RULES"""
+
+    def register(check: Callable) -> Callable:
+        RULES.append(Rule(rule_id, name, category, severity, check, node_types, **options))
+        return check
+
+    return register
+
+
+class RuleEngine:
+    """
+    Runs all rules in one traversal of the AST and one pass over the lines
+
+    Rules are indexed by node type up front, so each node is only offered
+    to the rules that care about it and adding a rule adds no extra pass.
+    A finding is suppressed by a comment on its line:
+    `# aidev: ignore` (all rules) or `# aidev: ignore[S101,B104]`.
+    """
+
+    def __init__(self, rules: Optional[List[Rule]] = None):
+        self.rules = list(RULES if rules is None else rules)
+        self._by_type: Dict[type, List[Rule]] = {}
+        for r in self.rules:
+            for node_type in r.node_types:
+                self._by_type.setdefault(node_type, []).append(r)
+        self._line_rules = [r for r in self.rules if r.lines]
+
+    def run(self, tree: Optional[ast.AST], lines: List[str]) -> List[Finding]:
+        """
+        Check a parsed module
+
+        Args:
+            tree: Parsed module (None on syntax errors: only line rules run)
+            lines: Source lines
+
+        Returns:
+            Unsuppressed findings ordered by line
+        """
+        matches: Dict[str, List[Tuple[int, str]]] = {}
+
+        if tree is not None:
+            by_type = self._by_type
+            for node in ast.walk(tree):
+                for r in by_type.get(type(node), ()):
+                    message = r.check(node)
+                    if message:
+                        matches.setdefault(r.rule_id, []).append((getattr(node, "lineno", 1), message))
+
+        suppressed: Dict[int, Optional[set]] = {}
+        for lineno, line in enumerate(lines, 1):
+            for r in self._line_rules:
+                message = r.check(line)
+                if message:
+                    matches.setdefault(r.rule_id, []).append((lineno, message))
+            if "#" in line:
+                add_suppression(suppressed, lineno, line)
+
+        return build_findings(self.rules, matches, suppressed)
+
+
+def add_suppression(suppressed: Dict[int, Optional[set]], lineno: int, comment: str):
+    """Record an `aidev: ignore[...]` comment (None means every rule)"""
+    match = SUPPRESSION.search(comment)
+    if match:
+        ids = match.group(1)
+        suppressed[lineno] = {i.strip().upper() for i in ids.split(",")} if ids else None
+
+
+def build_findings(
+    rules: List[Rule], matches: Dict[str, List[Tuple[int, str]]], suppressed: Dict[int, Optional[set]]
+) -> List[Finding]:
+    """
+    Turn raw rule matches into findings
+
+    Args:
+        rules: Rules that produced the matches
+        matches: {rule_id: [(line, message)]}
+        suppressed: {line: rule IDs to ignore, or None for all}
+
+    Returns:
+        Unsuppressed findings ordered by line, threshold rules summarized
+    """
+    findings = []
+    for r in rules:
+        hits = [
+            (lineno, message)
+            for lineno, message in matches.get(r.rule_id, [])
+            if lineno not in suppressed or (suppressed[lineno] is not None and r.rule_id not in suppressed[lineno])
+        ]
+        if r.threshold is not None:
+            if len(hits) > r.threshold:
+                findings.append(
+                    Finding(r.rule_id, r.category, r.severity, hits[0][0], r.summary.format(count=len(hits)))
+                )
+            continue
+        findings.extend(Finding(r.rule_id, r.category, r.severity, lineno, message) for lineno, message in hits)
+
+    findings.sort(key=lambda f: (f.line, f.rule_id))
+    return findings
+
+
+def _str_value(node) -> Optional[str]:
+    """Literal text of a str constant or the constant parts of an f-string"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            part.value for part in node.values if isinstance(part, ast.Constant) and isinstance(part.value, str)
+        )
+    return None
+
+
+def _call_name(node: ast.Call) -> str:
+    """Dotted name of the called function, e.g. 'subprocess.run' or 'eval'"""
+    parts = []
+    func = node.func
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    return ".".join(reversed(parts))
+
+
+def _target_names(node) -> List[str]:
+    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+    names = []
+    for target in targets:
+        if isinstance(target, ast.Name):
+            names.append(target.id)
+        elif isinstance(target, ast.Attribute):
+            names.append(target.attr)
+    return names
+
+
+def _assigned_secret_names(node) -> List[str]:
+    """Names given a non-empty string literal by an assignment or keyword argument"""
+    if isinstance(node, ast.keyword):
+        value = _str_value(node.value)
+        return [node.arg] if node.arg and value else []
+    if node.value is None or not _str_value(node.value):
+        return []
+    return _target_names(node)
+
+
+# Security rules
+
+@rule("S101", "eval-exec", "security", "high", (ast.Call,))
+def _eval_exec(node):
+    if isinstance(node.func, ast.Name) and node.func.id in ["eval", "exec"]:
+        return f"Dangerous: {node.func.id} usage detected"
+    return None
+
+
+@rule("S102", "shell-true", "security", "high", (ast.keyword,))
+def _shell_true(node):
+    if node.arg == "shell" and isinstance(node.value, ast.Constant) and node.value.value is True:
+        return "Security risk: subprocess with shell=True"
+    return None
+
+
+@rule("S103", "sql-string-building", "security", "medium", (ast.JoinedStr, ast.BinOp, ast.Call))
+def _sql_string_building(node):
+    if isinstance(node, ast.JoinedStr):
+        text = _str_value(node) if any(isinstance(v, ast.FormattedValue) for v in node.values) else None
+    elif isinstance(node, ast.BinOp):
+        text = _str_value(node.left) if isinstance(node.op, (ast.Mod, ast.Add)) else None
+    else:
+        is_format = isinstance(node.func, ast.Attribute) and node.func.attr == "format"
+        text = _str_value(node.func.value) if is_format else None
+    if text and SQL_QUERY.search(text):
+        return "Potential SQL injection risk - use parameterized queries"
+    return None
+
+
+@rule("S104", "hardcoded-password", "security", "medium", (ast.Assign, ast.AnnAssign, ast.keyword))
+def _hardcoded_password(node):
+    if any(PASSWORD_NAME.search(name) for name in _assigned_secret_names(node)):
+        return "Possible hardcoded password detected"
+    return None
+
+
+@rule("S105", "hardcoded-api-key", "security", "medium", (ast.Assign, ast.AnnAssign, ast.keyword))
+def _hardcoded_api_key(node):
+    if any(API_KEY_NAME.search(name) for name in _assigned_secret_names(node)):
+        return "Possible hardcoded API key detected"
+    return None
+
+
+@rule("S106", "unsafe-deserialization", "security", "high", (ast.Call,))
+def _unsafe_deserialization(node):
+    name = _call_name(node)
+    if name in ["pickle.load", "pickle.loads", "marshal.loads"]:
+        return f"Unsafe deserialization: {name} on untrusted data can execute code"
+    if name == "yaml.load" and not any(k.arg == "Loader" for k in node.keywords) and len(node.args) < 2:
+        return "Unsafe deserialization: yaml.load without a Loader - use yaml.safe_load"
+    return None
+
+
+# Best-practice rules
+
+@rule("B101", "missing-docstring", "best_practices", "info", (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+def _missing_docstring(node):
+    if ast.get_docstring(node, clean=False) is not None:
+        return None
+    if isinstance(node, ast.Module):
+        return "Missing module docstring" if node.body else None
+    if node.name.startswith("_"):
+        return None
+    kind = "class" if isinstance(node, ast.ClassDef) else "function"
+    return f"Missing docstring in {kind} '{node.name}'"
+
+
+@rule("B102", "function-name", "best_practices", "low", (ast.FunctionDef, ast.AsyncFunctionDef))
+def _function_name(node):
+    if node.name[:1].isupper():
+        return f"Function names should be lowercase with underscores: {node.name}"
+    return None
+
+
+@rule("B103", "class-name", "best_practices", "low", (ast.ClassDef,))
+def _class_name(node):
+    if node.name[:1].islower():
+        return f"Class names should use CapWords convention: {node.name}"
+    return None
+
+
+@rule(
+    "B104", "print-call", "best_practices", "info", (ast.Call,),
+    threshold=3, summary="Excessive print statements ({count}) - consider using logging",
+)
+def _print_call(node):
+    return isinstance(node.func, ast.Name) and node.func.id == "print"
+
+
+@rule("B105", "bare-except", "best_practices", "low", (ast.ExceptHandler,))
+def _bare_except(node):
+    if node.type is None:
+        return "Bare except clause - catch specific exceptions"
+    return None
+
+
+@rule(
+    "B106", "line-too-long", "best_practices", "info", lines=True,
+    threshold=0, summary=f"Lines too long (>{MAX_LINE_LENGTH} chars): {{count}} lines",
+)
+def _line_too_long(line):
+    return len(line) > MAX_LINE_LENGTH
@@ -0,0 +1,196 @@
+"""
+Atomic, content-deduplicating file writes
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import hashlib
+import os
+import stat
+import tempfile
+
+# Read the process umask once so new files get the same mode open(path, "w") would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def content_hash(data: bytes) -> str:
+    """Return the SHA-256 hex digest of data"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: Path, hash_index: Optional[Dict] = None) -> Optional[str]:
+    """
+    Hash a file's content, reusing a cached digest when size and mtime are unchanged
+
+    Args:
+        path: File to hash
+        hash_index: Optional dict of path -> (size, mtime_ns, digest)
+
+    Returns:
+        Hex digest, or None if the file does not exist
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+
+    key = str(path)
+    if hash_index is not None:
+        cached = hash_index.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+
+    with open(path, "rb") as f:
+        digest = content_hash(f.read())
+
+    if hash_index is not None:
+        hash_index[key] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def fsync_directory(directory: Path):
+    """Flush a directory entry to disk so renames inside it survive a crash"""
+    if os.name != "posix":
+        return  # Directories cannot be opened for fsync on Windows
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WriteTransaction:
+    """
+    Batch of atomic file writes committed together
+
+    Each write is staged in a temp file next to its target and renamed into
+    place on commit, so readers never see a half-written file. Writes whose
+    content already matches the file on disk are skipped. Each affected
+    directory is fsynced once per commit, however many files it received.
+    Renames are atomic per file, not per batch: if one fails, the files
+    renamed before it stay in place and are listed in `written`.
+    """
+
+    def __init__(self, hash_index: Optional[Dict] = None, durable: bool = True):
+        self.hash_index = hash_index if hash_index is not None else {}
+        self.durable = durable
+        self._staged: List[Tuple[Path, str, str]] = []  # (target, temp path, digest)
+        self._results: Dict[Path, str] = {}
+        self.written: List[Path] = []  # Targets renamed into place so far, in commit order
+
+    def add(self, path: Path, content: Union[str, bytes]) -> str:
+        """
+        Stage a write
+
+        Args:
+            path: Absolute target path
+            content: Text content (written as UTF-8) or raw bytes
+
+        Returns:
+            "unchanged" if the file already has this content, otherwise "staged"
+        """
+        data = content if isinstance(content, bytes) else content.encode("utf-8")
+        digest = content_hash(data)
+
+        # Later writes to the same path in one batch replace earlier ones
+        self._discard(path)
+
+        if file_hash(path, self.hash_index) == digest:
+            self._results[path] = "unchanged"
+            return "unchanged"
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                if self.durable:
+                    os.fsync(f.fileno())
+            os.chmod(tmp_path, self._target_mode(path))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self._staged.append((path, tmp_path, digest))
+        self._results[path] = "staged"
+        return "staged"
+
+    def commit(self) -> Dict[Path, str]:
+        """
+        Rename all staged files into place
+
+        Returns:
+            Dict of target path -> "written" or "unchanged"
+        """
+        directories = set()
+        try:
+            while self._staged:
+                path, tmp_path, digest = self._staged[0]
+                os.replace(tmp_path, path)
+                self._staged.pop(0)
+                self._results[path] = "written"
+                self.written.append(path)
+                directories.add(path.parent)
+                self._remember(path, digest)
+        finally:
+            self.rollback()
+
+        if self.durable:
+            for directory in directories:
+                fsync_directory(directory)
+
+        return dict(self._results)
+
+    def rollback(self):
+        """Delete any staged temp files that were not committed"""
+        for _, tmp_path, _ in self._staged:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+        self._staged = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def _discard(self, path: Path):
+        """Drop an earlier staged write to the same path"""
+        for entry in [e for e in self._staged if e[0] == path]:
+            self._staged.remove(entry)
+            try:
+                os.unlink(entry[1])
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, path: Path, digest: str):
+        """Record the committed file's hash so the next write can skip re-reading it"""
+        st = path.stat()
+        self.hash_index[str(path)] = (st.st_size, st.st_mtime_ns, digest)
+
+    @staticmethod
+    def _target_mode(path: Path) -> int:
+        """Keep an existing file's permissions, otherwise use the umask default"""
+        try:
+            return stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            return 0o666 & ~_UMASK
+
+
+def atomic_write_text(path: Path, text: str, durable: bool = False):
+    """Atomically replace path with text (used for caches and state files)"""
+    with WriteTransaction(durable=durable) as txn:
+        txn.add(path, text)
+
+
+def atomic_write_bytes(path: Path, data: bytes, durable: bool = False):
+    """Atomically replace path with binary data (compressed state files)"""
+    with WriteTransaction(durable=durable) as txn:
+        txn.add(path, data)
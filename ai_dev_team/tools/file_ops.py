@@ -2,9 +2,12 @@
 File operation tools for AI agents
 """
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Union
 import os
 
+from ..config import Config
+from .atomic_io import WriteTransaction
+
 
 class FileOperations:
     """Tools for file and directory operations"""
@@ -12,6 +15,7 @@ class FileOperations:
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
         self.base_dir.mkdir(exist_ok=True)
+        self._hash_index = {}  # path -> (size, mtime_ns, sha256) of files we wrote or compared
 
     def _resolve_path(self, filepath: str) -> Path:
         """Resolve and validate path within base directory"""
@@ -23,7 +27,11 @@ class FileOperations:
 
     def write_file(self, filepath: str, content: str) -> str:
         """
-        Write content to a file
+        Write content to a file atomically
+
+        The content goes to a temp file that is renamed over the target, so a
+        crash never leaves a half-written file. If the file already holds
+        identical content the write is skipped and reported as unchanged.
 
         Args:
             filepath: Relative path to file
@@ -34,18 +42,74 @@ class FileOperations:
         """
         try:
             path = self._resolve_path(filepath)
-            path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(content)
+            with WriteTransaction(self._hash_index) as txn:
+                status = txn.add(path, content)
 
-            size = len(content)
-            lines = content.count("\n") + 1
-            return f"✅ File written: {filepath} ({size} chars, {lines} lines)"
+            return self._format_write_result(filepath, content, status)
 
         except Exception as e:
             return f"❌ Error writing file: {str(e)}"
 
+    def write_files(self, files: Union[Dict[str, str], List[Dict[str, str]]]) -> str:
+        """
+        Write several files in one atomic batch
+
+        All files are staged first and renamed into place together, with one
+        fsync per directory. If any file fails to stage, nothing is written;
+        if a rename fails during the commit, the result names the files that
+        were already written.
+
+        Args:
+            files: Dict of filepath -> content, or list of {"filepath", "content"} dicts
+
+        Returns:
+            Per-file results with written/unchanged counts
+        """
+        txn = WriteTransaction(self._hash_index)
+        targets = {}
+        try:
+            if isinstance(files, dict):
+                entries = list(files.items())
+            else:
+                entries = [(f["filepath"], f["content"]) for f in files]
+
+            if not entries:
+                return "❌ No files given"
+
+            statuses = {}
+            with txn:
+                for filepath, content in entries:
+                    targets[filepath] = self._resolve_path(filepath)
+                    statuses[filepath] = txn.add(targets[filepath], content)
+
+            lines = [
+                self._format_write_result(filepath, content, statuses[filepath])
+                for filepath, content in entries
+            ]
+            unchanged = sum(1 for status in statuses.values() if status == "unchanged")
+            written = len(statuses) - unchanged
+            return f"✅ Batch write: {written} written, {unchanged} unchanged\n" + "\n".join(lines)
+
+        except Exception as e:
+            written = [filepath for filepath, path in targets.items() if path in txn.written]
+            if written:
+                # A rename failed part way through the commit; the earlier files are in place
+                return (
+                    f"❌ Error writing files ({len(written)} of {len(targets)} written: "
+                    f"{', '.join(written)}): {str(e)}"
+                )
+            return f"❌ Error writing files (nothing written): {str(e)}"
+
+    def _format_write_result(self, filepath: str, content: str, status: str) -> str:
+        """Format the result line for a single write"""
+        if status == "unchanged":
+            return f"✅ File unchanged: {filepath} (identical content, write skipped)"
+
+        size = len(content)
+        lines = content.count("\n") + 1
+        return f"✅ File written: {filepath} ({size} chars, {lines} lines)"
+
     def read_file(self, filepath: str) -> str:
         """
         Read content from a file
@@ -98,6 +162,8 @@ class FileOperations:
 
             items = []
             for item in sorted(path.iterdir()):
+                if item.name == Config.STATE_DIR_NAME:
+                    continue  # Run state (logs, caches), not part of the project
                 rel_path = item.relative_to(self.base_dir)
                 if item.is_dir():
                     items.append(f"📁 {rel_path}/")
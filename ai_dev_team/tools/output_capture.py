@@ -0,0 +1,301 @@
+"""
+Bounded, streaming capture of subprocess output
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+
+DEFAULT_ERROR_PATTERNS = [
+    r"\berror\b",
+    r"\bfailed\b",
+    r"\bexception\b",
+    r"Traceback \(most recent call last\)",
+    r"npm ERR!",
+    r"\bFAIL\b",
+]
+
+READ_CHUNK = 64 * 1024
+
+
+class BoundedOutput:
+    """
+    Keeps the head and tail of a byte stream in memory
+
+    Everything up to head_bytes + tail_bytes is held in full. Once a stream
+    outgrows that, it is spilled to a log file (capped at max_bytes) and only
+    the first head_bytes and last tail_bytes stay in memory. Lines matching
+    the error patterns are collected as they stream past.
+    """
+
+    def __init__(
+        self,
+        head_bytes: int,
+        tail_bytes: int,
+        max_bytes: int,
+        spill_path: Optional[Path] = None,
+        error_patterns: Optional[List[str]] = None,
+        max_error_lines: int = 30,
+    ):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self.total_bytes = 0
+        self.spilled_bytes = 0
+        self.error_lines: List[str] = []
+        self.max_error_lines = max_error_lines
+
+        self._error_re = (
+            re.compile("|".join(f"(?:{p})" for p in error_patterns), re.IGNORECASE)
+            if error_patterns
+            else None
+        )
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill = None
+        self._partial_line = b""
+        self._line_no = 0
+        self._closed = False
+        # A reader thread that outlived its join may still write while close() runs
+        self._lock = threading.Lock()
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > self.head_bytes + self.tail_bytes
+
+    def write(self, chunk: bytes):
+        """Append a chunk of output"""
+        with self._lock:
+            if self._closed:
+                return  # A detached grandchild kept the pipe open past the reader join
+            self.total_bytes += len(chunk)
+            self._scan_errors(chunk)
+
+            if self._spill is None and self.total_bytes > self.head_bytes + self.tail_bytes:
+                self._open_spill()
+
+            if self._spill is not None:
+                self._write_spill(chunk)
+
+            # Fill the head first, the rest goes to a sliding tail window
+            room = self.head_bytes - len(self._head)
+            if room > 0:
+                self._head += chunk[:room]
+                chunk = chunk[room:]
+            if chunk:
+                self._tail += chunk
+                if len(self._tail) > self.tail_bytes:
+                    del self._tail[: len(self._tail) - self.tail_bytes]
+
+    def close(self):
+        """Flush the last partial line and close the spill file"""
+        with self._lock:
+            self._closed = True
+            if self._partial_line:
+                self._match_line(self._partial_line)
+                self._partial_line = b""
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+    def render(self) -> str:
+        """Return the captured text, with a marker where the middle was dropped"""
+        head = self._head.decode("utf-8", errors="replace")
+        if not self.truncated:
+            return (head + self._tail.decode("utf-8", errors="replace")).strip()
+
+        omitted = self.total_bytes - len(self._head) - len(self._tail)
+        tail = self._tail.decode("utf-8", errors="replace")
+        return f"{head}\n\n... [{omitted:,} bytes omitted] ...\n\n{tail}".strip()
+
+    def _open_spill(self):
+        """Start spilling once the stream no longer fits in memory"""
+        if not self.spill_path:
+            return
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        self._spill = open(self.spill_path, "wb")
+        # Everything seen so far is still fully in memory at this point
+        self._write_spill(bytes(self._head) + bytes(self._tail))
+
+    def _write_spill(self, data: bytes):
+        room = self.max_bytes - self.spilled_bytes
+        if self._spill is None or room <= 0:
+            return
+        data = data[:room]
+        self._spill.write(data)
+        self.spilled_bytes += len(data)
+        if self.spilled_bytes >= self.max_bytes:
+            self._spill.write(b"\n... [log capped] ...\n")
+
+    def _scan_errors(self, chunk: bytes):
+        if self._error_re is None:
+            return
+        data = self._partial_line + chunk
+        lines = data.split(b"\n")
+        self._partial_line = lines.pop()
+        # Keep a runaway line without newlines from growing unbounded
+        if len(self._partial_line) > READ_CHUNK:
+            self._partial_line = self._partial_line[-READ_CHUNK:]
+        for line in lines:
+            self._match_line(line)
+
+    def _match_line(self, line: bytes):
+        self._line_no += 1
+        if len(self.error_lines) >= self.max_error_lines:
+            return
+        text = line.decode("utf-8", errors="replace").rstrip()
+        if self._error_re.search(text):
+            self.error_lines.append(f"{self._line_no}: {text[:300]}")
+
+
+def _pump(stream, sink: BoundedOutput):
+    """Copy a pipe into a BoundedOutput until EOF"""
+    try:
+        while True:
+            chunk = stream.read1(READ_CHUNK) if hasattr(stream, "read1") else stream.read(READ_CHUNK)
+            if not chunk:
+                break
+            sink.write(chunk)
+    finally:
+        stream.close()
+
+
+def kill_process_tree(proc: subprocess.Popen):
+    """Kill a process started with start_new_session and everything it spawned"""
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_streaming(
+    command: str,
+    cwd: str,
+    timeout: int,
+    stdout: BoundedOutput,
+    stderr: BoundedOutput,
+    env: Optional[Dict[str, str]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Dict:
+    """
+    Run a shell command, streaming its output into bounded buffers
+
+    Args:
+        command: Shell command
+        cwd: Working directory
+        timeout: Timeout in seconds
+        stdout: Sink for stdout
+        stderr: Sink for stderr
+        env: Optional environment
+        cancel_event: Optional event that kills the command when set
+
+    Returns:
+        Dict with 'returncode', 'timed_out', 'cancelled' and 'duration'
+    """
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=(os.name == "posix"),
+    )
+
+    readers = [
+        threading.Thread(target=_pump, args=(proc.stdout, stdout), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    cancelled = False
+    deadline = start + timeout
+    while True:
+        try:
+            proc.wait(timeout=0.1)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+            elif time.monotonic() >= deadline:
+                timed_out = True
+            else:
+                continue
+            kill_process_tree(proc)
+            proc.wait()
+            break
+
+    for reader in readers:
+        reader.join(timeout=5)
+    stdout.close()
+    stderr.close()
+
+    return {
+        "returncode": proc.returncode,
+        "timed_out": timed_out,
+        "cancelled": cancelled,
+        "duration": time.monotonic() - start,
+    }
+
+
+def prune_logs(log_dir: Path, keep: int):
+    """
+    Delete the logs of all but the newest keep commands
+
+    Args:
+        log_dir: Directory of '<log id>.<stream>.log' files
+        keep: Number of commands whose logs are kept
+    """
+    if not log_dir.is_dir():
+        return
+    newest: Dict[str, float] = {}
+    files: Dict[str, List[Path]] = {}
+    for path in log_dir.glob("*.log"):
+        log_id = path.name.split(".", 1)[0]
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        newest[log_id] = max(newest.get(log_id, 0.0), mtime)
+        files.setdefault(log_id, []).append(path)
+    for log_id in sorted(newest, key=newest.get, reverse=True)[keep:]:
+        for path in files[log_id]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def read_log_lines(path: Path, start_line: int = 1, num_lines: int = 100) -> List[str]:
+    """
+    Read a range of lines from a log file without loading all of it
+
+    Args:
+        path: Log file
+        start_line: First line to return (1-based)
+        num_lines: Number of lines to return
+
+    Returns:
+        The requested lines, without trailing newlines
+    """
+    lines = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for i, line in enumerate(f, 1):
+            if i < start_line:
+                continue
+            if len(lines) >= num_lines:
+                break
+            lines.append(line.rstrip("\n"))
+    return lines
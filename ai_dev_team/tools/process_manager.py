@@ -0,0 +1,253 @@
+"""
+Registry of long-running background processes (dev servers, watchers, databases)
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import os
+import re
+import signal
+import socket
+import subprocess
+import time
+
+from .output_capture import kill_process_tree, read_log_lines
+
+
+class ManagedProcess:
+    """A background process with its log file and poll position"""
+
+    def __init__(self, name: str, command: str, proc: subprocess.Popen, log_path: Path):
+        self.name = name
+        self.command = command
+        self.proc = proc
+        self.log_path = log_path
+        self.started_at = time.monotonic()
+        self.read_offset = 0  # Bytes of the log already shown by poll
+
+    @property
+    def running(self) -> bool:
+        return self.proc.poll() is None
+
+
+class ProcessRegistry:
+    """
+    Starts, polls and stops named background processes
+
+    Output of each process goes to its own log file so it never blocks on a
+    full pipe. Readiness can be probed by waiting for a TCP port to accept
+    connections or for a regex to appear in the log.
+    """
+
+    def __init__(self, work_dir: str, log_dir: Path):
+        self.work_dir = work_dir
+        self.log_dir = log_dir
+        self.processes: Dict[str, ManagedProcess] = {}
+
+    def start(
+        self,
+        name: str,
+        command: str,
+        ready_port: Optional[int] = None,
+        ready_pattern: Optional[str] = None,
+        ready_timeout: float = 30,
+    ) -> str:
+        """
+        Start a background process and optionally wait until it is ready
+
+        Args:
+            name: Unique name used to poll/stop the process
+            command: Shell command
+            ready_port: TCP port on localhost that accepts connections once ready
+            ready_pattern: Regex that appears in the output once ready
+            ready_timeout: Seconds to wait for readiness
+
+        Returns:
+            Start result with readiness status
+        """
+        if not re.fullmatch(r"[\w.-]+", name):
+            return f"❌ Invalid process name: {name} (use letters, digits, '.', '-', '_')"
+
+        existing = self.processes.get(name)
+        if existing and existing.running:
+            return f"⚠️ Process '{name}' is already running (pid {existing.proc.pid})"
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f"{name}.log"
+        with open(log_path, "wb") as log_file:
+            proc = subprocess.Popen(
+                command,
+                shell=True,
+                cwd=self.work_dir,
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                start_new_session=(os.name == "posix"),
+            )
+        managed = ManagedProcess(name, command, proc, log_path)
+        self.processes[name] = managed
+
+        ready, waited = self._wait_ready(managed, ready_port, ready_pattern, ready_timeout)
+
+        if not managed.running:
+            tail = "\n".join(self._tail(log_path, 20))
+            return (
+                f"❌ Process '{name}' exited during startup (exit code {proc.returncode}):\n{tail}"
+            )
+
+        if ready:
+            return f"✅ Process '{name}' started (pid {proc.pid}), ready after {waited:.1f}s"
+        if ready_port is not None or ready_pattern:
+            tail = "\n".join(self._tail(log_path, 10))
+            return (
+                f"⏱️ Process '{name}' started (pid {proc.pid}) but not ready after "
+                f"{ready_timeout}s. Recent output:\n{tail}"
+            )
+        return f"✅ Process '{name}' started (pid {proc.pid})"
+
+    def poll(self, name: Optional[str] = None, max_lines: int = 50) -> str:
+        """
+        Report status and new output of a background process
+
+        Args:
+            name: Process name (omit to list all processes)
+            max_lines: Maximum new log lines to return
+
+        Returns:
+            Status and output since the last poll
+        """
+        if not name:
+            if not self.processes:
+                return "📋 No background processes"
+            lines = [self._status_line(p) for p in self.processes.values()]
+            return "📋 Background processes:\n" + "\n".join(lines)
+
+        managed = self.processes.get(name)
+        if not managed:
+            return f"❌ Unknown process: {name}"
+
+        new_output = self._read_new(managed, max_lines)
+        result = self._status_line(managed)
+        if new_output:
+            result += "\nNew output:\n" + new_output
+        else:
+            result += "\n(no new output)"
+        return result
+
+    def stop(self, name: str, timeout: float = 5) -> str:
+        """
+        Stop a background process and everything it spawned
+
+        Args:
+            name: Process name
+            timeout: Seconds to wait after SIGTERM before SIGKILL
+
+        Returns:
+            Stop result
+        """
+        managed = self.processes.pop(name, None)
+        if not managed:
+            return f"❌ Unknown process: {name}"
+
+        if not managed.running:
+            return f"✅ Process '{name}' had already exited (exit code {managed.proc.returncode})"
+
+        self._terminate(managed, timeout)
+        return f"✅ Process '{name}' stopped"
+
+    def stop_all(self):
+        """Stop every background process"""
+        for name in list(self.processes):
+            managed = self.processes.pop(name)
+            if managed.running:
+                self._terminate(managed, timeout=2)
+
+    def _wait_ready(
+        self,
+        managed: ManagedProcess,
+        ready_port: Optional[int],
+        ready_pattern: Optional[str],
+        ready_timeout: float,
+    ):
+        """Wait until a readiness probe passes; returns (ready, seconds waited)"""
+        start = time.monotonic()
+        pattern = re.compile(ready_pattern) if ready_pattern else None
+
+        if ready_port is None and pattern is None:
+            # No probe: just give it a moment to fail fast on bad commands
+            time.sleep(0.3)
+            return managed.running, time.monotonic() - start
+
+        scanned = 0
+        carry = ""
+        while time.monotonic() - start < ready_timeout:
+            if not managed.running:
+                return False, time.monotonic() - start
+
+            if ready_port is not None and self._port_open(int(ready_port)):
+                return True, time.monotonic() - start
+
+            if pattern is not None:
+                with open(managed.log_path, "rb") as f:
+                    f.seek(scanned)
+                    data = f.read()
+                scanned += len(data)
+                text = carry + data.decode("utf-8", errors="replace")
+                if pattern.search(text):
+                    return True, time.monotonic() - start
+                carry = text[-1000:]  # Match patterns split across reads
+
+            time.sleep(0.1)
+
+        return False, time.monotonic() - start
+
+    @staticmethod
+    def _port_open(port: int) -> bool:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return True
+        except OSError:
+            return False
+
+    def _status_line(self, managed: ManagedProcess) -> str:
+        uptime = time.monotonic() - managed.started_at
+        if managed.running:
+            status = f"running (pid {managed.proc.pid}, up {uptime:.0f}s)"
+        else:
+            status = f"exited (code {managed.proc.returncode})"
+        return f"- {managed.name}: {status} - {managed.command}"
+
+    def _read_new(self, managed: ManagedProcess, max_lines: int) -> str:
+        """Return log output written since the last poll, keeping only the last max_lines"""
+        with open(managed.log_path, "rb") as f:
+            f.seek(managed.read_offset)
+            data = f.read()
+        managed.read_offset += len(data)
+
+        lines = data.decode("utf-8", errors="replace").splitlines()
+        if len(lines) > max_lines:
+            skipped = len(lines) - max_lines
+            lines = [f"... [{skipped} earlier lines in {managed.log_path.name}] ..."] + lines[-max_lines:]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _tail(path: Path, num_lines: int) -> List[str]:
+        with open(path, "rb") as f:
+            total = sum(1 for _ in f)
+        return read_log_lines(path, max(1, total - num_lines + 1), num_lines)
+
+    @staticmethod
+    def _terminate(managed: ManagedProcess, timeout: float):
+        """SIGTERM the process group, then SIGKILL if it does not exit"""
+        proc = managed.proc
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGTERM)
+            else:
+                proc.terminate()
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(proc)
+            proc.wait()
@@ -0,0 +1,62 @@
+"""
+pytest plugin that records which project files each test file executes
+
+Loaded with `-p aidev_depmap` from this directory so it does not need the
+ai_dev_team package inside the project's environment. A profile hook notes
+every project source file that has a function called while a test file's
+tests run; the map is written as JSON to $AIDEV_DEPMAP_OUT at session end.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+_root = os.path.realpath(os.getcwd()) + os.sep
+_output = os.environ.get("AIDEV_DEPMAP_OUT")
+_depmap = {}
+_current = None
+_seen_code = set()
+
+
+def _profile(frame, event, arg):
+    if event != "call" or _current is None:
+        return
+    code = frame.f_code
+    if code in _seen_code:
+        return
+    _seen_code.add(code)
+    filename = code.co_filename
+    if filename.startswith(_root) and filename.endswith(".py"):
+        _current.add(os.path.relpath(filename, _root))
+
+
+def _enter(item):
+    global _current
+    test_file = os.path.relpath(os.path.realpath(str(item.fspath)), _root)
+    if test_file not in _depmap:
+        _depmap[test_file] = set()
+        _seen_code.clear()  # Code already seen belongs to another test file
+    _current = _depmap[test_file]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    # Wraps setup, call and teardown so fixture code is attributed too
+    if not _output:
+        yield
+        return
+    _enter(item)
+    sys.setprofile(_profile)
+    try:
+        yield
+    finally:
+        sys.setprofile(None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _output:
+        return
+    sys.setprofile(None)
+    with open(_output, "w", encoding="utf-8") as f:
+        json.dump({test: sorted(files) for test, files in _depmap.items()}, f)
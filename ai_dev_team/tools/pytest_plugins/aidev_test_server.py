@@ -0,0 +1,90 @@
+"""
+Forking pytest server: pre-imports a project's modules once, forks a child per run
+
+Run inside the project's interpreter as
+`python aidev_test_server.py <module> [<module> ...]` from the project root.
+It imports pytest and the given modules, prints one JSON line listing the
+project files it loaded, then serves one JSON request per stdin line:
+
+    {"args": [...], "env": {...}, "stdout": "path", "stderr": "path"}
+
+For each request it forks; the child redirects its output to the given
+files and runs pytest.main(args). The server replies {"pid": child} as soon
+as the child starts and {"exit": code} when it finishes.
+"""
+import importlib
+import json
+import os
+import sys
+
+
+def _loaded_project_files(root):
+    files = {}
+    for module in list(sys.modules.values()):
+        filename = getattr(module, "__file__", None)
+        if filename and os.path.realpath(filename).startswith(root):
+            path = os.path.realpath(filename)
+            files[path] = os.stat(path).st_mtime_ns
+    return files
+
+
+def _run_child(request):
+    for stream, key in [(1, "stdout"), (2, "stderr")]:
+        fd = os.open(request[key], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(fd, stream)
+        os.close(fd)
+    os.environ.update(request.get("env", {}))
+    # The plugin search path may have changed since the server started
+    for path in request.get("sys_path", []):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    import pytest
+
+    code = pytest.main(request["args"])
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(int(code))
+
+
+def main():
+    root = os.path.realpath(os.getcwd()) + os.sep
+    sys.path.insert(0, os.getcwd())
+
+    # Replies go to a private copy of stdout; anything the project prints goes to stderr
+    protocol = os.fdopen(os.dup(1), "w")
+    os.dup2(2, 1)
+
+    import pytest  # noqa: F401  Pre-import pytest itself, the biggest fixed cost
+
+    failed = []
+    for name in sys.argv[1:]:
+        try:
+            importlib.import_module(name)
+        except BaseException:  # Broken modules are imported fresh by each run instead
+            failed.append(name)
+
+    reply = {"ready": True, "files": _loaded_project_files(root), "failed": failed}
+    protocol.write(json.dumps(reply) + "\n")
+    protocol.flush()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_child(request)
+            finally:
+                os._exit(70)
+        protocol.write(json.dumps({"pid": pid}) + "\n")
+        protocol.flush()
+        _, status = os.waitpid(pid, 0)
+        code = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status >> 8
+        protocol.write(json.dumps({"exit": code}) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Incremental pytest runs with structured, compact results
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import ast
+import json
+import os
+import re
+import shlex
+import xml.etree.ElementTree as ET
+
+from .atomic_io import content_hash
+from .output_capture import BoundedOutput, READ_CHUNK, run_streaming
+from .pytest_server import PytestServer
+
+PLUGIN_DIR = Path(__file__).parent / "pytest_plugins"
+LOCATION_RE = re.compile(r"^\S+\.py:\d+: \w+")
+# pytest exit codes of runs that collected every selected file: all passed, some failed, no tests
+COMPLETE_EXIT_CODES = [0, 1, 5]
+SKIP_DIRS = {"node_modules", "venv", ".venv", "env", "__pycache__", "site-packages", "build", "dist"}
+
+
+def is_test_file(path: Path) -> bool:
+    """pytest's default test file naming"""
+    return path.suffix == ".py" and (path.name.startswith("test_") or path.stem.endswith("_test"))
+
+
+def iter_python_files(root: Path):
+    """Yield project .py files, skipping hidden dirs, virtualenvs and build output"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS]
+        for filename in filenames:
+            if filename.endswith(".py"):
+                yield Path(dirpath) / filename
+
+
+class ImportGraph:
+    """
+    Static import graph of a project's Python files
+
+    Modules are indexed by every dotted suffix of their path, so both
+    `import app.models` and a src-layout `import models` resolve.
+    Unresolvable imports (stdlib, third-party) are ignored.
+    """
+
+    def __init__(self, root: Path, files: List[Path]):
+        self.root = root
+        self.files = [f.relative_to(root).as_posix() for f in files]
+        self._index: Dict[str, Set[str]] = {}
+        for rel in self.files:
+            parts = rel[:-3].split("/")
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            for i in range(len(parts)):
+                self._index.setdefault(".".join(parts[i:]), set()).add(rel)
+
+        self.imports: Dict[str, Set[str]] = {rel: self._resolve_imports(rel) for rel in self.files}
+        self._closure: Dict[str, Set[str]] = {}
+
+    def dependencies(self, rel: str) -> Set[str]:
+        """All project files rel imports, directly or transitively"""
+        if rel in self._closure:
+            return self._closure[rel]
+
+        seen = set()
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            for dep in self.imports.get(current, ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        seen.discard(rel)
+        self._closure[rel] = seen
+        return seen
+
+    def _resolve_imports(self, rel: str) -> Set[str]:
+        try:
+            tree = ast.parse((self.root / rel).read_text(encoding="utf-8"))
+        except (SyntaxError, UnicodeDecodeError, OSError):
+            return set()
+
+        package = rel[:-3].split("/")[:-1]
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base = package[: len(package) - (node.level - 1)] if node.level > 1 else package
+                    module = ".".join(base + ([node.module] if node.module else []))
+                else:
+                    module = node.module or ""
+                if module:
+                    names.append(module)
+                # `from pkg import submodule` imports a module, not just a name
+                names.extend(f"{module}.{alias.name}" if module else alias.name for alias in node.names)
+
+        deps = set()
+        for name in names:
+            parts = name.split(".")
+            # The module itself plus the packages it lives in
+            for i in range(len(parts), 0, -1):
+                deps |= self._index.get(".".join(parts[:i]), set())
+        deps.discard(rel)
+        return deps
+
+
+class IncrementalTestRunner:
+    """
+    Runs only the pytest files affected by changes since the previous run
+
+    A test file is selected when it, a file it imports (transitively), a
+    file it executed in an earlier run, or a conftest.py above it changed
+    since that test file last ran. Each test file keeps its own baseline of
+    input hashes, so a run narrowed by test_path does not mark changes as
+    seen for tests outside it.
+    Test files that failed last time and new test files always run. Results
+    come from JUnit XML and report failing assertions only.
+
+    With use_server, runs go through a PytestServer that keeps pytest and
+    the project modules the tests import pre-loaded between runs.
+    """
+
+    def __init__(self, work_dir: str, state_dir: Path, use_server: bool = False):
+        self.work_dir = Path(work_dir)
+        self.state_dir = state_dir
+        self.state_path = state_dir / "state.json"
+        self.server = PytestServer(self.work_dir, state_dir / "server") if use_server else None
+
+    def close(self):
+        """Stop the test server, if one is running"""
+        if self.server:
+            self.server.close()
+
+    def run(self, test_path: str = ".", incremental: bool = True, timeout: int = 300) -> str:
+        """
+        Run affected tests and summarize the results
+
+        Args:
+            test_path: Directory or file to restrict tests to
+            incremental: Only run tests affected by changes (False runs all)
+            timeout: Timeout in seconds
+
+        Returns:
+            Compact pass/fail summary
+        """
+        root = self.work_dir.resolve()
+        target = (root / test_path).resolve()
+        if not str(target).startswith(str(root)):
+            return f"❌ Access denied: {test_path} is outside workspace"
+
+        files = list(iter_python_files(root))
+        hashes = {f.relative_to(root).as_posix(): content_hash(f.read_bytes()) for f in files}
+        tests = [
+            f.relative_to(root).as_posix()
+            for f in files
+            if is_test_file(f) and (f == target or target in f.parents)
+        ]
+        if not tests:
+            return f"❌ No test files found in {test_path}"
+
+        state = self._load_state()
+        graph = ImportGraph(root, files)
+        changed = set()
+        for test in tests:
+            changed |= self._changed_inputs(graph, test, hashes, state)
+
+        if incremental:
+            selected = self._select(graph, tests, hashes, state)
+        else:
+            selected = tests
+
+        if not selected:
+            return (
+                f"✅ No tests affected by changes since the last run "
+                f"({len(tests)} test files skipped, {len(changed)} files changed)"
+            )
+
+        junit_path = self.state_dir / "junit.xml"
+        depmap_path = self.state_dir / "depmap.json"
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        for path in [junit_path, depmap_path]:
+            if path.exists():
+                path.unlink()
+
+        stdout = BoundedOutput(head_bytes=1500, tail_bytes=2500, max_bytes=0)
+        stderr = BoundedOutput(head_bytes=500, tail_bytes=1500, max_bytes=0)
+        args = self._pytest_args(selected, junit_path)
+        run = None
+        if self.server and PytestServer.supported():
+            modules = self._preload_modules(graph, tests)
+            run = self._run_on_server(args, depmap_path, modules, timeout, stdout, stderr)
+        if run is None:
+            command = "python -m pytest " + " ".join(shlex.quote(arg) for arg in args)
+            run = run_streaming(command, str(root), timeout, stdout, stderr, env=self._env(depmap_path))
+
+        if run["timed_out"]:
+            return f"⏱️ Tests timed out after {timeout} seconds\n{stdout.render()}"
+
+        results = self._parse_junit(junit_path)
+        if results is None:
+            # Collection crashed before a report was written
+            output = stderr.render() or stdout.render()
+            return f"❌ Test run failed (exit code {run['returncode']}), no report produced:\n{output}"
+
+        coverage = dict(state["coverage"])
+        if depmap_path.exists():
+            coverage.update(json.loads(depmap_path.read_text(encoding="utf-8")))
+        failed_files = {case["file"] for case in results if case["outcome"] in ["failed", "error"]}
+        if run["returncode"] not in COMPLETE_EXIT_CODES:
+            # Files that never ran because the run was interrupted stay pending like failures;
+            # after a complete run they simply hold no tests and count as passed
+            failed_files |= set(selected) - {case["file"] for case in results}
+        # Unselected files keep their failure status until they run again
+        failed = (set(state["failed"]) - set(selected)) | failed_files
+
+        # Only the tests in this run's scope advance their baseline; others keep theirs
+        baselines = {test: base for test, base in state["baselines"].items() if test in hashes}
+        state["coverage"] = coverage
+        for test in tests:
+            baselines[test] = {rel: hashes[rel] for rel in self._inputs(graph, test, state) if rel in hashes}
+        self._save_state(baselines, coverage, sorted(failed))
+
+        return self._format(results, selected, tests, changed, run["duration"], incremental)
+
+    def _select(self, graph: ImportGraph, tests: List[str], hashes: Dict[str, str], state: Dict) -> List[str]:
+        selected = []
+        for test in tests:
+            if test not in state["baselines"] or test in state["failed"]:
+                selected.append(test)  # New (or never run in scope) or previously failing test file
+            elif self._changed_inputs(graph, test, hashes, state):
+                selected.append(test)
+        return selected
+
+    def _inputs(self, graph: ImportGraph, test: str, state: Dict) -> Set[str]:
+        """Files a test file's outcome depends on: itself, its imports, files it executed, conftests above it"""
+        inputs = {test} | graph.dependencies(test) | set(state["coverage"].get(test, []))
+        inputs |= {
+            rel for rel in graph.files
+            if rel.endswith("conftest.py") and self._in_dir(test, rel.rpartition("/")[0])
+        }
+        return inputs
+
+    def _changed_inputs(self, graph: ImportGraph, test: str, hashes: Dict[str, str], state: Dict) -> Set[str]:
+        """Inputs of a test file that changed since it last ran (all of them if it never ran)"""
+        baseline = state["baselines"].get(test, {})
+        changed = {rel for rel in self._inputs(graph, test, state) if baseline.get(rel) != hashes.get(rel)}
+        changed |= {rel for rel in baseline if rel not in hashes}  # Deleted inputs
+        return changed
+
+    @staticmethod
+    def _in_dir(rel: str, directory: str) -> bool:
+        return not directory or rel.startswith(directory + "/")
+
+    @staticmethod
+    def _pytest_args(selected: List[str], junit_path: Path) -> List[str]:
+        # Run as `python -m pytest` so the project root is on sys.path, as generated projects expect
+        return selected + [
+            "-q", "-rN", "-p", "aidev_depmap", f"--junitxml={junit_path}", "-o", "junit_family=xunit1"
+        ]
+
+    def _run_on_server(
+        self,
+        args: List[str],
+        depmap_path: Path,
+        modules: List[str],
+        timeout: int,
+        stdout: BoundedOutput,
+        stderr: BoundedOutput,
+    ) -> Optional[Dict]:
+        """Run on the forking server; None if the server could not start or died mid-run"""
+        try:
+            run = self.server.run(
+                args, {"AIDEV_DEPMAP_OUT": str(depmap_path)}, [str(PLUGIN_DIR)], modules, timeout
+            )
+        except (RuntimeError, OSError):
+            self.server.close()
+            return None
+
+        for path, sink in [(run["stdout_path"], stdout), (run["stderr_path"], stderr)]:
+            if path.exists():
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                        sink.write(chunk)
+            sink.close()
+        return run
+
+    @staticmethod
+    def _preload_modules(graph: ImportGraph, tests: List[str]) -> List[str]:
+        """Dotted names of the non-test project modules any test imports"""
+        modules = set()
+        for test in tests:
+            for rel in graph.dependencies(test):
+                if is_test_file(Path(rel)) or rel.endswith("conftest.py"):
+                    continue
+                parts = rel[:-3].split("/")
+                if parts[-1] == "__init__":
+                    parts = parts[:-1]
+                if parts and all(part.isidentifier() for part in parts):
+                    modules.add(".".join(parts))
+        return sorted(modules)
+
+    @staticmethod
+    def _env(depmap_path: Path) -> Dict[str, str]:
+        env = dict(os.environ)
+        env["AIDEV_DEPMAP_OUT"] = str(depmap_path)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in [str(PLUGIN_DIR), env.get("PYTHONPATH")] if p)
+        return env
+
+    def _parse_junit(self, junit_path: Path) -> Optional[List[Dict]]:
+        """Extract one record per test case; failure details keep only assertion lines"""
+        if not junit_path.exists():
+            return None
+        try:
+            tree = ET.parse(junit_path)
+        except ET.ParseError:
+            return None
+
+        results = []
+        for case in tree.iter("testcase"):
+            record = {
+                "name": case.get("name", "?"),
+                "file": case.get("file") or case.get("classname", "").replace(".", "/") + ".py",
+                "line": int(case.get("line")) + 1 if case.get("line") else None,  # JUnit lines are 0-based
+                "outcome": "passed",
+                "details": [],
+            }
+            for outcome in ["failure", "error", "skipped"]:
+                element = case.find(outcome)
+                if element is not None:
+                    record["outcome"] = {"failure": "failed", "error": "error", "skipped": "skipped"}[outcome]
+                    if outcome != "skipped":
+                        record["details"] = self._failure_lines(element)
+                    break
+            results.append(record)
+        return results
+
+    @staticmethod
+    def _failure_lines(element) -> List[str]:
+        """pytest's `E   ` lines plus the failing location"""
+        text = element.text or ""
+        lines = [line[1:].strip() for line in text.splitlines() if line.startswith("E ")]
+        location = [line.strip() for line in text.splitlines() if LOCATION_RE.match(line.strip())]
+        details = lines[:8] or [element.get("message", "").strip()[:300]]
+        return details + location[-1:]
+
+    def _format(
+        self,
+        results: List[Dict],
+        selected: List[str],
+        tests: List[str],
+        changed: Set[str],
+        duration: float,
+        incremental: bool,
+    ) -> str:
+        counts = {"passed": 0, "failed": 0, "error": 0, "skipped": 0}
+        for case in results:
+            counts[case["outcome"]] += 1
+
+        ok = counts["failed"] == 0 and counts["error"] == 0
+        emoji = "✅" if ok else "❌"
+        summary = (
+            f"{emoji} Tests: {counts['passed']} passed, {counts['failed']} failed, "
+            f"{counts['error']} errors, {counts['skipped']} skipped in {duration:.1f}s"
+        )
+        if incremental and len(selected) < len(tests):
+            summary += f"\nRan {len(selected)}/{len(tests)} test files affected by {len(changed)} changed files"
+
+        lines = [summary]
+        for case in results:
+            if case["outcome"] not in ["failed", "error"]:
+                continue
+            location = f"{case['file']}:{case['line']}" if case["line"] else case["file"]
+            lines.append(f"\n{case['outcome'].upper()} {case['name']} ({location})")
+            lines.extend(f"  {detail}" for detail in case["details"] if detail)
+        return "\n".join(lines)
+
+    def _load_state(self) -> Dict:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = {}
+        return {
+            # Per test file: hashes of its inputs when it last ran (older states without them rerun once)
+            "baselines": state.get("baselines", {}),
+            "coverage": state.get("coverage", {}),
+            "failed": state.get("failed", []),
+        }
+
+    def _save_state(self, baselines: Dict, coverage: Dict, failed: List[str]):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(
+            json.dumps({"baselines": baselines, "coverage": coverage, "failed": failed}), encoding="utf-8"
+        )
@@ -0,0 +1,177 @@
+"""
+Client for the forking pytest server
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+
+SERVER_SCRIPT = Path(__file__).parent / "pytest_plugins" / "aidev_test_server.py"
+
+
+class PytestServer:
+    """
+    Keeps a pre-imported pytest process alive and forks a child per test run
+
+    The server imports pytest and the project's non-test modules once, so a
+    run only pays for collecting and executing tests. Before each run the
+    files the server pre-imported are checked; if any changed on disk (or
+    the module list changed) the server is restarted so no test sees stale
+    code. POSIX only, since it relies on fork().
+    """
+
+    def __init__(self, work_dir: Path, log_dir: Path, startup_timeout: float = 60):
+        self.work_dir = work_dir
+        self.log_dir = log_dir
+        self.startup_timeout = startup_timeout
+        self.restarts = 0
+        self._proc: Optional[subprocess.Popen] = None
+        self._replies: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._modules: List[str] = []
+        self._files: Dict[str, int] = {}
+
+    @staticmethod
+    def supported() -> bool:
+        return hasattr(os, "fork")
+
+    def run(
+        self,
+        args: List[str],
+        env: Dict[str, str],
+        sys_path: List[str],
+        modules: List[str],
+        timeout: float,
+    ) -> Dict:
+        """
+        Run pytest in a forked child of the server
+
+        Args:
+            args: pytest arguments
+            env: Environment variables to set in the child
+            sys_path: Extra import paths for the child (e.g. plugin dir)
+            modules: Project modules the server should have pre-imported
+            timeout: Timeout in seconds
+
+        Returns:
+            Dict with 'returncode', 'timed_out', 'duration', 'stdout_path' and 'stderr_path'
+
+        Raises:
+            RuntimeError: If the server could not start or died during the run
+        """
+        if self._stale(modules):
+            self.close()
+        if not self.alive:
+            self._start(modules)
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        stdout_path = self.log_dir / "server-run.stdout.log"
+        stderr_path = self.log_dir / "server-run.stderr.log"
+        request = {
+            "args": args,
+            "env": env,
+            "sys_path": sys_path,
+            "stdout": str(stdout_path),
+            "stderr": str(stderr_path),
+        }
+
+        start = time.monotonic()
+        self._proc.stdin.write((json.dumps(request) + "\n").encode())
+        self._proc.stdin.flush()
+
+        child = self._reply(start + timeout)
+        reply = self._reply(start + timeout) if child else None
+        if reply is None:
+            died = not self.alive or time.monotonic() < start + timeout
+            if child:
+                try:
+                    os.kill(child["pid"], signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            self.close()  # The protocol may be out of step now
+            if died:
+                # A crashed server is not a slow test: let the caller fall back to a subprocess
+                raise RuntimeError(f"test server exited during the run (see {self.log_dir / 'server.log'})")
+        timed_out = reply is None
+
+        return {
+            "returncode": None if timed_out else reply["exit"],
+            "timed_out": timed_out,
+            "duration": time.monotonic() - start,
+            "stdout_path": stdout_path,
+            "stderr_path": stderr_path,
+        }
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self):
+        """Stop the server"""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
+
+    def _stale(self, modules: List[str]) -> bool:
+        """True if the server pre-imported code that has since changed"""
+        if not self.alive:
+            return False
+        if sorted(modules) != self._modules:
+            return True
+        for path, mtime in self._files.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def _start(self, modules: List[str]):
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._replies = queue.Queue()
+        with open(self.log_dir / "server.log", "ab") as log:
+            self._proc = subprocess.Popen(
+                ["python", str(SERVER_SCRIPT)] + sorted(modules),
+                cwd=str(self.work_dir),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=log,
+            )
+        threading.Thread(target=self._read, args=(self._proc, self._replies), daemon=True).start()
+
+        ready = self._reply(time.monotonic() + self.startup_timeout)
+        if not ready:
+            self.close()
+            raise RuntimeError(f"test server did not start (see {self.log_dir / 'server.log'})")
+
+        self._modules = sorted(modules)
+        self._files = ready["files"]
+        self.restarts += 1
+
+    @staticmethod
+    def _read(proc: subprocess.Popen, replies: "queue.Queue[Optional[Dict]]"):
+        for line in proc.stdout:
+            try:
+                replies.put(json.loads(line))
+            except ValueError:
+                continue
+        replies.put(None)
+
+    def _reply(self, deadline: float) -> Optional[Dict]:
+        # Forked children share the server's stdout, so EOF alone can lag a server crash
+        while True:
+            try:
+                return self._replies.get(timeout=min(0.5, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                if not self.alive or time.monotonic() >= deadline:
+                    return None
@@ -0,0 +1,172 @@
+"""
+Persistent shell sessions that keep state (cwd, env, venvs) between commands
+"""
+from typing import Optional
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+
+from .output_capture import BoundedOutput, READ_CHUNK, kill_process_tree
+
+
+class ShellSession:
+    """
+    A long-lived shell process that runs commands one at a time
+
+    Each command is followed by a printf of a per-session sentinel and the
+    command's exit code, so the session knows where one command's output
+    ends without closing the pipe. stderr is merged into stdout. A command
+    that times out kills the shell; the next command starts a fresh one.
+    """
+
+    def __init__(self, name: str, work_dir: str, shell: Optional[str] = None):
+        self.name = name
+        self.work_dir = work_dir
+        self.shell = shell or shutil.which("bash") or "/bin/sh"
+        self.commands_run = 0
+        self._sentinel = f"__AIDEV_DONE_{uuid.uuid4().hex}__".encode()
+        self._proc: Optional[subprocess.Popen] = None
+        self._chunks: "queue.Queue[bytes]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def run(self, command: str, timeout: int, sink: BoundedOutput) -> dict:
+        """
+        Run a command in the session
+
+        Args:
+            command: Shell command
+            timeout: Timeout in seconds
+            sink: Receives the command's combined output
+
+        Returns:
+            Dict with 'returncode', 'timed_out', 'cancelled', 'duration' and 'restarted'
+        """
+        with self._lock:
+            # A shell we did not kill ourselves died (e.g. the last command ran `exit`)
+            restarted = self._proc is not None and not self.alive
+            if not self.alive:
+                self._start()
+
+            start = time.monotonic()
+            # Braces keep cd/export in this shell; stdin from /dev/null keeps the
+            # command from swallowing the sentinel line that follows it
+            script = (
+                f"{{ {command}\n}} < /dev/null\n"
+                f"printf '\\n%s %d\\n' '{self._sentinel.decode()}' \"$?\"\n"
+            ).encode()
+            try:
+                self._proc.stdin.write(script)
+                self._proc.stdin.flush()
+            except BrokenPipeError:
+                self._kill()
+                self._start()
+                restarted = True
+                self._proc.stdin.write(script)
+                self._proc.stdin.flush()
+
+            returncode = self._collect(sink, start + timeout)
+            sink.close()
+            self.commands_run += 1
+
+            timed_out = returncode is None
+            if timed_out:
+                self._kill()
+
+            return {
+                "returncode": returncode,
+                "timed_out": timed_out,
+                "cancelled": False,
+                "duration": time.monotonic() - start,
+                "restarted": restarted,
+            }
+
+    def close(self):
+        """Exit the shell, killing it if it does not exit promptly"""
+        with self._lock:
+            if not self.alive:
+                self._proc = None
+                return
+            try:
+                self._proc.stdin.write(b"exit\n")
+                self._proc.stdin.flush()
+                self._proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self._kill()
+
+    def _start(self):
+        self._chunks = queue.Queue()
+        self._proc = subprocess.Popen(
+            [self.shell],
+            cwd=self.work_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        threading.Thread(target=self._read, args=(self._proc, self._chunks), daemon=True).start()
+
+    @staticmethod
+    def _read(proc: subprocess.Popen, chunks: "queue.Queue[bytes]"):
+        """Forward shell output to the chunk queue until the shell exits"""
+        while True:
+            chunk = proc.stdout.read1(READ_CHUNK)
+            if not chunk:
+                chunks.put(b"")
+                return
+            chunks.put(chunk)
+
+    def _collect(self, sink: BoundedOutput, deadline: float) -> Optional[int]:
+        """Copy output to the sink until the sentinel line; None on timeout"""
+        marker = b"\n" + self._sentinel + b" "
+        pending = b""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                sink.write(pending)
+                return None
+            try:
+                chunk = self._chunks.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+            if not chunk:
+                # Shell exited (e.g. the command ran `exit`)
+                sink.write(pending)
+                self._proc.wait()
+                return self._proc.returncode
+
+            pending += chunk
+            index = pending.find(marker)
+            if index != -1:
+                end = pending.find(b"\n", index + len(marker))
+                if end == -1:
+                    continue  # Exit code not fully received yet
+                sink.write(pending[:index])
+                return int(pending[index + len(marker):end].strip() or 0)
+
+            # Hold back enough bytes to match a marker split across chunks
+            keep = len(marker)
+            if len(pending) > keep:
+                sink.write(pending[:-keep])
+                pending = pending[-keep:]
+
+    def _kill(self):
+        if self._proc is not None:
+            kill_process_tree(self._proc)
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                pass
+            for pipe in [self._proc.stdin, self._proc.stdout]:
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+        self._proc = None
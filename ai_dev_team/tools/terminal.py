@@ -1,8 +1,25 @@
 """
 Terminal operation tools for AI agents
 """
-import subprocess
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import atexit
+import os
+import re
+import threading
+import time
+import uuid
+
+from ..config import Config
+from .output_capture import BoundedOutput, DEFAULT_ERROR_PATTERNS, prune_logs, read_log_lines, run_streaming
+from .process_manager import ProcessRegistry
+from .shell_session import ShellSession
+from .pytest_runner import IncrementalTestRunner
+from .toolchain import LintToolchain
+
+# Log ids as generated by run_command (uuid4 hex prefix)
+LOG_ID = re.compile(r"[0-9a-f]{8}")
 
 
 class TerminalOperations:
@@ -12,14 +29,38 @@ class TerminalOperations:
 
     def __init__(self, work_dir: str):
         self.work_dir = work_dir
+        self.log_dir = Path(work_dir) / Config.STATE_DIR_NAME / "logs"
+        self.sessions: Dict[str, ShellSession] = {}
+        self.test_runner = IncrementalTestRunner(
+            work_dir, Path(work_dir) / Config.STATE_DIR_NAME / "tests", use_server=Config.PYTEST_SERVER
+        )
+        self.processes = ProcessRegistry(work_dir, Path(work_dir) / Config.STATE_DIR_NAME / "processes")
+        self.toolchain = LintToolchain(work_dir, Path(work_dir) / Config.STATE_DIR_NAME / "cache")
+        atexit.register(self.close)
 
-    def run_command(self, command: str, timeout: int = 60) -> str:
+    def run_command(
+        self,
+        command: str,
+        timeout: int = 60,
+        error_patterns: Optional[List[str]] = None,
+        session: Optional[str] = None,
+    ) -> str:
         """
         Execute a terminal command
 
+        Output is streamed into bounded buffers: only the head and tail of
+        each stream are returned. When output is truncated the full log is
+        kept on disk and can be paged with read_command_log.
+
+        With a session name the command runs in that persistent shell, so
+        cd, exported variables and activated virtualenvs carry over to the
+        next command in the same session (stderr is merged into stdout).
+
         Args:
             command: Command to execute
             timeout: Timeout in seconds (default: 60)
+            error_patterns: Regexes for lines to extract on failure (default: common error markers)
+            session: Persistent shell session name (default: fresh shell per command)
 
         Returns:
             Command output or error message
@@ -29,33 +70,307 @@ class TerminalOperations:
             return f"🚫 Dangerous command blocked: {command}"
 
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                check=False,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=self.work_dir,
-            )
-
-            output = result.stdout.strip()
-            stderr = result.stderr.strip()
+            log_id = uuid.uuid4().hex[:8]
+            stdout, stderr = self._make_sinks(log_id, error_patterns)
 
-            if result.returncode == 0:
-                if output:
-                    return f"✅ Command succeeded:\n{output}"
-                else:
-                    return "✅ Command executed successfully (no output)"
+            if session and os.name == "posix":
+                run = self._get_session(session).run(command, timeout, stdout)
+                stderr.close()
             else:
-                error_msg = stderr if stderr else output
-                return f"❌ Command failed (exit code {result.returncode}):\n{error_msg}"
+                run = run_streaming(command, self.work_dir, timeout, stdout, stderr)
+
+            result = self._format_result(run, stdout, stderr, log_id, timeout)
+            if run.get("restarted"):
+                result = f"🔄 Shell session '{session}' was restarted (state lost)\n{result}"
+            elif session and run["timed_out"]:
+                result += f"\nShell session '{session}' was reset"
+            return result
 
-        except subprocess.TimeoutExpired:
-            return f"⏱️ Command timed out after {timeout} seconds"
         except Exception as e:
             return f"❌ Error executing command: {str(e)}"
 
+    def run_commands(
+        self,
+        commands: List[Union[str, Dict]],
+        max_parallel: Optional[int] = None,
+        timeout: int = 120,
+        fail_fast: bool = False,
+    ) -> str:
+        """
+        Run independent commands concurrently (e.g. lint, format check, type check, tests)
+
+        Each command runs in its own fresh shell, so they must not depend on
+        each other. Successful commands are reported in one line; failures
+        include their trimmed output.
+
+        Args:
+            commands: Command strings, or {"command", "timeout"} dicts
+            max_parallel: Maximum commands running at once (default: MAX_PARALLEL_COMMANDS)
+            timeout: Default per-command timeout in seconds
+            fail_fast: Cancel remaining commands after the first failure
+
+        Returns:
+            Combined report
+        """
+        jobs = []
+        for entry in commands or []:
+            if isinstance(entry, dict):
+                jobs.append((entry.get("command", ""), int(entry.get("timeout", timeout))))
+            else:
+                jobs.append((str(entry), timeout))
+
+        if not jobs:
+            return "❌ No commands given"
+
+        blocked = [cmd for cmd, _ in jobs if any(d in cmd for d in self.DANGEROUS_COMMANDS)]
+        if blocked:
+            return f"🚫 Dangerous command blocked: {blocked[0]}"
+
+        cancel = threading.Event()
+        workers = max(1, min(max_parallel or Config.MAX_PARALLEL_COMMANDS, len(jobs)))
+        start = time.monotonic()
+
+        def run_one(job):
+            command, job_timeout = job
+            if cancel.is_set():
+                return None  # Skipped after an earlier failure
+            log_id = uuid.uuid4().hex[:8]
+            stdout, stderr = self._make_sinks(log_id, head_bytes=500, tail_bytes=1500)
+            run = run_streaming(command, self.work_dir, job_timeout, stdout, stderr, cancel_event=cancel)
+            if fail_fast and (run["returncode"] != 0 or run["timed_out"]):
+                cancel.set()
+            return run, stdout, stderr, log_id
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(pool.map(run_one, jobs))
+        except Exception as e:
+            return f"❌ Error executing commands: {str(e)}"
+
+        return self._format_batch_report(jobs, outcomes, time.monotonic() - start)
+
+    def _format_batch_report(self, jobs: List, outcomes: List, wall_time: float) -> str:
+        """Summarize a run_commands batch in a few lines"""
+        lines = []
+        passed = failed = skipped = 0
+        serial_time = 0.0
+
+        for i, ((command, job_timeout), outcome) in enumerate(zip(jobs, outcomes), 1):
+            if outcome is None:
+                skipped += 1
+                lines.append(f"⏭️ [{i}] {command} (skipped)")
+                continue
+
+            run, stdout, stderr, log_id = outcome
+            serial_time += run["duration"]
+
+            if run["cancelled"]:
+                skipped += 1
+                lines.append(f"🛑 [{i}] {command} (cancelled after {run['duration']:.1f}s)")
+            elif run["returncode"] == 0 and not run["timed_out"]:
+                passed += 1
+                lines.append(f"✅ [{i}] {command} ({run['duration']:.1f}s)")
+            else:
+                failed += 1
+                if run["timed_out"]:
+                    lines.append(f"⏱️ [{i}] {command} (timed out after {job_timeout}s)")
+                else:
+                    lines.append(f"❌ [{i}] {command} (exit {run['returncode']}, {run['duration']:.1f}s)")
+                output = "\n".join(part for part in [stderr.render(), stdout.render()] if part)
+                if output:
+                    lines.append("    " + output.replace("\n", "\n    "))
+                if stdout.truncated or stderr.truncated:
+                    lines.append(f"    📜 Full log id: {log_id}")
+
+        header = (
+            f"📋 Ran {len(jobs)} commands: {passed} passed, {failed} failed, {skipped} skipped "
+            f"(wall {wall_time:.1f}s, serial {serial_time:.1f}s)"
+        )
+        return header + "\n" + "\n".join(lines)
+
+    def reset_session(self, session: str = "default") -> str:
+        """
+        Reset a persistent shell session, dropping its cwd, env and background jobs
+
+        Args:
+            session: Session name
+
+        Returns:
+            Result message
+        """
+        shell = self.sessions.pop(session, None)
+        if not shell:
+            return f"✅ No active session '{session}'"
+        shell.close()
+        return f"✅ Session '{session}' reset ({shell.commands_run} commands run)"
+
+    def start_process(
+        self,
+        name: str,
+        command: str,
+        ready_port: Optional[int] = None,
+        ready_pattern: Optional[str] = None,
+        ready_timeout: int = 30,
+    ) -> str:
+        """
+        Start a long-running background process (dev server, watcher, database)
+
+        Args:
+            name: Name used to poll/stop the process
+            command: Command to run
+            ready_port: Wait until this localhost port accepts connections
+            ready_pattern: Wait until this regex appears in the output
+            ready_timeout: Seconds to wait for readiness (default: 30)
+
+        Returns:
+            Start result with readiness status
+        """
+        if any(dangerous in command for dangerous in self.DANGEROUS_COMMANDS):
+            return f"🚫 Dangerous command blocked: {command}"
+
+        try:
+            return self.processes.start(name, command, ready_port, ready_pattern, ready_timeout)
+        except Exception as e:
+            return f"❌ Error starting process: {str(e)}"
+
+    def poll_process(self, name: Optional[str] = None, max_lines: int = 50) -> str:
+        """
+        Check a background process's status and its output since the last poll
+
+        Args:
+            name: Process name (omit to list all)
+            max_lines: Maximum new output lines to return
+
+        Returns:
+            Status and new output
+        """
+        try:
+            return self.processes.poll(name, max_lines)
+        except Exception as e:
+            return f"❌ Error polling process: {str(e)}"
+
+    def stop_process(self, name: str) -> str:
+        """
+        Stop a background process
+
+        Args:
+            name: Process name
+
+        Returns:
+            Stop result
+        """
+        try:
+            return self.processes.stop(name)
+        except Exception as e:
+            return f"❌ Error stopping process: {str(e)}"
+
+    def close(self):
+        """Close shell sessions and stop background processes and the test server"""
+        for name in list(self.sessions):
+            self.sessions.pop(name).close()
+        self.processes.stop_all()
+        self.test_runner.close()
+
+    def _get_session(self, name: str) -> ShellSession:
+        if name not in self.sessions:
+            self.sessions[name] = ShellSession(name, self.work_dir)
+        return self.sessions[name]
+
+    def read_command_log(
+        self, log_id: str, stream: str = "stdout", start_line: int = 1, num_lines: int = 100
+    ) -> str:
+        """
+        Page through the full log of a truncated command
+
+        Args:
+            log_id: Log id reported by run_command
+            stream: stdout or stderr
+            start_line: First line to read (1-based)
+            num_lines: Number of lines to read (max 500)
+
+        Returns:
+            The requested lines with line numbers
+        """
+        if stream not in ["stdout", "stderr"]:
+            return f"❌ Unknown stream: {stream}"
+        if not LOG_ID.fullmatch(str(log_id)):
+            return f"❌ Invalid log id: {log_id}"
+
+        path = self.log_dir / f"{log_id}.{stream}.log"
+        if not path.exists():
+            return f"❌ No {stream} log for {log_id} (only truncated output is logged)"
+
+        start_line = max(1, int(start_line))
+        lines = read_log_lines(path, start_line, min(int(num_lines), 500))
+        if not lines:
+            return f"📜 {log_id} {stream}: no lines from {start_line}"
+
+        end_line = start_line + len(lines) - 1
+        numbered = [f"{start_line + i}: {line}" for i, line in enumerate(lines)]
+        return f"📜 {log_id} {stream} lines {start_line}-{end_line}:\n" + "\n".join(numbered)
+
+    def _make_sinks(
+        self,
+        log_id: str,
+        error_patterns: Optional[List[str]] = None,
+        head_bytes: Optional[int] = None,
+        tail_bytes: Optional[int] = None,
+    ):
+        """Create bounded stdout/stderr sinks that spill to this command's log files"""
+        prune_logs(self.log_dir, keep=Config.MAX_COMMAND_LOGS)
+        patterns = error_patterns if error_patterns is not None else DEFAULT_ERROR_PATTERNS
+        sinks = []
+        for stream in ["stdout", "stderr"]:
+            sinks.append(
+                BoundedOutput(
+                    head_bytes=head_bytes if head_bytes is not None else Config.COMMAND_OUTPUT_HEAD_BYTES,
+                    tail_bytes=tail_bytes if tail_bytes is not None else Config.COMMAND_OUTPUT_TAIL_BYTES,
+                    max_bytes=Config.COMMAND_LOG_MAX_BYTES,
+                    spill_path=self.log_dir / f"{log_id}.{stream}.log",
+                    error_patterns=patterns,
+                )
+            )
+        return sinks
+
+    def _format_result(
+        self, run: dict, stdout: BoundedOutput, stderr: BoundedOutput, log_id: str, timeout: int
+    ) -> str:
+        """Format a finished command for the agent"""
+        output = stdout.render()
+
+        if run["timed_out"]:
+            message = f"⏱️ Command timed out after {timeout} seconds"
+            if output:
+                message += f"\nPartial output:\n{output}"
+        elif run["cancelled"]:
+            message = "🛑 Command cancelled"
+        elif run["returncode"] == 0:
+            if output:
+                message = f"✅ Command succeeded:\n{output}"
+            else:
+                message = "✅ Command executed successfully (no output)"
+        else:
+            error_msg = stderr.render() or output
+            message = f"❌ Command failed (exit code {run['returncode']}):\n{error_msg}"
+
+            error_lines = stderr.error_lines + stdout.error_lines
+            if error_lines and (stdout.truncated or stderr.truncated):
+                message += "\n\nError lines:\n" + "\n".join(error_lines)
+
+        truncated = [name for name, sink in [("stdout", stdout), ("stderr", stderr)] if sink.truncated]
+        if truncated:
+            sizes = ", ".join(
+                f"{name} {sink.total_bytes:,} bytes"
+                for name, sink in [("stdout", stdout), ("stderr", stderr)]
+                if sink.truncated
+            )
+            message += (
+                f"\n\n📜 Output truncated ({sizes}). Full log id: {log_id} - "
+                f"page it with read_command_log(log_id, stream, start_line, num_lines)"
+            )
+
+        return message
+
     def install_package(self, package: str, package_manager: str = "pip") -> str:
         """
         Install a package
@@ -79,19 +394,29 @@ class TerminalOperations:
         command = managers[package_manager]
         return self.run_command(command, timeout=300)  # 5 min timeout
 
-    def run_tests(self, test_path: str = ".", framework: str = "pytest") -> str:
+    def run_tests(self, test_path: str = ".", framework: str = "pytest", incremental: bool = True) -> str:
         """
         Run tests
 
+        pytest runs are incremental: only test files affected by changes
+        since the previous run are executed, and the result is a compact
+        summary listing failing assertions only.
+
         Args:
             test_path: Path to test files
             framework: Test framework (pytest, unittest, jest)
+            incremental: For pytest, skip tests unaffected by changes (default: True)
 
         Returns:
             Test results
         """
+        if framework == "pytest":
+            try:
+                return self.test_runner.run(test_path, incremental=incremental, timeout=300)
+            except Exception as e:
+                return f"❌ Error running tests: {str(e)}"
+
         commands = {
-            "pytest": f"pytest {test_path} -v",
             "unittest": f"python -m unittest discover {test_path}",
             "jest": f"npm test -- {test_path}",
         }
@@ -102,48 +427,44 @@ class TerminalOperations:
         command = commands[framework]
         return self.run_command(command, timeout=300)
 
-    def lint_code(self, filepath: str, language: str = "python") -> str:
+    def lint_code(self, filepath: Union[str, List[str]], language: Optional[str] = None) -> str:
         """
-        Lint code file
+        Lint one or more code files
+
+        All files are linted in a single tool invocation (pylint runs
+        in-process when available). Results are cached by file content, so
+        unchanged files are not linted again.
 
         Args:
-            filepath: Path to file
-            language: Programming language
+            filepath: Path to file, or list of paths
+            language: Programming language (default: detect from extension)
 
         Returns:
             Linting results
         """
-        linters = {
-            "python": f"pylint {filepath}",
-            "javascript": f"eslint {filepath}",
-            "typescript": f"eslint {filepath}",
-        }
-
-        if language not in linters:
-            return f"❌ No linter configured for {language}"
-
-        command = linters[language]
-        return self.run_command(command)
+        filepaths = [filepath] if isinstance(filepath, str) else list(filepath)
+        try:
+            return self.toolchain.lint(filepaths, language)
+        except Exception as e:
+            return f"❌ Error linting code: {str(e)}"
 
-    def format_code(self, filepath: str, language: str = "python") -> str:
+    def format_code(self, filepath: Union[str, List[str]], language: Optional[str] = None) -> str:
         """
-        Format code file
+        Format one or more code files in place
+
+        All files are formatted in a single tool invocation (black runs
+        in-process when available). Files already known to be formatted are
+        skipped.
 
         Args:
-            filepath: Path to file
-            language: Programming language
+            filepath: Path to file, or list of paths
+            language: Programming language (default: detect from extension)
 
         Returns:
             Formatting result
         """
-        formatters = {
-            "python": f"black {filepath}",
-            "javascript": f"prettier --write {filepath}",
-            "typescript": f"prettier --write {filepath}",
-        }
-
-        if language not in formatters:
-            return f"❌ No formatter configured for {language}"
-
-        command = formatters[language]
-        return self.run_command(command)
+        filepaths = [filepath] if isinstance(filepath, str) else list(filepath)
+        try:
+            return self.toolchain.format(filepaths, language)
+        except Exception as e:
+            return f"❌ Error formatting code: {str(e)}"
@@ -0,0 +1,383 @@
+"""
+Batched, cached lint and format toolchain
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import shlex
+import subprocess
+
+from ..utils.disk_cache import JsonCache, cache_key
+from .atomic_io import WriteTransaction, content_hash
+from .pytest_runner import SKIP_DIRS, ImportGraph
+
+LANGUAGES = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+}
+
+CONFIG_FILES = {
+    "python": ["pyproject.toml", ".pylintrc", "pylintrc", "setup.cfg"],
+    "javascript": [
+        "package.json", ".eslintrc", ".eslintrc.js", ".eslintrc.json", "eslint.config.js", ".prettierrc", "tsconfig.json"
+    ],
+}
+
+
+class LintToolchain:
+    """
+    Lints and formats many files per tool invocation, skipping unchanged files
+
+    Python files are linted with pylint and formatted with black through
+    their Python APIs when they are installed in this interpreter (no
+    process startup), otherwise with one subprocess per batch. JS/TS files
+    go to eslint/prettier in one subprocess per batch. Results are cached by
+    file content hash plus tool and configuration, so a file is only
+    re-linted or re-formatted after it or the tool configuration changes.
+    Lint results also depend on the file's path, the project's module
+    layout and the files it imports, since linters report cross-file
+    problems such as unresolved imports.
+    """
+
+    def __init__(self, work_dir: str, cache_dir: Path):
+        self.work_dir = Path(work_dir)
+        self.cache = JsonCache(cache_dir / "lint.json")
+
+    def lint(self, filepaths: List[str], language: Optional[str] = None) -> str:
+        """
+        Lint files, reusing cached results for unchanged files
+
+        Args:
+            filepaths: Paths relative to the work dir
+            language: Force a language (default: detect from extension)
+
+        Returns:
+            Compact issue list
+        """
+        groups, errors = self._group(filepaths, language)
+        issues: Dict[str, List[str]] = {}
+        cached = 0
+
+        for lang, files in groups.items():
+            prefix = self._key_prefix("lint", lang)
+            project = self._project_keys(lang, list(files))
+            pending = {}
+            for rel, source in files.items():
+                key = cache_key(prefix, rel, content_hash(source.encode("utf-8")), project[rel])
+                hit = self.cache.get(key)
+                if hit is not None:
+                    issues[rel] = hit
+                    cached += 1
+                else:
+                    pending[rel] = key
+
+            if pending:
+                linter = self._lint_python if lang == "python" else self._lint_js
+                results, error = linter(list(pending))
+                if error:
+                    errors.append(error)
+                for rel, key in pending.items():
+                    if rel in results:
+                        issues[rel] = results[rel]
+                        self.cache.set(key, results[rel])
+
+        self.cache.save()
+
+        total = sum(len(found) for found in issues.values())
+        emoji = "✅" if total == 0 and not errors else "⚠️"
+        lines = [f"{emoji} Lint: {len(issues)} files ({cached} cached), {total} issues"]
+        for rel in sorted(issues):
+            ordered = sorted(issues[rel], key=_issue_line)
+            lines.extend(f"{rel}:{issue}" for issue in ordered)
+        lines.extend(f"❌ {error}" for error in errors)
+        return "\n".join(lines)
+
+    def format(self, filepaths: List[str], language: Optional[str] = None) -> str:
+        """
+        Format files in place, skipping files already known to be formatted
+
+        Args:
+            filepaths: Paths relative to the work dir
+            language: Force a language (default: detect from extension)
+
+        Returns:
+            Summary of reformatted files
+        """
+        groups, errors = self._group(filepaths, language)
+        reformatted: List[str] = []
+        unchanged = cached = 0
+
+        for lang, files in groups.items():
+            prefix = self._key_prefix("format", lang)
+            pending = {}
+            for rel, source in files.items():
+                if self.cache.get(cache_key(prefix, content_hash(source.encode("utf-8")))) is not None:
+                    cached += 1
+                    unchanged += 1
+                else:
+                    pending[rel] = source
+
+            if not pending:
+                continue
+
+            formatter = self._format_python if lang == "python" else self._format_js
+            changed, error = formatter(pending)
+            if error:
+                errors.append(error)
+                continue
+
+            reformatted.extend(changed)
+            unchanged += len(pending) - len(changed)
+            # Remember the formatted content so the next call skips these files
+            for rel in pending:
+                source = self._read(rel)
+                if source is not None:
+                    self.cache.set(cache_key(prefix, content_hash(source.encode("utf-8"))), True)
+
+        self.cache.save()
+
+        emoji = "✅" if not errors else "⚠️"
+        lines = [
+            f"{emoji} Format: {len(reformatted)} reformatted, {unchanged} unchanged ({cached} cached)"
+        ]
+        lines.extend(f"  reformatted {rel}" for rel in sorted(reformatted))
+        lines.extend(f"❌ {error}" for error in errors)
+        return "\n".join(lines)
+
+    def _group(self, filepaths: List[str], language: Optional[str]) -> Tuple[Dict, List[str]]:
+        """Group readable files by language; returns ({language: {rel: source}}, errors)"""
+        groups: Dict[str, Dict[str, str]] = {}
+        errors = []
+        for rel in filepaths:
+            lang = language or LANGUAGES.get(Path(rel).suffix.lower())
+            if lang not in ["python", "javascript", "typescript"]:
+                errors.append(f"No linter/formatter configured for {rel}")
+                continue
+            source = self._read(rel)
+            if source is None:
+                errors.append(f"File not found or unreadable: {rel}")
+                continue
+            # Same file, same key, however the caller spelled its path
+            rel = (self.work_dir / rel).resolve().relative_to(self.work_dir.resolve()).as_posix()
+            # eslint/prettier handle JS and TS in the same invocation
+            groups.setdefault("python" if lang == "python" else "javascript", {})[rel] = source
+        return groups, errors
+
+    def _read(self, rel: str) -> Optional[str]:
+        path = (self.work_dir / rel).resolve()
+        try:
+            path.relative_to(self.work_dir.resolve())
+        except ValueError:
+            return None
+        try:
+            return path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _key_prefix(self, action: str, language: str) -> str:
+        """Part of the cache key shared by all files: tool, version and project config"""
+        return cache_key(action, language, self._tool_version(action, language), self._config_hash(language))
+
+    def _project_keys(self, language: str, files: List[str]) -> Dict[str, str]:
+        """
+        Per-file hash of the project state a file's lint result depends on
+
+        Adding, removing or renaming a module anywhere can resolve or break
+        an import, so every key covers the project's file layout. Python
+        keys also cover the content of the files each file imports
+        (transitively), for messages like no-name-in-module.
+
+        Args:
+            language: "python" or "javascript"
+            files: Normalized paths relative to the work dir
+
+        Returns:
+            {rel: hash}
+        """
+        root = self.work_dir.resolve()
+        suffixes = [suffix for suffix, lang in LANGUAGES.items() if (lang == "python") == (language == "python")]
+        project = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+            project.extend(Path(dirpath) / name for name in sorted(filenames) if Path(name).suffix in suffixes)
+        layout = cache_key(*(path.relative_to(root).as_posix() for path in project))
+        if language != "python":
+            return {rel: layout for rel in files}
+
+        graph = ImportGraph(root, project)
+        hashes: Dict[str, str] = {}
+        keys = {}
+        for rel in files:
+            deps = []
+            for dep in sorted(graph.dependencies(rel)):
+                if dep not in hashes:
+                    try:
+                        hashes[dep] = content_hash((root / dep).read_bytes())
+                    except OSError:
+                        hashes[dep] = ""
+                deps.append(dep + hashes[dep])
+            keys[rel] = cache_key(layout, *deps)
+        return keys
+
+    def _config_hash(self, language: str) -> str:
+        parts = []
+        for name in CONFIG_FILES.get(language, []):
+            path = self.work_dir / name
+            if path.is_file():
+                parts.append(name + content_hash(path.read_bytes()))
+        return cache_key(*parts)
+
+    @staticmethod
+    def _tool_version(action: str, language: str) -> str:
+        if language != "python":
+            return "external"  # eslint/prettier versions are covered by package.json
+        try:
+            if action == "lint":
+                import pylint
+                return pylint.__version__
+            import black
+            return black.__version__
+        except ImportError:
+            return "external"
+
+    def _lint_python(self, files: List[str]) -> Tuple[Dict[str, List[str]], Optional[str]]:
+        """Run pylint once over all files; returns ({rel: [issue]}, error)"""
+        paths = [str(self.work_dir / rel) for rel in files]
+        rcfile = next((self.work_dir / n for n in [".pylintrc", "pylintrc"] if (self.work_dir / n).is_file()), None)
+        args = ["--reports=n", "--score=n"] + ([f"--rcfile={rcfile}"] if rcfile else []) + paths
+
+        try:
+            from pylint.lint import Run
+            from pylint.reporters import CollectingReporter
+        except ImportError:
+            return self._lint_subprocess(["pylint", "--output-format=json"] + args, files, self._parse_pylint_json)
+
+        # astroid keeps parsed (and failed) imports between runs; start from what is on disk now
+        import astroid
+
+        astroid.MANAGER.clear_cache()
+        reporter = CollectingReporter()
+        try:
+            Run(args, reporter=reporter, exit=False)
+        except Exception as e:
+            return {}, f"pylint failed: {e}"
+
+        results = {rel: [] for rel in files}
+        by_path = {str((self.work_dir / rel).resolve()): rel for rel in files}
+        for msg in reporter.messages:
+            rel = by_path.get(str(Path(msg.abspath).resolve()))
+            if rel is not None:
+                results[rel].append(f"{msg.line or 0}: {msg.msg_id} {msg.symbol}: {msg.msg}")
+        return results, None
+
+    def _parse_pylint_json(self, output: str, files: List[str]) -> Dict[str, List[str]]:
+        results = {rel: [] for rel in files}
+        by_path = {str((self.work_dir / rel).resolve()): rel for rel in files}
+        for item in json.loads(output or "[]"):
+            rel = by_path.get(str((self.work_dir / item.get("path", "")).resolve()))
+            if rel is not None:
+                results[rel].append(
+                    f"{item.get('line') or 0}: {item.get('message-id')} {item.get('symbol')}: {item.get('message')}"
+                )
+        return results
+
+    def _lint_js(self, files: List[str]) -> Tuple[Dict[str, List[str]], Optional[str]]:
+        """Run eslint once over all files"""
+        return self._lint_subprocess(["eslint", "--format", "json"] + files, files, self._parse_eslint_json)
+
+    def _parse_eslint_json(self, output: str, files: List[str]) -> Dict[str, List[str]]:
+        results = {rel: [] for rel in files}
+        by_path = {str((self.work_dir / rel).resolve()): rel for rel in files}
+        for item in json.loads(output or "[]"):
+            rel = by_path.get(str(Path(item.get("filePath", "")).resolve()))
+            if rel is None:
+                continue
+            for msg in item.get("messages", []):
+                severity = "error" if msg.get("severity") == 2 else "warning"
+                results[rel].append(f"{msg.get('line') or 0}: {severity} {msg.get('ruleId')}: {msg.get('message')}")
+        return results
+
+    def _lint_subprocess(self, argv: List[str], files: List[str], parse) -> Tuple[Dict, Optional[str]]:
+        """Run a linter CLI once and parse its JSON output"""
+        try:
+            result = subprocess.run(
+                argv, cwd=str(self.work_dir), capture_output=True, text=True, timeout=300, check=False
+            )
+        except FileNotFoundError:
+            return {}, f"{argv[0]} is not installed"
+        except subprocess.TimeoutExpired:
+            return {}, f"{argv[0]} timed out"
+
+        try:
+            return parse(result.stdout, files), None
+        except ValueError:
+            error = (result.stderr or result.stdout).strip()[-500:]
+            return {}, f"{argv[0]} failed (exit code {result.returncode}): {error}"
+
+    def _format_python(self, files: Dict[str, str]) -> Tuple[List[str], Optional[str]]:
+        """Format with black's API in one atomic batch; returns (reformatted files, error)"""
+        try:
+            import black
+        except ImportError:
+            return self._format_subprocess(["black", "-q"], files)
+
+        mode = self._black_mode(black)
+        changed = []
+        with WriteTransaction() as txn:
+            for rel, source in files.items():
+                try:
+                    formatted = black.format_file_contents(source, fast=False, mode=mode)
+                except black.NothingChanged:
+                    continue
+                except Exception as e:
+                    txn.rollback()
+                    return [], f"black failed on {rel}: {e}"
+                txn.add(self.work_dir / rel, formatted)
+                changed.append(rel)
+        return changed, None
+
+    def _black_mode(self, black):
+        """black Mode honoring [tool.black] in the project's pyproject.toml"""
+        config = {}
+        pyproject = self.work_dir / "pyproject.toml"
+        if pyproject.is_file():
+            try:
+                config = black.parse_pyproject_toml(str(pyproject))
+            except Exception:
+                config = {}
+        return black.Mode(
+            line_length=int(config.get("line_length", black.DEFAULT_LINE_LENGTH)),
+            string_normalization=not config.get("skip_string_normalization", False),
+        )
+
+    def _format_js(self, files: Dict[str, str]) -> Tuple[List[str], Optional[str]]:
+        """Format with one prettier invocation"""
+        return self._format_subprocess(["prettier", "--write"], files)
+
+    def _format_subprocess(self, argv: List[str], files: Dict[str, str]) -> Tuple[List[str], Optional[str]]:
+        try:
+            result = subprocess.run(
+                argv + list(files), cwd=str(self.work_dir), capture_output=True, text=True, timeout=300, check=False
+            )
+        except FileNotFoundError:
+            return [], f"{argv[0]} is not installed"
+        except subprocess.TimeoutExpired:
+            return [], f"{argv[0]} timed out"
+
+        if result.returncode != 0:
+            error = (result.stderr or result.stdout).strip()[-500:]
+            return [], f"{' '.join(shlex.quote(a) for a in argv)} failed (exit code {result.returncode}): {error}"
+
+        changed = [rel for rel, source in files.items() if self._read(rel) != source]
+        return changed, None
+
+
+def _issue_line(issue: str) -> int:
+    """Line number an issue starts with; 0 for file-level issues"""
+    line = issue.split(":", 1)[0]
+    return int(line) if line.isdigit() else 0
@@ -1,21 +1,49 @@
 """
 Vision tools for analyzing images
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-from PIL import Image
+from typing import Dict, Optional
+import json
+import re
+
+from ..config import Config
+from ..utils.disk_cache import JsonCache, cache_key
+
+SUPPORTED_FORMATS = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
+
+UI_STRUCTURE_PROMPT = """Analyze this UI design and describe its structure as JSON.
+Respond with ONLY a JSON object of this shape:
+{
+  "page": "short description of the page",
+  "layout": [{"region": "header|sidebar|main|footer|...", "arrangement": "row|column|grid", "components": ["<component id>", ...]}],
+  "components": [{"id": "unique id", "type": "navbar|button|input|form|card|image|heading|text|list|table|...",
+                  "label": "visible label or text", "children": ["<component id>", ...]}],
+  "text": ["every piece of visible text, in reading order"],
+  "style": {"colors": ["#hex", ...], "fonts": "description", "spacing": "description"}
+}"""
 
 
 class VisionOperations:
     """Tools for image analysis"""
 
-    def __init__(self, groq_client):
+    def __init__(self, groq_client, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            groq_client: Client used for vision calls
+            cache_dir: Where vision results are cached (memory only if None)
+        """
         self.groq_client = groq_client
+        self.cache = JsonCache(Path(cache_dir) / "vision.json", max_entries=500) if cache_dir else None
+        self._memory: Dict[str, Dict] = {}
 
     def analyze_image(self, image_path: str, question: str = "Describe this image in detail") -> str:
         """
         Analyze an image using vision model
 
+        Results are cached by (image content, question, model), so asking the
+        same question about the same image again costs no model call.
+
         Args:
             image_path: Path to image file
             question: Question about the image
@@ -24,24 +52,14 @@ class VisionOperations:
             Analysis result
         """
         try:
-            path = Path(image_path)
-
-            if not path.exists():
-                return f"❌ Image not found: {image_path}"
-
-            if not path.suffix.lower() in [".jpg", ".jpeg", ".png", ".gif", ".webp"]:
-                return f"❌ Unsupported image format: {path.suffix}"
-
-            # Get image info
-            with Image.open(path) as img:
-                width, height = img.size
-                format_name = img.format
-
-            # Analyze with vision model
-            result = self.groq_client.chat_with_image(question, str(path))
-
-            analysis = f"🖼️ Image Analysis: {image_path}\n"
-            analysis += f"Format: {format_name}, Size: {width}x{height}\n\n"
+            result = self._ask(image_path, question)
+            if "error" in result:
+                return result["error"]
+
+            image = result["image"]
+            cached = " (cached)" if result.get("cached") else ""
+            analysis = f"🖼️ Image Analysis: {image_path}{cached}\n"
+            analysis += f"Format: {image['source_format']}, Size: {image['width']}x{image['height']}\n\n"
             analysis += result["content"]
 
             return analysis
@@ -49,27 +67,46 @@ class VisionOperations:
         except Exception as e:
             return f"❌ Error analyzing image: {str(e)}"
 
-    def extract_ui_components(self, image_path: str) -> str:
+    def extract_ui_structure(self, image_path: str) -> Dict:
         """
-        Extract UI components from design mockup
+        Extract a structured component tree from a design mockup
 
         Args:
             image_path: Path to design image
 
         Returns:
-            List of UI components
+            Dict with 'page', 'layout', 'components', 'text' and 'style',
+            or {'error': message}
         """
-        question = """Analyze this UI design and list all components you see:
-        - Navigation elements
-        - Buttons and their labels
-        - Input fields and forms
-        - Text sections and headings
-        - Images and media
-        - Layout structure
+        try:
+            result = self._ask(image_path, UI_STRUCTURE_PROMPT)
+        except Exception as e:
+            return {"error": f"❌ Error analyzing image: {str(e)}"}
+        if "error" in result:
+            return {"error": result["error"]}
+
+        structure = self._parse_json(result["content"])
+        if structure is None:
+            # Keep the model's description rather than losing the call
+            return {"page": result["content"].strip(), "layout": [], "components": [], "text": [], "style": {}}
+        for field, default in [("page", ""), ("layout", []), ("components", []), ("text", []), ("style", {})]:
+            structure.setdefault(field, default)
+        return structure
 
-        Provide a detailed breakdown that can be used to build this UI."""
+    def extract_ui_components(self, image_path: str) -> str:
+        """
+        Extract UI components from design mockup
 
-        return self.analyze_image(image_path, question)
+        Args:
+            image_path: Path to design image
+
+        Returns:
+            Component tree as JSON
+        """
+        structure = self.extract_ui_structure(image_path)
+        if "error" in structure:
+            return structure["error"]
+        return f"🧩 UI structure of {image_path}:\n{json.dumps(structure, separators=(',', ':'))}"
 
     def compare_images(self, image1_path: str, image2_path: str) -> str:
         """
@@ -82,10 +119,69 @@ class VisionOperations:
         Returns:
             Comparison result
         """
-        # For now, analyze each separately
+        # For now, analyze each separately (both vision calls run at once)
         # TODO: Implement side-by-side comparison when Groq supports it
 
-        analysis1 = self.analyze_image(image1_path, "Describe this image")
-        analysis2 = self.analyze_image(image2_path, "Describe this image")
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(self.analyze_image, image1_path, "Describe this image")
+            second = pool.submit(self.analyze_image, image2_path, "Describe this image")
+            analysis1, analysis2 = first.result(), second.result()
 
         return f"Image 1:\n{analysis1}\n\nImage 2:\n{analysis2}"
+
+    @staticmethod
+    def format_ui_structure(structure: Dict) -> str:
+        """Short text outline of a UI structure for requirements and plans"""
+        lines = [structure.get("page", "") or "UI design"]
+        components = {c.get("id"): c for c in structure.get("components", []) if isinstance(c, dict)}
+        for region in structure.get("layout", []):
+            if not isinstance(region, dict):
+                continue
+            names = []
+            for component_id in region.get("components", []):
+                component = components.get(component_id, {})
+                label = component.get("label")
+                names.append(f"{component.get('type', component_id)}" + (f" '{label}'" if label else ""))
+            arrangement = f" ({region['arrangement']})" if region.get("arrangement") else ""
+            lines.append(f"- {region.get('region', 'region')}{arrangement}: {', '.join(names) or 'empty'}")
+        colors = structure.get("style", {}).get("colors") if isinstance(structure.get("style"), dict) else None
+        if colors:
+            lines.append(f"- colors: {', '.join(map(str, colors))}")
+        return "\n".join(lines)
+
+    def _ask(self, image_path: str, question: str) -> Dict:
+        """Vision call with result caching; returns {'content', 'image', 'cached'} or {'error'}"""
+        path = Path(image_path)
+
+        if not path.exists():
+            return {"error": f"❌ Image not found: {image_path}"}
+
+        if not path.suffix.lower() in SUPPORTED_FORMATS:
+            return {"error": f"❌ Unsupported image format: {path.suffix}"}
+
+        digest = self.groq_client.images.image_hash(path.resolve())
+        key = cache_key(digest, question, Config.GROQ_VISION_MODEL)
+        hit = self._memory.get(key) or (self.cache.get(key) if self.cache else None)
+        if hit is not None:
+            self._memory[key] = hit
+            return {**hit, "cached": True}
+
+        # Analyze with vision model (the client reports the image info it decoded)
+        result = self.groq_client.chat_with_image(question, str(path))
+        entry = {"content": result["content"], "image": result["image"]}
+        self._memory[key] = entry
+        if self.cache:
+            self.cache.set(key, entry)
+            self.cache.save()
+        return {**entry, "cached": False}
+
+    @staticmethod
+    def _parse_json(content: str) -> Optional[Dict]:
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        if not match:
+            return None
+        try:
+            parsed = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
@@ -1,5 +1,8 @@
 """Utility modules"""
 
 from .human_loop import HumanLoop
+from .approval_policy import ApprovalPolicy
+from .approval_queue import ApprovalQueue
+from .disk_cache import JsonCache
 
-__all__ = ["HumanLoop"]
+__all__ = ["HumanLoop", "ApprovalPolicy", "ApprovalQueue", "JsonCache"]
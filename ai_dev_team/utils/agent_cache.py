@@ -0,0 +1,194 @@
+"""
+Content-addressed cache of agent results, restoring their file outputs on a hit
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+
+from ..config import Config
+from ..tools.atomic_io import atomic_write_bytes, content_hash
+from .disk_cache import JsonCache, cache_key
+
+AGENT_CACHE_VERSION = "1"
+
+# Tools whose effects are fully captured by the files read and written
+READ_TOOLS = ["read_file", "search_in_file", "get_file_info", "list_files"]
+WRITE_TOOLS = ["write_file", "write_files", "create_directory"]
+PURE_TOOLS = ["analyze_image", "extract_ui_components"]  # Cached by image content already
+
+
+class AgentResultCache:
+    """
+    Build-system style cache for agent invocations
+
+    An invocation is keyed by the agent, its task, the context slice it
+    depends on, its system prompt and the model. Under that key the cache
+    keeps the workspace inputs the agent read (file content hashes and
+    directory listings) and the files it wrote. A later invocation with
+    the same key whose recorded inputs still match the workspace gets the
+    recorded result, and its files are restored from the blob store
+    instead of calling the model.
+
+    Only invocations that touched the workspace exclusively through file
+    tools are stored: running commands, tests or processes has effects
+    the cache cannot replay.
+    """
+
+    def __init__(self, cache_dir: Path, file_ops, human_loop=None, max_entries: int = 500):
+        """
+        Args:
+            cache_dir: Cache directory (<output>/.aidev/cache)
+            file_ops: FileOperations of the workspace
+            human_loop: Authorizes restoring files like any other write (no check if None)
+            max_entries: Invocation keys kept in the index
+        """
+        self.cache_dir = Path(cache_dir) / "agents"
+        self.blob_dir = self.cache_dir / "blobs"
+        self.index = JsonCache(self.cache_dir / "index.json", max_entries=max_entries)
+        self.file_ops = file_ops
+        self.human_loop = human_loop
+
+    def key(self, agent, task: str, context: Optional[Dict]) -> str:
+        """Cache key of an agent invocation"""
+        context_slice = agent.cache_context(context or {})
+        return cache_key(
+            AGENT_CACHE_VERSION,
+            agent.name,
+            task,
+            json.dumps(context_slice, sort_keys=True, default=str),
+            agent.system_prompt,
+            Config.GROQ_MODEL,
+        )
+
+    def lookup(self, key: str, agent_name: str = "") -> Optional[Dict]:
+        """
+        Restore a cached invocation whose inputs still match the workspace
+
+        Restoring its files goes through the approval policy (and a human,
+        if the policy asks) like the original writes did; a restore that is
+        not approved or fails is a miss.
+
+        Args:
+            key: Invocation key
+            agent_name: Agent the restore is authorized for
+
+        Returns:
+            The recorded result (files already restored), or None on a miss
+        """
+        for entry in self.index.get(key) or []:
+            if not all(self._input_hash(dep) == dep["hash"] for dep in entry["reads"]):
+                continue
+            blobs = {}
+            for filepath, digest in entry["writes"].items():
+                try:
+                    blobs[filepath] = (self.blob_dir / digest).read_bytes().decode("utf-8")
+                except (OSError, UnicodeDecodeError):
+                    blobs = None
+                    break
+            if blobs is None:
+                continue  # Blob lost: treat as a miss
+            if not self._authorize(agent_name, entry["dirs"], blobs):
+                return None
+            for directory in entry["dirs"]:
+                if not self.file_ops.create_directory(directory).startswith("✅"):
+                    return None
+            if blobs and not self.file_ops.write_files(blobs).startswith("✅"):
+                return None
+            return entry["result"]
+        return None
+
+    def _authorize(self, agent_name: str, dirs: List[str], blobs: Dict[str, str]) -> bool:
+        """Ask the approval policy (and a human, if it asks) before restoring cached outputs"""
+        if self.human_loop is None:
+            return True
+        calls = [("create_directory", {"directory": directory}) for directory in dirs]
+        if blobs:
+            calls.append(("write_files", {"files": blobs}))
+        for tool, args in calls:
+            approved = self.human_loop.authorize_tool(
+                agent=agent_name,
+                tool=tool,
+                args=args,
+                description=f"{agent_name} (cached result) wants to restore its outputs",
+                risk_level="medium",
+            )
+            if approved is not True:
+                return False
+        return True
+
+    def store(self, key: str, tool_log: List[Dict], result: Dict) -> bool:
+        """
+        Record a finished invocation
+
+        Args:
+            key: Invocation key
+            tool_log: Tool calls the agent ran, as {'tool', 'args', 'result'}
+            result: The agent's result
+
+        Returns:
+            True if the invocation was cacheable and stored
+        """
+        if result.get("status") != "completed" or result.get("pending_approvals"):
+            return False
+
+        reads, writes, dirs = [], {}, []
+        written = set()
+        for call in tool_log:
+            tool, args = call["tool"], call["args"]
+            if tool in READ_TOOLS:
+                dep = self._dependency(tool, args)
+                # Reading back its own output is not an input
+                if dep is not None and dep["path"] not in written and dep not in reads:
+                    reads.append(dep)
+            elif tool == "create_directory":
+                dirs.append(args.get("directory", ""))
+            elif tool in WRITE_TOOLS:
+                paths = [args.get("filepath")] if tool == "write_file" else _batch_paths(args.get("files"))
+                for filepath in paths:
+                    if filepath:
+                        written.add(filepath)
+            elif tool not in PURE_TOOLS:
+                return False  # Commands, tests, processes, deletes: not replayable
+
+        for dep in reads:
+            dep["hash"] = self._input_hash(dep)
+        for filepath in written:
+            path = self.file_ops.base_dir / filepath
+            try:
+                data = path.read_bytes()  # What is on disk now, after any later edits
+            except OSError:
+                continue  # Failed write
+            digest = content_hash(data)
+            blob = self.blob_dir / digest
+            if not blob.exists():
+                atomic_write_bytes(blob, data)
+            writes[filepath] = digest
+
+        entries = [e for e in self.index.get(key) or [] if e["reads"] != reads][-4:]
+        entries.append({"reads": reads, "writes": writes, "dirs": dirs, "result": result})
+        self.index.set(key, entries)
+        self.index.save()
+        return True
+
+    def _dependency(self, tool: str, args: Dict) -> Optional[Dict]:
+        if tool == "list_files":
+            return {"kind": "listing", "path": args.get("directory", ".")}
+        filepath = args.get("filepath")
+        return {"kind": "file", "path": filepath} if isinstance(filepath, str) else None
+
+    def _input_hash(self, dep: Dict) -> Optional[str]:
+        """Current hash of a recorded input: file content, or a directory's listing"""
+        if dep["kind"] == "listing":
+            return content_hash(self.file_ops.list_files(dep["path"]).encode("utf-8"))
+        try:
+            return content_hash((self.file_ops.base_dir / dep["path"]).read_bytes())
+        except OSError:
+            return None  # Missing files are an input too
+
+
+def _batch_paths(files) -> List[str]:
+    if isinstance(files, dict):
+        return list(files)
+    if isinstance(files, list):
+        return [f.get("filepath") for f in files if isinstance(f, dict)]
+    return []
@@ -0,0 +1,267 @@
+"""
+Declarative approval policy: decide allow / deny / ask for agent tool calls
+
+A policy file (YAML) holds an ordered list of rules; the first rule that
+matches a tool call decides it. Example:
+
+    default: ask            # unmatched medium/high risk calls (low risk is allowed)
+    rules:
+      - name: no-secrets
+        tools: [read_file, write_file, write_files]
+        paths: ["**/.env", "**/*.pem"]
+        decision: deny
+      - name: project-writes
+        tools: [write_file, write_files, create_directory]
+        paths: ["src/**", "tests/**", "*.md"]
+        decision: allow
+      - name: test-commands
+        tools: [run_command, run_commands]
+        commands: ["pytest", "npm test", "npm run lint"]
+        args: "[\\w./:= -]*"   # remaining arguments must fully match
+        decision: allow
+      - name: frontend-dev-server
+        agents: [Frontend Engineer]
+        tools: [start_process]
+        commands: ["npm run dev"]
+        decision: allow
+
+Rule fields are all optional and combined with AND: 'agents' and 'tools'
+are name lists, 'paths' are globs ('*' stays within a directory, '**'
+crosses directories) that every path of the call must match, 'commands'
+are program prefixes that every command of the call must start with,
+and 'args' is a regex the rest of each command must fully match. Deny
+rules instead fire when any path or any command matches. Commands are
+split on ;, &, &&, |, || and newlines. Globs and regexes are compiled
+once when the policy is loaded.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern
+import os
+import re
+import shlex
+
+DECISIONS = ["allow", "deny", "ask"]
+
+# Tool argument names that hold file paths
+PATH_ARGS = ["filepath", "directory", "path", "test_path"]
+
+# Shell syntax that can chain or smuggle extra commands
+SHELL_SEPARATORS = re.compile(r"&&|\|\||[;|&\n]")
+SHELL_UNSAFE = re.compile(r"[`<>]|\$\(")
+
+
+class PolicyDecision:
+    """Outcome of evaluating a tool call against the policy"""
+
+    def __init__(self, decision: str, rule: str):
+        self.decision = decision
+        self.rule = rule  # Name of the matching rule, or "default" / "risk:low"
+
+    def __repr__(self) -> str:
+        return f"PolicyDecision({self.decision!r}, rule={self.rule!r})"
+
+
+class PolicyRule:
+    """One allow/deny/ask rule"""
+
+    def __init__(
+        self,
+        name: str,
+        decision: str,
+        agents: Optional[List[str]] = None,
+        tools: Optional[List[str]] = None,
+        paths: Optional[List[str]] = None,
+        commands: Optional[List[str]] = None,
+        args: Optional[str] = None,
+    ):
+        if decision not in DECISIONS:
+            raise ValueError(f"Rule '{name}': decision must be one of {DECISIONS}, got {decision!r}")
+        self.name = name
+        self.decision = decision
+        self.agents = set(agents) if agents else None
+        self.tools = set(tools) if tools else None
+        self.paths = [glob_to_regex(p) for p in paths] if paths else None
+        self.commands = [shlex.split(c) for c in commands] if commands else None
+        self.args = re.compile(args) if args is not None else None
+
+    def matches(self, agent: str, tool: str, paths: List[str], commands: List[str]) -> bool:
+        """Check whether the rule applies to a tool call"""
+        if self.agents is not None and agent not in self.agents:
+            return False
+        if self.tools is not None and tool not in self.tools:
+            return False
+        if self.paths is not None:
+            if not paths:
+                return False
+            matched = [any(p.fullmatch(path) for p in self.paths) for path in paths]
+            # Deny if any path of a batch matches; allow/ask only if every path does
+            if not (any(matched) if self.decision == "deny" else all(matched)):
+                return False
+        if self.commands is not None or self.args is not None:
+            if not commands:
+                return False
+            if self.decision == "deny":
+                # Deny if any piece of any command matches
+                return any(self._matches_command(part) for c in commands for part in _split_command(c))
+            # Allow/ask only for plain commands that match entirely
+            return all(not SHELL_UNSAFE.search(c) and all(
+                self._matches_command(part) for part in _split_command(c)) for c in commands)
+        return True
+
+    def _matches_command(self, command: str) -> bool:
+        try:
+            words = shlex.split(command)
+        except ValueError:
+            return False
+        if not words:
+            return False
+        if self.commands is not None:
+            prefix = next((p for p in self.commands if words[:len(p)] == p), None)
+            if prefix is None:
+                return False
+            rest = words[len(prefix):]
+        else:
+            rest = words[1:]
+        return self.args is None or bool(self.args.fullmatch(" ".join(rest)))
+
+
+class ApprovalPolicy:
+    """Ordered rule list evaluated first-match-wins"""
+
+    def __init__(self, rules: Optional[List[PolicyRule]] = None, default: str = "ask", source: str = ""):
+        if default not in DECISIONS:
+            raise ValueError(f"Policy default must be one of {DECISIONS}, got {default!r}")
+        self.rules = rules or []
+        self.default = default
+        self.source = source
+
+    @classmethod
+    def from_dict(cls, data: Dict, source: str = "") -> "ApprovalPolicy":
+        """Build a policy from parsed YAML/JSON data"""
+        data = data or {}
+        rules = []
+        for i, entry in enumerate(data.get("rules") or [], 1):
+            if not isinstance(entry, dict):
+                raise ValueError(f"Policy rule #{i} must be a mapping")
+            entry = dict(entry)
+            name = str(entry.pop("name", f"rule-{i}"))
+            decision = entry.pop("decision", None)
+            unknown = set(entry) - {"agents", "tools", "paths", "commands", "args"}
+            if unknown:
+                raise ValueError(f"Rule '{name}': unknown fields {sorted(unknown)}")
+            rules.append(PolicyRule(name, decision, **{k: _as_list(v) if k != "args" else v for k, v in entry.items()}))
+        return cls(rules, default=data.get("default", "ask"), source=source)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ApprovalPolicy":
+        """
+        Load a policy from a YAML file
+
+        Args:
+            path: Policy file
+
+        Returns:
+            ApprovalPolicy
+
+        Raises:
+            ValueError: If the file is not a valid policy
+        """
+        import yaml
+
+        try:
+            data = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid policy file {path}: {e}")
+        if data is not None and not isinstance(data, dict):
+            raise ValueError(f"Invalid policy file {path}: expected a mapping")
+        return cls.from_dict(data, source=str(path))
+
+    def evaluate(self, agent: str, tool: str, args: Dict, risk_level: str = "medium") -> PolicyDecision:
+        """
+        Decide a tool call
+
+        Args:
+            agent: Name of the calling agent
+            tool: Tool name
+            args: Tool arguments
+            risk_level: low, medium, high - unmatched low risk calls are allowed
+
+        Returns:
+            PolicyDecision with the decision and the rule that produced it
+        """
+        paths = tool_paths(tool, args)
+        commands = tool_commands(tool, args)
+        for rule in self.rules:
+            if rule.matches(agent, tool, paths, commands):
+                return PolicyDecision(rule.decision, rule.name)
+        if risk_level == "low":
+            return PolicyDecision("allow", "risk:low")
+        return PolicyDecision(self.default, "default")
+
+
+def glob_to_regex(pattern: str) -> Pattern:
+    """Compile a path glob: '*' and '?' stay within a directory, '**/' and '**' cross directories"""
+    pattern = _normalize_path(pattern)
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out))
+
+
+def tool_paths(tool: str, args: Dict) -> List[str]:
+    """File paths a tool call touches, normalized relative to the workspace"""
+    if tool == "write_files":
+        files = args.get("files") or {}
+        if isinstance(files, dict):
+            raw = list(files)
+        else:
+            raw = [f.get("filepath") or f.get("path") for f in files if isinstance(f, dict)]
+    elif tool in ["lint_code", "format_code"] and isinstance(args.get("filepath"), list):
+        raw = args["filepath"]
+    else:
+        raw = [args[name] for name in PATH_ARGS if isinstance(args.get(name), str)]
+    return [_normalize_path(str(p)) for p in raw if p]
+
+
+def tool_commands(tool: str, args: Dict) -> List[str]:
+    """Shell commands a tool call runs"""
+    if tool in ["run_command", "start_process"]:
+        return [str(args.get("command", ""))]
+    if tool == "run_commands":
+        commands = []
+        for entry in args.get("commands") or []:
+            commands.append(str(entry.get("command", "")) if isinstance(entry, dict) else str(entry))
+        return commands
+    if tool == "install_package":
+        manager = args.get("package_manager", "pip")
+        return [f"{manager} install {args.get('package', '')}"]
+    return []
+
+
+def _split_command(command: str) -> List[str]:
+    return [part.strip() for part in SHELL_SEPARATORS.split(command) if part.strip()]
+
+
+def _normalize_path(path: str) -> str:
+    path = path.replace("\\", "/")
+    normalized = os.path.normpath(path).replace("\\", "/") if path else path
+    return normalized[2:] if normalized.startswith("./") else normalized
+
+
+def _as_list(value) -> List[str]:
+    return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
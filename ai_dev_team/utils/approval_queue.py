@@ -0,0 +1,379 @@
+"""
+Asynchronous approval queue: tool calls wait for an answer without stopping the run
+
+Requests that the approval policy leaves to a human are queued instead of
+prompting. The requesting agent keeps working (read-only tools, other
+files) and the queued action runs once it is approved. Answers arrive
+through any of:
+
+- a file dropped into <state>/approvals/inbox/ containing commands
+- the local socket <state>/approvals.sock (one command per line)
+- the ai-dev-team-approve command, which uses the socket or the inbox
+
+Commands: "list", "approve <id> [<id>...]", "reject <id> [...]",
+"approve all [<tool or agent>]", "reject all [<tool or agent>]".
+The pending requests are mirrored to <state>/approvals/pending.json.
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import socket
+import socketserver
+import threading
+import time
+
+from ..tools.atomic_io import atomic_write_text
+
+SOCKET_NAME = "approvals.sock"
+
+
+class ApprovalRequest:
+    """A tool call waiting for a human decision"""
+
+    def __init__(
+        self,
+        request_id: int,
+        agent: str,
+        tool: str,
+        args: Dict,
+        description: str,
+        risk_level: str,
+        rule: str,
+        run: Callable[[], str],
+    ):
+        self.id = request_id
+        self.agent = agent
+        self.tool = tool
+        self.args = args
+        self.description = description
+        self.risk_level = risk_level
+        self.rule = rule
+        self.run = run
+        self.created = time.time()
+        self.status = "pending"  # pending, approved, rejected, expired
+        self.resolved_by: Optional[str] = None
+        self.result: Optional[str] = None  # Tool result once the approved action ran
+        self.finished = False  # Ran (approved) or reported (rejected/expired)
+
+    @property
+    def action(self) -> str:
+        return f"{self.tool}({json.dumps(self.args, default=str)})"
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "agent": self.agent,
+            "action": self.action[:300],
+            "description": self.description,
+            "risk": self.risk_level,
+            "rule": self.rule,
+            "age": round(time.time() - self.created, 1),
+        }
+
+
+class ApprovalQueue:
+    """Thread-safe queue of pending approvals with file-drop and socket answer channels"""
+
+    def __init__(
+        self,
+        state_dir: Path,
+        on_resolve: Optional[Callable[[ApprovalRequest], None]] = None,
+        poll_interval: float = 0.5,
+    ):
+        """
+        Args:
+            state_dir: Run state directory (<output>/.aidev)
+            on_resolve: Called with each request when it is answered
+            poll_interval: Seconds between inbox checks
+        """
+        self.state_dir = Path(state_dir)
+        self.inbox = self.state_dir / "approvals" / "inbox"
+        self.pending_file = self.state_dir / "approvals" / "pending.json"
+        self.socket_path = self.state_dir / SOCKET_NAME
+        self.on_resolve = on_resolve
+        self.poll_interval = poll_interval
+        self._requests: Dict[int, ApprovalRequest] = {}
+        self._next_id = 1
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._server = None
+
+    def start(self):
+        """Start listening on the inbox directory and the local socket"""
+        self.inbox.mkdir(parents=True, exist_ok=True)
+        self._write_pending()
+        self._watcher = threading.Thread(target=self._watch_inbox, name="approval-inbox", daemon=True)
+        self._watcher.start()
+
+        if hasattr(socket, "AF_UNIX"):
+            queue = self
+
+            class Handler(socketserver.StreamRequestHandler):
+                def handle(self):
+                    for raw in self.rfile:
+                        reply = queue.handle_command(raw.decode("utf-8", "replace"), via="socket")
+                        self.wfile.write((reply + "\n").encode("utf-8"))
+
+            try:
+                if self.socket_path.exists():
+                    self.socket_path.unlink()  # Left over from a previous run
+                self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="approval-socket", daemon=True).start()
+            except OSError:
+                self._server = None  # e.g. path too long for a socket; the inbox still works
+
+    def close(self):
+        """Stop the answer channels; pending requests are expired"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+        self.expire_pending()
+
+    def submit(
+        self,
+        agent: str,
+        tool: str,
+        args: Dict,
+        description: str,
+        risk_level: str,
+        rule: str,
+        run: Callable[[], str],
+    ) -> ApprovalRequest:
+        """
+        Queue a tool call for approval
+
+        Args:
+            agent: Requesting agent
+            tool: Tool name
+            args: Tool arguments
+            description: What the agent wants to do
+            risk_level: low, medium, high
+            rule: Policy rule that sent it to a human
+            run: Executes the tool call once approved
+
+        Returns:
+            The queued ApprovalRequest
+        """
+        with self._changed:
+            request = ApprovalRequest(self._next_id, agent, tool, args, description, risk_level, rule, run)
+            self._requests[request.id] = request
+            self._next_id += 1
+            self._write_pending()
+        return request
+
+    def pending(self, agent: Optional[str] = None) -> List[ApprovalRequest]:
+        """Requests still waiting for an answer, oldest first"""
+        with self._changed:
+            return [r for r in self._requests.values()
+                    if r.status == "pending" and (agent is None or r.agent == agent)]
+
+    def unfinished(self, agent: Optional[str] = None) -> List[ApprovalRequest]:
+        """Requests not yet run or reported, oldest first"""
+        with self._changed:
+            return [r for r in self._requests.values()
+                    if not r.finished and (agent is None or r.agent == agent)]
+
+    def resolve(self, selector: str, approved: bool, via: str = "api") -> List[ApprovalRequest]:
+        """
+        Answer pending requests
+
+        Args:
+            selector: Request id, "all", or "all <tool or agent>"
+            approved: Approve or reject
+            via: Answer channel, for the decision log
+
+        Returns:
+            Requests that were resolved
+        """
+        words = selector.split(maxsplit=1)
+        resolved = []
+        with self._changed:
+            for request in self._requests.values():
+                if request.status != "pending":
+                    continue
+                if words and words[0] == "all":
+                    scope = words[1] if len(words) > 1 else None
+                    if scope is not None and scope not in [request.tool, request.agent]:
+                        continue
+                elif str(request.id) != selector.strip():
+                    continue
+                request.status = "approved" if approved else "rejected"
+                request.resolved_by = via
+                resolved.append(request)
+            if resolved:
+                self._write_pending()
+                self._changed.notify_all()
+        for request in resolved:
+            if self.on_resolve:
+                self.on_resolve(request)
+        return resolved
+
+    def expire_pending(self):
+        """Reject everything still pending (timeout or shutdown)"""
+        with self._changed:
+            expired = [r for r in self._requests.values() if r.status == "pending"]
+            for request in expired:
+                request.status = "expired"
+                request.resolved_by = "timeout"
+            if expired:
+                self._write_pending()
+                self._changed.notify_all()
+        for request in expired:
+            if self.on_resolve:
+                self.on_resolve(request)
+
+    def wait(self, agent: Optional[str] = None, timeout: Optional[float] = None, any_one: bool = False) -> bool:
+        """
+        Wait until requests are answered
+
+        Args:
+            agent: Only this agent's requests (all if None)
+            timeout: Seconds to wait (forever if None)
+            any_one: Return as soon as one request is answered
+
+        Returns:
+            True if the wait ended because requests were answered
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._changed:
+            start = len(self._pending_locked(agent))
+            while True:
+                remaining = len(self._pending_locked(agent))
+                if remaining == 0 or (any_one and remaining < start):
+                    return True
+                wait_for = None if deadline is None else deadline - time.time()
+                if wait_for is not None and wait_for <= 0:
+                    return False
+                self._changed.wait(wait_for)
+
+    def run_resolved(self, agent: Optional[str] = None) -> List[ApprovalRequest]:
+        """
+        Run approved actions and collect rejections, on the calling thread
+
+        Actions run in request order. Tools are never executed on the
+        listener threads, so they do not race with the agents' own calls.
+
+        Args:
+            agent: Only this agent's requests (all if None)
+
+        Returns:
+            Requests finished by this call (approved ones carry .result)
+        """
+        with self._changed:
+            ready = [r for r in self._requests.values()
+                     if r.status != "pending" and not r.finished and (agent is None or r.agent == agent)]
+            for request in ready:
+                request.finished = True  # Claimed; no other caller runs it
+        for request in ready:
+            if request.status == "approved":
+                try:
+                    request.result = request.run()
+                except Exception as e:
+                    request.result = f"❌ Tool execution error: {str(e)}"
+        return ready
+
+    def handle_command(self, line: str, via: str) -> str:
+        """Apply one text command from the inbox or socket and describe the outcome"""
+        words = line.strip().split()
+        if not words:
+            return ""
+        verb = words[0].lower()
+        if verb == "list":
+            pending = self.pending()
+            if not pending:
+                return "No pending approvals"
+            return "\n".join(f"#{r.id} [{r.agent}] {r.action[:120]} (rule: {r.rule})" for r in pending)
+        if verb not in ["approve", "reject"] or len(words) < 2:
+            return f"❌ Unknown command: {line.strip()} (use list, approve <id|all>, reject <id|all>)"
+
+        approved = verb == "approve"
+        if words[1] == "all":
+            resolved = self.resolve(" ".join(words[1:]), approved, via=via)
+        else:
+            resolved = [r for request_id in words[1:] for r in self.resolve(request_id, approved, via=via)]
+        if not resolved:
+            return "No matching pending approvals"
+        return f"{'✓ Approved' if approved else '✗ Rejected'} {len(resolved)}: " + ", ".join(f"#{r.id}" for r in resolved)
+
+    def _pending_locked(self, agent: Optional[str]) -> List[ApprovalRequest]:
+        return [r for r in self._requests.values()
+                if r.status == "pending" and (agent is None or r.agent == agent)]
+
+    def _watch_inbox(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                drops = sorted(p for p in self.inbox.iterdir() if p.is_file() and not p.name.startswith("."))
+            except OSError:
+                continue
+            for drop in drops:
+                try:
+                    text = drop.read_text(encoding="utf-8")
+                    drop.unlink()
+                except OSError:
+                    continue
+                for line in text.splitlines():
+                    self.handle_command(line, via="file")
+
+    def _write_pending(self):
+        try:
+            atomic_write_text(self.pending_file, json.dumps([r.to_dict() for r in self._pending_locked(None)], indent=2))
+        except OSError:
+            pass  # The socket and in-memory queue still work
+
+
+def send_command(state_dir: Path, command: str, timeout: float = 5.0) -> str:
+    """
+    Answer a running session's approvals from another terminal
+
+    Uses the session's socket when available, otherwise drops the command
+    into its inbox (and answers 'list' from pending.json).
+
+    Args:
+        state_dir: The session's state directory (<output>/.aidev)
+        command: e.g. "approve 3", "approve all write_file", "list"
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Reply text
+    """
+    state_dir = Path(state_dir)
+    socket_path = state_dir / SOCKET_NAME
+    if hasattr(socket, "AF_UNIX") and socket_path.exists():
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(timeout)
+                client.connect(str(socket_path))
+                client.sendall((command.strip() + "\n").encode("utf-8"))
+                client.shutdown(socket.SHUT_WR)
+                reply = b""
+                while True:
+                    chunk = client.recv(65536)
+                    if not chunk:
+                        break
+                    reply += chunk
+                return reply.decode("utf-8", "replace").strip()
+        except OSError:
+            pass  # Stale socket: fall back to the inbox
+
+    if command.strip().lower() == "list":
+        try:
+            pending = json.loads((state_dir / "approvals" / "pending.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return "No running session found"
+        if not pending:
+            return "No pending approvals"
+        return "\n".join(f"#{r['id']} [{r['agent']}] {r['action'][:120]} (rule: {r['rule']})" for r in pending)
+
+    inbox = state_dir / "approvals" / "inbox"
+    if not inbox.is_dir():
+        return "No running session found"
+    atomic_write_text(inbox / f"{time.time_ns()}.txt", command.strip() + "\n")
+    return f"Queued '{command.strip()}' for the running session"
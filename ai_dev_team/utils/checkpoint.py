@@ -0,0 +1,175 @@
+"""
+Run checkpoints: persist a project run after every agent so it can be resumed
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import gzip
+import json
+import os
+import shutil
+import time
+import uuid
+
+from ..config import Config
+from ..tools.atomic_io import atomic_write_bytes
+from ..tools.pytest_runner import SKIP_DIRS
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILE = "checkpoint.json.gz"
+
+
+class RunCheckpoint:
+    """
+    Gzipped JSON snapshot of a run in <output>/.aidev/runs/<run-id>/
+
+    Holds the requirements, plan, design spec, accumulated context, each
+    finished agent's result, the run's token spend and a manifest of the
+    workspace files (size and mtime). It is rewritten atomically after
+    every agent, so a crash loses at most the agent that was running.
+    """
+
+    def __init__(self, output_dir: Path, run_id: Optional[str] = None, state: Optional[Dict] = None):
+        self.output_dir = Path(output_dir)
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.path = runs_dir(self.output_dir) / self.run_id / CHECKPOINT_FILE
+        self.state = state or {
+            "version": CHECKPOINT_VERSION,
+            "run_id": self.run_id,
+            "status": "planned",
+            "created": time.time(),
+            "updated": time.time(),
+            "requirements": "",
+            "design_spec": None,
+            "plan": {},
+            "context": {},
+            "completed": [],
+            "results": {},
+            "agents_executed": 0,
+            "usage": {},
+            "manifest": {},
+        }
+
+    @classmethod
+    def load(cls, output_dir: Path, run_id: str) -> "RunCheckpoint":
+        """
+        Load a saved run
+
+        Args:
+            output_dir: Project output directory
+            run_id: Run id, or "latest" for the most recently updated unfinished run
+
+        Returns:
+            RunCheckpoint
+
+        Raises:
+            ValueError: If the run does not exist or cannot be read
+        """
+        if run_id == "latest":
+            unfinished = [r for r in list_runs(output_dir) if r["status"] != "completed"]
+            if not unfinished:
+                raise ValueError("No unfinished run to resume")
+            run_id = unfinished[0]["run_id"]
+
+        path = runs_dir(Path(output_dir)) / run_id / CHECKPOINT_FILE
+        try:
+            state = json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+        except FileNotFoundError:
+            raise ValueError(f"No checkpoint for run '{run_id}' in {path.parent.parent}")
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Unreadable checkpoint {path}: {e}")
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {path} has unsupported version {state.get('version')}")
+        return cls(output_dir, run_id, state)
+
+    def is_done(self, phase_index: int, agent_name: str) -> bool:
+        """Whether an agent of a phase already finished in this run"""
+        return f"{phase_index}:{agent_name}" in self.state["completed"]
+
+    def record_plan(self, requirements: str, plan: Dict, design_spec, context: Dict, usage: Dict):
+        """Save the approved plan before any agent runs"""
+        self.state.update(requirements=requirements, plan=plan, design_spec=design_spec)
+        self.save(context, usage)
+
+    def record_agent(
+        self, phase_index: int, agent_name: str, result: Dict, context: Dict, agents_executed: int, usage: Dict
+    ):
+        """Save the run after an agent finished"""
+        key = f"{phase_index}:{agent_name}"
+        if key not in self.state["completed"]:
+            self.state["completed"].append(key)
+        self.state["results"][key] = result
+        self.state["agents_executed"] = agents_executed
+        self.save(context, usage)
+
+    def finish(self, context: Dict, usage: Dict):
+        """Mark the run completed"""
+        self.state["status"] = "completed"
+        self.save(context, usage)
+
+    def save(self, context: Dict, usage: Dict):
+        """Write the checkpoint (context, token spend and workspace manifest)"""
+        self.state.update(context=context, usage=usage, manifest=self._manifest(), updated=time.time())
+        data = json.dumps(self.state, separators=(",", ":"), default=str).encode("utf-8")
+        atomic_write_bytes(self.path, gzip.compress(data, compresslevel=6), durable=True)
+
+    def changed_files(self) -> List[str]:
+        """Workspace files added, changed or removed since the checkpoint"""
+        saved = self.state.get("manifest", {})
+        current = self._manifest()
+        changed = [p for p, meta in current.items() if saved.get(p) != meta]
+        changed += [p for p in saved if p not in current]
+        return sorted(changed)
+
+    def _manifest(self) -> Dict[str, List[int]]:
+        manifest = {}
+        for root, dirs, files in os.walk(self.output_dir):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and d != Config.STATE_DIR_NAME]
+            for name in files:
+                path = Path(root) / name
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                manifest[path.relative_to(self.output_dir).as_posix()] = [st.st_size, st.st_mtime_ns]
+        return manifest
+
+
+def runs_dir(output_dir: Path) -> Path:
+    """Directory holding the saved runs of an output directory"""
+    return Path(output_dir) / Config.STATE_DIR_NAME / "runs"
+
+
+def list_runs(output_dir: Path) -> List[Dict]:
+    """
+    Summaries of saved runs, most recently updated first
+
+    Args:
+        output_dir: Project output directory
+
+    Returns:
+        Dicts with run_id, status, updated, completed (agent count) and phases
+    """
+    runs = []
+    directory = runs_dir(Path(output_dir))
+    if not directory.is_dir():
+        return runs
+    for path in directory.glob(f"*/{CHECKPOINT_FILE}"):
+        try:
+            state = json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+        except (OSError, ValueError):
+            continue
+        runs.append({
+            "run_id": state.get("run_id", path.parent.name),
+            "status": state.get("status", "unknown"),
+            "updated": state.get("updated", 0),
+            "completed": len(state.get("completed", [])),
+            "phases": len(state.get("plan", {}).get("phases", [])),
+        })
+    return sorted(runs, key=lambda r: r["updated"], reverse=True)
+
+
+def prune_runs(output_dir: Path, keep: int):
+    """Delete the oldest completed runs beyond the newest keep runs"""
+    for run in list_runs(output_dir)[keep:]:
+        if run["status"] == "completed":
+            shutil.rmtree(runs_dir(Path(output_dir)) / run["run_id"], ignore_errors=True)
@@ -0,0 +1,75 @@
+"""
+Small persistent key-value cache stored as a JSON file
+"""
+from pathlib import Path
+from typing import Any, Optional
+import hashlib
+import json
+import threading
+
+
+def cache_key(*parts: Any) -> str:
+    """Build a stable SHA-256 key from strings or JSON-serializable parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        text = part if isinstance(part, str) else json.dumps(part, sort_keys=True, default=str)
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class JsonCache:
+    """
+    Dict-like cache persisted to a JSON file
+
+    Loaded lazily on first access and written atomically by save(). When it
+    grows past max_entries, the least recently used entries are dropped.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            data = self._load()
+            if key not in data:
+                self.misses += 1
+                return None
+            self.hits += 1
+            value = data.pop(key)
+            data[key] = value  # Mark as recently used
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            data = self._load()
+            data.pop(key, None)
+            data[key] = value
+            while len(data) > self.max_entries:
+                data.pop(next(iter(data)))
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to disk if it changed"""
+        # Imported here: the tools package itself uses this cache (vision results)
+        from ..tools.atomic_io import atomic_write_text
+
+        with self._lock:
+            if not self._dirty:
+                return
+            atomic_write_text(self.path, json.dumps(self._data, separators=(",", ":")))
+            self._dirty = False
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
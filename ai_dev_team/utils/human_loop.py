@@ -4,8 +4,15 @@ Human-in-the-Loop system for approvals and feedback
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+import json
+import threading
+import time
+
 from ..config import Config
+from .approval_policy import ApprovalPolicy
+from .approval_queue import ApprovalQueue, ApprovalRequest
 
 console = Console()
 
@@ -13,9 +20,82 @@ console = Console()
 class HumanLoop:
     """Interactive approval and feedback system"""
 
-    def __init__(self, auto_approve: bool = None):
+    def __init__(
+        self,
+        auto_approve: bool = None,
+        policy: Optional[ApprovalPolicy] = None,
+        log_path: Optional[Path] = None,
+        queue: Optional[ApprovalQueue] = None,
+    ):
+        """
+        Args:
+            auto_approve: Approve everything the policy does not deny
+            policy: Rules deciding tool calls before a human is asked
+            log_path: JSON-lines file recording every decision (optional)
+            queue: Queue tool approvals instead of prompting (optional)
+        """
         self.auto_approve = auto_approve if auto_approve is not None else Config.AUTO_APPROVE
+        self.policy = policy or ApprovalPolicy()
+        self.log_path = Path(log_path) if log_path else None
+        self.queue = queue
+        if queue is not None:
+            queue.on_resolve = self._record_queue_answer
         self.approval_log = []
+        self._log_lock = threading.Lock()
+
+    def authorize_tool(
+        self,
+        agent: str,
+        tool: str,
+        args: Dict,
+        description: str,
+        risk_level: str = "medium",
+        run: Optional[Callable[[], str]] = None,
+    ) -> Union[bool, ApprovalRequest]:
+        """
+        Decide whether an agent may run a tool, asking a human only when the policy says so
+
+        With an approval queue and a run callable, a call that needs a human
+        is queued instead of prompting: the ApprovalRequest is returned and
+        run() executes once the request is approved.
+
+        Args:
+            agent: Name of the calling agent
+            tool: Tool name
+            args: Tool arguments
+            description: What the agent wants to do
+            risk_level: low, medium, high
+            run: Executes the call later, for queued approvals
+
+        Returns:
+            True if the call may run now, False if not, or the queued ApprovalRequest
+        """
+        decision = self.policy.evaluate(agent, tool, args, risk_level)
+        action = f"{tool}({json.dumps(args, default=str)})"
+
+        if decision.decision == "ask":
+            if self.queue is not None and run is not None and not self.auto_approve:
+                request = self.queue.submit(agent, tool, args, description, risk_level, decision.rule, run)
+                console.print(
+                    f"[yellow]⏳ Approval #{request.id} queued: {agent} {action[:100]} "
+                    f"(answer with: ai-dev-team-approve approve {request.id})[/yellow]"
+                )
+                return request
+            return self.request_approval(
+                action=action,
+                description=description,
+                context={"agent": agent, "tool": tool, "rule": decision.rule},
+                risk_level=risk_level,
+            )
+
+        approved = decision.decision == "allow"
+        if decision.rule != "risk:low":
+            self._log({"action": action, "approved": approved, "auto": False, "rule": decision.rule, "agent": agent})
+            if not approved:
+                console.print(f"[red]✗ Denied by policy rule '{decision.rule}': {agent} {tool}[/red]")
+            elif Config.VERBOSE:
+                console.print(f"[dim]✓ Allowed by policy rule '{decision.rule}': {agent} {tool}[/dim]")
+        return approved
 
     def request_approval(
         self,
@@ -37,10 +117,10 @@ class HumanLoop:
             True if approved, False otherwise
         """
         # Auto-approve if flag is set (for all risk levels)
+        rule = (context or {}).get("rule")
+        agent = (context or {}).get("agent")
         if self.auto_approve:
-            self.approval_log.append(
-                {"action": action, "approved": True, "auto": True}
-            )
+            self._log({"action": action, "approved": True, "auto": True, "rule": rule, "agent": agent})
             return True
 
         # Display request
@@ -65,9 +145,7 @@ class HumanLoop:
         # Get approval
         approved = Confirm.ask("Approve this action?", default=True)
 
-        self.approval_log.append(
-            {"action": action, "approved": approved, "auto": False}
-        )
+        self._log({"action": action, "approved": approved, "auto": False, "rule": rule, "agent": agent, "human": True})
 
         if approved:
             console.print("[green]✓ Approved[/green]")
@@ -151,10 +229,51 @@ class HumanLoop:
         """Get approval statistics"""
         total = len(self.approval_log)
         if total == 0:
-            return {"total": 0, "approved": 0, "rejected": 0, "auto": 0}
+            return {"total": 0, "approved": 0, "rejected": 0, "auto": 0, "policy": 0, "human": 0, "expired": 0}
 
         approved = sum(1 for log in self.approval_log if log["approved"])
         rejected = total - approved
         auto = sum(1 for log in self.approval_log if log.get("auto", False))
-
-        return {"total": total, "approved": approved, "rejected": rejected, "auto": auto}
+        human = sum(1 for log in self.approval_log if log.get("human", False))
+        expired = sum(1 for log in self.approval_log if log.get("expired", False))
+
+        return {
+            "total": total,
+            "approved": approved,
+            "rejected": rejected,
+            "auto": auto,
+            "policy": total - auto - human - expired,
+            "human": human,
+            "expired": expired,
+        }
+
+    def _record_queue_answer(self, request: ApprovalRequest):
+        """Log a queued request once it is answered (called from the answer channel's thread)"""
+        expired = request.status == "expired"
+        self._log({
+            "action": request.action,
+            "approved": request.status == "approved",
+            "auto": False,
+            "rule": request.rule,
+            "agent": request.agent,
+            "human": not expired,
+            "expired": expired,
+            "via": request.resolved_by,
+        })
+        colors = {"approved": "green", "rejected": "red", "expired": "yellow"}
+        color = colors.get(request.status, "yellow")
+        console.print(f"[{color}]Approval #{request.id} {request.status} ({request.resolved_by}): "
+                      f"{request.agent} {request.tool}[/{color}]")
+
+    def _log(self, entry: dict):
+        """Record a decision in memory and, if configured, in the decision log file"""
+        with self._log_lock:
+            self.approval_log.append(entry)
+            if self.log_path is None:
+                return
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"time": time.time(), **entry}, default=str) + "\n")
+            except OSError:
+                pass  # The in-memory log is still complete
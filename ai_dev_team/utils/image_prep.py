@@ -0,0 +1,171 @@
+"""
+Image preprocessing for vision requests: downscale, re-encode, strip metadata, cache
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import base64
+import io
+import json
+import threading
+
+from ..config import Config
+from ..tools.atomic_io import atomic_write_text, content_hash
+from .disk_cache import JsonCache, cache_key
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+
+class PreparedImage:
+    """An image encoded and ready to send to a vision model"""
+
+    def __init__(self, data: str, mime_type: str, info: Dict):
+        self.data = data  # base64
+        self.mime_type = mime_type
+        self.info = info  # source format/size, encoded size, bytes before and after
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.data}"
+
+
+class ImagePreprocessor:
+    """
+    Turns image files into compact vision-model payloads
+
+    Images are downscaled so the longest side fits the model's effective
+    resolution, EXIF orientation is applied, and the result is re-encoded
+    as JPEG or WebP without metadata. Payloads are cached in memory and,
+    with a cache_dir, on disk, keyed by the file's content hash and the
+    encoding settings. The content hash itself is remembered per
+    (path, size, mtime), so a cached image is not even re-read.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_side: Optional[int] = None,
+        image_format: Optional[str] = None,
+        quality: Optional[int] = None,
+        memory_entries: int = 16,
+    ):
+        self.cache_dir = Path(cache_dir) / "images" if cache_dir else None
+        self.max_side = max_side or Config.VISION_MAX_SIDE
+        self.image_format = (image_format or Config.VISION_IMAGE_FORMAT).lower()
+        self.quality = quality or Config.VISION_IMAGE_QUALITY
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, PreparedImage]" = OrderedDict()
+        self._hashes = JsonCache(self.cache_dir / "hashes.json") if self.cache_dir else None
+        self._lock = threading.Lock()
+
+    def prepare(self, image_path: str) -> PreparedImage:
+        """
+        Get the encoded payload for an image, from cache when possible
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            PreparedImage
+        """
+        path = Path(image_path).resolve()
+        digest = self.image_hash(path)
+        key = cache_key(digest, self.max_side, self.image_format, self.quality)
+
+        with self._lock:
+            prepared = self._memory.get(key)
+            if prepared is not None:
+                self._memory.move_to_end(key)
+                return prepared
+
+        prepared = self._load(key)
+        if prepared is None:
+            prepared = self._encode(path.read_bytes())
+            prepared.info["sha256"] = digest
+            self._store(key, prepared)
+
+        with self._lock:
+            self._memory[key] = prepared
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return prepared
+
+    def image_hash(self, path: Path) -> str:
+        """Content hash of an image file, reusing the stored hash while size and mtime are unchanged"""
+        st = path.stat()
+        stat_key = cache_key(str(path), st.st_size, st.st_mtime_ns)
+        if self._hashes is not None:
+            digest = self._hashes.get(stat_key)
+            if digest:
+                return digest
+
+        digest = content_hash(path.read_bytes())
+        if self._hashes is not None:
+            self._hashes.set(stat_key, digest)
+            self._hashes.save()
+        return digest
+
+    def _encode(self, raw: bytes) -> PreparedImage:
+        """Downscale and re-encode an image without metadata"""
+        from PIL import Image, ImageOps, features
+
+        image_format = self.image_format
+        if image_format == "webp" and not features.check("webp"):
+            image_format = "jpeg"
+
+        with Image.open(io.BytesIO(raw)) as img:
+            source_format = img.format
+            source_size = img.size
+            img = ImageOps.exif_transpose(img)  # Keep the orientation EXIF would have applied
+            img.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+
+            if image_format == "jpeg":
+                if img.mode in ["RGBA", "LA", "P"]:
+                    # JPEG has no alpha: flatten onto white like most viewers show it
+                    rgba = img.convert("RGBA")
+                    background = Image.new("RGB", rgba.size, (255, 255, 255))
+                    background.paste(rgba, mask=rgba.split()[-1])
+                    img = background
+                elif img.mode != "RGB":
+                    img = img.convert("RGB")
+                options = {"quality": self.quality, "optimize": True}
+            else:
+                if img.mode not in ["RGB", "RGBA"]:
+                    img = img.convert("RGBA" if "A" in img.mode or img.mode == "P" else "RGB")
+                options = {"quality": self.quality, "method": 4}
+
+            buffer = io.BytesIO()
+            # No exif/icc_profile arguments: metadata is dropped
+            img.save(buffer, format=image_format.upper(), **options)
+            encoded = buffer.getvalue()
+            encoded_size = img.size
+
+        info = {
+            "source_format": source_format,
+            "width": source_size[0],
+            "height": source_size[1],
+            "encoded_width": encoded_size[0],
+            "encoded_height": encoded_size[1],
+            "format": image_format,
+            "bytes_in": len(raw),
+            "bytes_out": len(encoded),
+        }
+        return PreparedImage(base64.b64encode(encoded).decode("ascii"), MIME_TYPES[image_format], info)
+
+    def _load(self, key: str) -> Optional[PreparedImage]:
+        if self.cache_dir is None:
+            return None
+        try:
+            entry = json.loads((self.cache_dir / f"{key}.json").read_text(encoding="utf-8"))
+            return PreparedImage(entry["data"], entry["mime_type"], entry["info"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _store(self, key: str, prepared: PreparedImage):
+        if self.cache_dir is None:
+            return
+        entry = {"data": prepared.data, "mime_type": prepared.mime_type, "info": prepared.info}
+        try:
+            atomic_write_text(self.cache_dir / f"{key}.json", json.dumps(entry))
+        except OSError:
+            pass  # Cache is an optimization only
@@ -26,6 +26,7 @@ setup(
     entry_points={
         "console_scripts": [
             "ai-dev-team=ai_dev_team.cli:main",
+            "ai-dev-team-approve=ai_dev_team.cli:approve_main",
         ],
     },
     python_requires=">=3.8",
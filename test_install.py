@@ -86,6 +86,32 @@ def test_ai_dev_team():
 
     return True
 
+def test_tools():
+    """Test that tool methods reach their backends (an AttributeError here is a bug, not a setup issue)"""
+    print("\n🧪 Testing tools...")
+
+    import tempfile
+    from pathlib import Path
+
+    try:
+        from ai_dev_team.tools import TerminalOperations
+    except ImportError as e:
+        print(f"  ✗ tools: {e}")
+        return False
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        Path(work_dir, "hello.py").write_text("print('hello')\n")
+        terminal = TerminalOperations(work_dir)
+        try:
+            for name, method in [("lint_code", terminal.lint_code), ("format_code", terminal.format_code)]:
+                result = method("hello.py")
+                assert "object has no attribute" not in result, f"{name}: {result}"
+                print(f"  ✓ {name}")
+        finally:
+            terminal.close()
+
+    return True
+
 def test_config():
     """Test configuration"""
     print("\n🧪 Testing configuration...")
@@ -123,6 +149,13 @@ def main():
     if not test_ai_dev_team():
         all_passed = False
 
+    try:
+        if not test_tools():
+            all_passed = False
+    except AssertionError as e:
+        print(f"  ✗ {e}")
+        all_passed = False
+
     if not test_config():
         all_passed = False
 